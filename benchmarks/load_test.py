@@ -0,0 +1,210 @@
+"""
+웹 워커 수(uvicorn --workers)에 따른 처리량 측정 - 실제 uvicorn 서버를 띄우고 여러 스레드로 HTTP 요청을 보냄
+
+워커 수마다 새 작업 폴더(uploads, 메타데이터 DB, 변경 신호 폴더)로 서버를 띄우고
+결과 파일 하나를 올린 뒤 /api/search 키 검색과 부분 문자열 검색, 홈 화면을 섞어서 duration초 동안 요청
+기록 값: 초당 요청 수(req/s), 응답 시간 p50/p95 (ms), 실패한 요청 수
+
+검색은 CPU를 쓰는 작업이라 코어 수보다 워커를 많이 띄우면 더 빨라지지 않음 (코어 1개 머신에서는 비슷하게 나옴)
+
+실행:
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --workers 1 2 4 8 --clients 32 --duration 20
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.error
+import urllib.parse
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from suite import REPO_DIR, generate_data, search_keys, search_keywords
+
+# ip.json에 등록된 주소 (IP 검사는 X-Forwarded-For를 먼저 봄)
+CLIENT_IP = "127.0.0.1"
+# 서버가 뜰 때까지 기다리는 최대 시간 (초)
+STARTUP_TIMEOUT = 60
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def request(url: str, data: bytes = None, headers: dict = None) -> int:
+    req = urllib.request.Request(url, data=data, headers={"X-Forwarded-For": CLIENT_IP, **(headers or {})})
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def upload_result(base_url: str, path: str):
+    """multipart/form-data로 결과 파일 업로드 (303 리다이렉트는 따라가지 않아도 됨)"""
+    boundary = f"----loadtest{random.getrandbits(64):x}"
+    with open(path, "rb") as f:
+        content = f.read()
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"result.xlsx\"\r\n"
+            f"Content-Type: application/octet-stream\r\n\r\n").encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    status = request(f"{base_url}/upload_result/ver1", body, {"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    if status not in (200, 303):
+        raise RuntimeError(f"결과 파일 업로드 실패: {status}")
+
+
+def start_server(workers: int, workdir: str, port: int) -> subprocess.Popen:
+    """workdir을 작업 폴더로 uvicorn 실행 (워커끼리 공유하는 DB와 신호 폴더도 workdir 안)"""
+    env = {
+        **os.environ,
+        "PYTHONPATH": REPO_DIR,
+        "WEB_CONCURRENCY": str(workers),
+        "METADATA_DB_PATH": os.path.join(workdir, "metadata.sqlite3"),
+        "SIGNAL_DIR": os.path.join(workdir, "signals"),
+    }
+    cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+           "--workers", str(workers), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, cwd=workdir, env=env)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"서버 실행 실패 (exit code {proc.returncode})")
+        try:
+            if request(f"http://127.0.0.1:{port}/metrics") == 200:
+                return proc
+        except OSError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("서버가 시작되지 않았습니다.")
+
+
+def stop_server(proc: subprocess.Popen):
+    proc.terminate()
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def make_urls(base_url: str, data: dict) -> list[str]:
+    """검색 2 : 부분 문자열 검색 1 : 홈 화면 1 비율의 요청 목록"""
+    keys = search_keys(data)
+    words = search_keywords()
+    urls = []
+    for idx, key in enumerate(keys):
+        urls.append(f"{base_url}/api/search?" + urllib.parse.urlencode({"key": key, "version": "ver1"}))
+        if idx % 2 == 0:
+            urls.append(f"{base_url}/api/search?" + urllib.parse.urlencode({"key": words[idx], "version": "ver1"}))
+            urls.append(f"{base_url}/")
+    return urls
+
+
+def hammer(urls: list[str], clients: int, duration: float) -> dict:
+    """clients개 스레드가 duration초 동안 urls를 돌아가며 요청"""
+    latencies = []
+    failures = 0
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(seed: int):
+        nonlocal failures
+        rng = random.Random(seed)
+        local = []
+        local_failures = 0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                ok = request(rng.choice(urls)) == 200
+            except OSError:
+                ok = False
+            local.append(time.perf_counter() - start)
+            if not ok:
+                local_failures += 1
+        with lock:
+            latencies.extend(local)
+            failures += local_failures
+
+    threads = [threading.Thread(target=client, args=(seed,)) for seed in range(clients)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    latencies.sort()
+
+    def percentile(p: float):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 1) if latencies else None
+
+    return {
+        "requests": len(latencies),
+        "failures": failures,
+        "req_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": percentile(0.5),
+        "p95_ms": percentile(0.95),
+    }
+
+
+def run_workers(workers: int, data: dict, tmp: str, args) -> dict:
+    workdir = os.path.join(tmp, f"workers_{workers}")
+    os.makedirs(os.path.join(workdir, "static"))
+    shutil.copytree(os.path.join(REPO_DIR, "templates"), os.path.join(workdir, "templates"))
+    port = free_port()
+    proc = start_server(workers, workdir, port)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        upload_result(base_url, data["result"])
+        urls = make_urls(base_url, data)
+        # 모든 워커의 결과 캐시가 채워지도록 먼저 한 번씩 요청
+        hammer(urls, args.clients, args.warmup)
+        return hammer(urls, args.clients, args.duration)
+    finally:
+        stop_server(proc)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="측정할 uvicorn 워커 수")
+    parser.add_argument("--clients", type=int, default=16, help="동시에 요청하는 클라이언트 스레드 수")
+    parser.add_argument("--duration", type=float, default=10, help="워커 수별 측정 시간 (초)")
+    parser.add_argument("--warmup", type=float, default=3, help="측정 전에 요청을 보내는 시간 (초)")
+    parser.add_argument("--files", type=int, default=10, help="결과 파일을 만들 데이터 파일 수")
+    parser.add_argument("--rows", type=int, default=2000, help="파일당 행 수")
+    parser.add_argument("--json", help="결과를 저장할 JSON 경로")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"generating {args.files} files x {args.rows} rows ...")
+        data = generate_data(os.path.join(tmp, "data"), args.files, args.rows)
+        for workers in args.workers:
+            print(f"running {workers} worker(s) ...")
+            results[workers] = run_workers(workers, data, tmp, args)
+
+    print(f"cpu_count={os.cpu_count()} clients={args.clients} duration={args.duration}s")
+    print(f"{'workers':>7} {'req/s':>9} {'speedup':>8} {'p50_ms':>8} {'p95_ms':>8} {'failures':>8}")
+    base = results[args.workers[0]]["req_per_s"]
+    for workers, result in results.items():
+        speedup = result["req_per_s"] / base if base else 0
+        print(f"{workers:>7} {result['req_per_s']:>9.1f} {speedup:>7.2f}x {result['p50_ms']:>8} {result['p95_ms']:>8} {result['failures']:>8}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"cpu_count": os.cpu_count(), "clients": args.clients, "duration": args.duration, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+두 결과 파일(B열 키 기준) 비교 시간 측정
+
+실행: python benchmarks/result_diff.py --rows 200000
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+import openpyxl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from routers import diff, snapshot  # noqa: E402
+
+
+def make_sheet(path: str, rows: int, changed_every: int = 0):
+    """결과 파일과 비슷한 시트 생성 (changed_every마다 H열 값을 바꾸고, 마지막에 100행 추가)"""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    for header_row in range(4):
+        ws.append([f"header{header_row}"] * 11)
+    for i in range(rows):
+        signal = f"CAN_RX_SIG{i}"
+        if changed_every and i % changed_every == 0:
+            signal += "_NEW"
+        ws.append([f"user{i % 7}", 1000 + i % 5000, None, "송신" if i % 2 else "수신", "추가",
+                   f"ECU{i % 13}", f"MSG_{i % 97}", signal, "v1", "STD", "반영"])
+    if changed_every:
+        for i in range(100):
+            ws.append(["new", 90000 + i, None, "송신", "추가", "ECU1", "MSG", f"ADDED_{i}", "v1", "STD", "반영"])
+    wb.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--no-snapshot", action="store_true", help="스냅샷 없이 openpyxl로 직접 읽어서 비교")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path = os.path.join(tmp, "old.xlsx")
+        new_path = os.path.join(tmp, "new.xlsx")
+        make_sheet(old_path, args.rows)
+        make_sheet(new_path, args.rows, changed_every=1000)
+        if not args.no_snapshot:
+            # 업로드 시점과 같이 스냅샷을 미리 만들어 둠
+            snapshot.create_snapshot(old_path)
+            snapshot.create_snapshot(new_path)
+
+        start = time.perf_counter()
+        result = diff.diff_workbooks(old_path, new_path)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        diff.diff_workbooks(old_path, new_path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"rows:            {args.rows}")
+        print(f"snapshot:        {not args.no_snapshot}")
+        print(f"summary:         {result['summary']}")
+        print(f"diff time:       {elapsed:.2f} s")
+        print(f"peak memory:     {peak / 1024 / 1024:.1f} MB (tracemalloc)")
+
+
+if __name__ == "__main__":
+    main()
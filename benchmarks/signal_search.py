@@ -0,0 +1,60 @@
+"""
+A, F, G, H, I열 부분 문자열 검색: 행별 루프와 SearchBuffer(이어 붙인 버퍼 + 오프셋) 비교
+
+실행: python benchmarks/signal_search.py --rows 500000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from routers import search_index  # noqa: E402
+from routers.search_buffer import SearchBuffer  # noqa: E402
+
+KEYWORDS = ["can_rx_sig12345", "ecu7", "msg_42", "user3", "없는신호", "v1"]
+
+
+def make_rows(count: int) -> list[tuple]:
+    """결과 파일과 비슷한 A-K열 행 생성"""
+    rng = random.Random(0)
+    return [(f"user{i % 7}", 1000 + i % 5000, None, "송신", "추가", f"ECU{rng.randint(1, 40)}",
+             f"MSG_{rng.randint(1, 999)}", f"CAN_RX_SIG{i}", rng.choice(["v1", "v2", None]), "STD", "반영")
+            for i in range(count)]
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    search_texts = [search_index.make_search_text(row) for row in make_rows(args.rows)]
+    start = time.perf_counter()
+    buffer = SearchBuffer(search_texts)
+    build_time = time.perf_counter() - start
+
+    print(f"rows:            {args.rows}")
+    print(f"buffer build:    {build_time * 1000:.1f} ms ({buffer.nbytes() / 1024 / 1024:.1f} MB)")
+    for keyword in KEYWORDS:
+        expected = [idx for idx, text in enumerate(search_texts) if text is not None and keyword in text]
+        assert buffer.find_rows(keyword) == expected, f"buffer result differs for {keyword!r}"
+
+        loop_time = best_of(args.repeat, lambda: [idx for idx, text in enumerate(search_texts)
+                                                  if text is not None and keyword in text])
+        buffer_time = best_of(args.repeat, lambda: buffer.find_rows(keyword))
+        print(f"{keyword!r:20} matches={len(expected):7}  loop {loop_time * 1000:7.1f} ms  buffer {buffer_time * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
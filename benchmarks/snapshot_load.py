@@ -0,0 +1,65 @@
+"""
+xlsx(openpyxl read-only) 와 열 단위 스냅샷의 시트 로드 시간 비교
+
+실행: python benchmarks/snapshot_load.py --rows 100000
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import openpyxl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from routers import snapshot  # noqa: E402
+
+
+def make_sheet(path: str, rows: int):
+    """A-L열에 결과 파일과 비슷한 값을 채운 시트 생성 (1-4행은 헤더)"""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    for header_row in range(4):
+        ws.append([f"header{header_row}"] * 12)
+    for i in range(rows):
+        ws.append([f"user{i % 7}", 1000 + i % 5000, None, "송신" if i % 2 else "수신", "추가",
+                   f"ECU{i % 13}", f"MSG_{i % 97}", f"CAN_RX_SIG{i}", "v1", "STD", "반영", None])
+    wb.save(path)
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.xlsx")
+        make_sheet(path, args.rows)
+        snapshot.create_snapshot(path)
+
+        xlsx_rows = list(snapshot.iter_openpyxl_rows(path))
+        snap_rows = list(snapshot.iter_sheet_rows(path))
+        assert [tuple(r) for r in xlsx_rows] == snap_rows, "snapshot rows differ from xlsx rows"
+
+        xlsx_time = best_of(args.repeat, lambda: sum(1 for _ in snapshot.iter_openpyxl_rows(path)))
+        snap_time = best_of(args.repeat, lambda: sum(1 for _ in snapshot.iter_sheet_rows(path)))
+
+        print(f"rows:            {args.rows}")
+        print(f"xlsx size:       {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+        print(f"snapshot size:   {os.path.getsize(snapshot.snapshot_path(path)) / 1024 / 1024:.1f} MB")
+        print(f"openpyxl load:   {xlsx_time:.3f} s")
+        print(f"snapshot load:   {snap_time:.3f} s")
+        print(f"speedup:         {xlsx_time / snap_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
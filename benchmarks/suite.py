@@ -0,0 +1,436 @@
+"""
+병합/검색/업로드 경로 벤치마크 - 합성 워크북을 만들어 실제 FastAPI 라우트를 TestClient로 호출
+
+시나리오마다 새 프로세스에서 준비(업로드 등)를 하고, 또 다른 새 프로세스에서 측정하므로
+준비 단계의 메모리 사용이 측정값(peak RSS)에 섞이지 않음
+
+    upload        POST /upload/ver1 로 데이터 파일 전부 올리기 (검증 + 병합 캐시 + 스냅샷)
+    upload_inflated POST /upload/ver1 로 데이터는 몇 행뿐이고 맨 끝 셀(AD1048576)에만 서식이 있는 파일 올리기
+    merge         GET /merge/ver1 (업로드 때 채워진 병합 캐시 사용)
+    merge_cold    GET /merge/ver1 (병합 캐시를 지우고 전부 다시 파싱)
+    merge_legacy  GET /merge/ver1?mode=legacy (전체 로드 + 셀 복사)
+    merge_concurrent 같은 GET /merge/ver1 을 동시에 여러 번 (하나의 병합 작업을 같이 기다리고 모두 200이어야 함)
+    merge_inflated GET /merge/ver1 (데이터 아래 서식만 있는 빈 행이 많은 파일, 병합 캐시와 스냅샷을 지우고 xlsx에서 다시 파싱)
+    search_key    GET /api/search B열 키 검색 (결과 캐시에 올라간 뒤)
+    search_signal GET /api/search 부분 문자열 검색 (결과 캐시에 올라간 뒤)
+    search_cold   GET /api/search 키 검색 (매번 결과 캐시를 비우고 검색 인덱스에서 다시 로드)
+
+기록 값: wall_s(반복 중 가장 짧은 시간), peak_rss_mb(측정 프로세스와 병합 파싱 프로세스 중 최대), rows_per_s
+기준선(JSON)이 없으면 이번 결과를 기준선으로 저장하고, 있으면 비교해서 threshold 넘게 느려지거나
+메모리를 더 쓰면 exit code 1로 끝남 (기준선은 측정한 머신에서만 의미가 있음)
+
+실행:
+    python benchmarks/suite.py
+    python benchmarks/suite.py --files 20 --rows 5000 --update-baseline
+    python benchmarks/suite.py --only merge search_key --threshold 0.3
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill
+
+try:
+    import resource
+except ImportError:  # Windows에는 resource 모듈이 없으므로 peak RSS는 기록하지 않음
+    resource = None
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(REPO_DIR, "benchmarks", "baseline.json")
+SCENARIOS = ["upload", "upload_inflated", "merge", "merge_cold", "merge_legacy", "merge_concurrent", "merge_inflated", "search_key", "search_signal", "search_cold"]
+RESULT_PREFIX = "BENCH_RESULT "
+# 검색 시나리오 한 번에 보내는 질의 수
+SEARCH_QUERIES = 20
+# merge_concurrent 시나리오에서 동시에 보내는 병합 요청 수
+CONCURRENT_MERGES = 4
+# merge_inflated 시나리오 파일의 데이터 아래에 붙이는 서식만 있는 빈 행 수와 파일 수
+INFLATED_EMPTY_ROWS = 50000
+INFLATED_FILES = 2
+# upload_inflated 시나리오 파일의 데이터 행 수와 서식만 있는 셀 (시트 크기가 1,048,576행 x 30열로 잡힘)
+FAR_FORMATTED_ROWS = 24
+FAR_FORMATTED_CELL = "AD1048576"
+
+
+# --- 합성 데이터 ---
+def make_template(path: str):
+    """1-4행 헤더만 있는 template.xlsx"""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws["A1"] = "안건 검토 결과"
+    for col in range(1, 12):
+        ws.cell(row=3, column=col, value=f"H{col}")
+    wb.save(path)
+
+
+def make_data_rows(rows: int, seed: int, start_key: int):
+    """결과 파일과 비슷한 A-K열 행 (37행마다 빈 행, A5는 항상 값이 있음)"""
+    rng = random.Random(seed)
+    for i in range(rows):
+        if i % 37 == 36:
+            yield [None] * 11
+            continue
+        yield [f"user{rng.randint(1, 5)}", start_key + i % 500, None, rng.choice(["송신", "수신"]), "추가",
+               f"ECU{rng.randint(1, 40)}", f"MSG_{rng.randint(1, 999)}", f"CAN_RX_SIG{rng.randint(1, 99999)}",
+               rng.choice(["v1", "v2", None]), "STD", rng.choice([None, "반영", "기반영"])]
+
+
+def make_workbook(path: str, row_blocks):
+    """4행 헤더 아래에 row_blocks의 행을 차례로 쓴 워크북 (write-only)"""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    for header_row in range(4):
+        ws.append([f"header{header_row}"] + [None] * 10)
+    for rows in row_blocks:
+        for row in rows:
+            ws.append(row)
+    wb.save(path)
+
+
+def make_inflated_workbook(path: str, rows, empty_rows: int):
+    """rows 아래에 채우기 서식만 있는 빈 행을 empty_rows개 붙인 워크북 (시트 크기가 부풀려진 업로드 파일 흉내)"""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    for header_row in range(4):
+        ws.append([f"header{header_row}"] + [None] * 10)
+    for row in rows:
+        ws.append(row)
+    fill = PatternFill("solid", fgColor="FFFF00")
+    for _ in range(empty_rows):
+        cell = WriteOnlyCell(ws, value=None)
+        cell.fill = fill
+        ws.append([cell])
+    wb.save(path)
+
+
+def make_far_formatted_workbook(path: str, rows):
+    """rows 아래 시트 맨 끝 셀(FAR_FORMATTED_CELL)에만 채우기 서식이 있는 워크북 (시트 크기만 최대로 잡힌 업로드 파일 흉내)"""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for header_row in range(1, 5):
+        ws.cell(row=header_row, column=1, value=f"header{header_row}")
+    for row_idx, row in enumerate(rows, start=5):
+        for col_idx, value in enumerate(row, start=1):
+            if value is not None:
+                ws.cell(row=row_idx, column=col_idx, value=value)
+    ws[FAR_FORMATTED_CELL].fill = PatternFill("solid", fgColor="FFFF00")
+    wb.save(path)
+
+
+def generate_data(data_dir: str, files: int, rows: int) -> dict:
+    """template.xlsx, 데이터 파일 files개(각 rows행), 데이터 파일 전체를 이어 붙인 결과 파일 생성 (항상 같은 내용)"""
+    os.makedirs(data_dir, exist_ok=True)
+    make_template(os.path.join(data_dir, "template.xlsx"))
+    data_files = []
+    for idx in range(files):
+        path = os.path.join(data_dir, f"data_{idx:03d}.xlsx")
+        make_workbook(path, [make_data_rows(rows, seed=idx, start_key=1000 + idx * 500)])
+        data_files.append(path)
+    result_path = os.path.join(data_dir, "result.xlsx")
+    make_workbook(result_path, [make_data_rows(rows, seed=idx, start_key=1000 + idx * 500) for idx in range(files)])
+    inflated_files = []
+    for idx in range(INFLATED_FILES):
+        path = os.path.join(data_dir, f"inflated_{idx:03d}.xlsx")
+        make_inflated_workbook(path, make_data_rows(rows, seed=idx, start_key=1000 + idx * 500), INFLATED_EMPTY_ROWS)
+        inflated_files.append(path)
+    far_formatted_path = os.path.join(data_dir, "far_formatted.xlsx")
+    make_far_formatted_workbook(far_formatted_path, make_data_rows(FAR_FORMATTED_ROWS, seed=0, start_key=1000))
+    return {"template": os.path.join(data_dir, "template.xlsx"), "data_files": data_files, "result": result_path,
+            "inflated_files": inflated_files, "far_formatted_files": [far_formatted_path]}
+
+
+# --- 측정 프로세스 ---
+def peak_rss_mb():
+    """이 프로세스와 끝난 자식 프로세스 중 가장 큰 최대 RSS (MB), resource 모듈이 없으면 None"""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # macOS는 바이트, Linux는 KB 단위
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def open_app(workdir: str):
+    """workdir을 작업 폴더로 해서 앱을 띄운 TestClient (메타데이터 DB는 workdir 안, IP 검사는 통과)"""
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_DIR)
+    from routers import metadata_store
+    metadata_store.METADATA_DB_PATH = os.path.join(workdir, "metadata.sqlite3")
+    metadata_store.FILE_OWNERSHIP_PATH = os.path.join(workdir, "file_ownership.json")
+    metadata_store.AGENDA_PATH = os.path.join(workdir, "agenda_no.json")
+
+    from fastapi.testclient import TestClient
+    from routers.authentification import verify_ip_whitelist
+    import main
+    main.app.dependency_overrides[verify_ip_whitelist] = lambda: "127.0.0.1"
+    return TestClient(main.app)
+
+
+def check(response, expected: int = 200):
+    if response.status_code != expected:
+        raise RuntimeError(f"{response.request.method} {response.request.url} -> {response.status_code}: {response.text[:200]}")
+    return response
+
+
+def upload_data_files(client, data: dict, key: str = "data_files"):
+    for path in data[key]:
+        with open(path, "rb") as f:
+            check(client.post("/upload/ver1", files={"file": (os.path.basename(path), f)}, follow_redirects=False), 303)
+
+
+def upload_template(client, data: dict):
+    with open(data["template"], "rb") as f:
+        check(client.post("/upload_template", files={"file": ("template.xlsx", f)}, follow_redirects=False), 303)
+
+
+def upload_result(client, data: dict):
+    with open(data["result"], "rb") as f:
+        check(client.post("/upload_result/ver1", files={"file": ("result.xlsx", f)}, follow_redirects=False), 303)
+
+
+def clear_version_dir():
+    """uploads/ver1의 데이터 파일과 병합 캐시 삭제"""
+    version_dir = os.path.join("uploads", "ver1")
+    for name in os.listdir(version_dir):
+        if name.endswith(".xlsx"):
+            os.remove(os.path.join(version_dir, name))
+    shutil.rmtree(version_dir + ".mergecache", ignore_errors=True)
+
+
+def clear_merge_cache_and_snapshots():
+    """병합 캐시와 스냅샷을 지워서 다음 병합이 xlsx를 다시 파싱하도록 함"""
+    version_dir = os.path.join("uploads", "ver1")
+    for name in os.listdir(version_dir):
+        if name.startswith("."):
+            os.remove(os.path.join(version_dir, name))
+    shutil.rmtree(version_dir + ".mergecache", ignore_errors=True)
+
+
+def clear_merge_outputs():
+    """기록된 병합 결과 파일 목록을 지워서 다음 병합이 새 병합 작업을 만들도록 함 (파싱 캐시는 그대로)"""
+    path = os.path.join("uploads", "ver1.mergecache", "outputs.json")
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def run_concurrent_merges(client):
+    """같은 병합 요청을 CONCURRENT_MERGES개 동시에 보내고 모두 200인지 확인"""
+    with ThreadPoolExecutor(max_workers=CONCURRENT_MERGES) as executor:
+        responses = list(executor.map(lambda _: client.get("/merge/ver1"), range(CONCURRENT_MERGES)))
+    for response in responses:
+        check(response)
+
+
+def clear_result_cache():
+    from routers.result_cache import result_cache, invalidate_latest
+    result_cache.invalidate()
+    invalidate_latest("ver1")
+
+
+def search_keys(data: dict) -> list[str]:
+    """데이터에 있는 B열 키 SEARCH_QUERIES개"""
+    rng = random.Random(1)
+    return [str(1000 + rng.randrange(len(data["data_files"]) * 500)) for _ in range(SEARCH_QUERIES)]
+
+
+def search_keywords() -> list[str]:
+    """부분 문자열 검색어 SEARCH_QUERIES개 (좁은 검색어와 넓은 검색어 섞어서)"""
+    rng = random.Random(2)
+    words = [f"can_rx_sig{rng.randint(1, 99999)}" for _ in range(SEARCH_QUERIES - 4)]
+    return words + ["ecu7", "msg_42", "user3", "없는신호"]
+
+
+def run_queries(client, keys: list[str]):
+    for key in keys:
+        check(client.get("/api/search", params={"key": key, "version": "ver1"}))
+
+
+# 시나리오: (준비, 매 반복 전 초기화(시간 제외), 측정할 작업, 처리한 행 수)
+def scenario_steps(name: str, data: dict, rows: int):
+    total_rows = rows * len(data["data_files"])
+    keys = search_keys(data)
+    if name == "upload":
+        return None, clear_version_dir, lambda client: upload_data_files(client, data), total_rows
+    if name == "upload_inflated":
+        return None, clear_version_dir, lambda client: upload_data_files(client, data, "far_formatted_files"), FAR_FORMATTED_ROWS
+    if name in ("merge", "merge_cold", "merge_legacy"):
+        def prepare(client):
+            upload_template(client, data)
+            upload_data_files(client, data)
+        reset = (lambda: shutil.rmtree(os.path.join("uploads", "ver1.mergecache"), ignore_errors=True)) if name == "merge_cold" else None
+        path = "/merge/ver1?mode=legacy" if name == "merge_legacy" else "/merge/ver1"
+        return prepare, reset, lambda client: check(client.get(path)), total_rows
+    if name == "merge_concurrent":
+        def prepare(client):
+            upload_template(client, data)
+            upload_data_files(client, data)
+        return prepare, clear_merge_outputs, run_concurrent_merges, total_rows
+    if name == "merge_inflated":
+        def prepare(client):
+            upload_template(client, data)
+            upload_data_files(client, data, "inflated_files")
+        return prepare, clear_merge_cache_and_snapshots, lambda client: check(client.get("/merge/ver1")), rows * len(data["inflated_files"])
+    if name == "search_key":
+        return (lambda client: upload_result(client, data)), None, lambda client: run_queries(client, keys), total_rows * len(keys)
+    if name == "search_signal":
+        words = search_keywords()
+        return (lambda client: upload_result(client, data)), None, lambda client: run_queries(client, words), total_rows * len(words)
+    if name == "search_cold":
+        return (lambda client: upload_result(client, data)), clear_result_cache, lambda client: run_queries(client, keys[:1]), total_rows
+    raise ValueError(f"unknown scenario: {name}")
+
+
+def worker(args):
+    """--worker 로 실행된 자식 프로세스: 준비 또는 측정 한 단계만 실행"""
+    with open(args.data_index, encoding="utf-8") as f:
+        data = json.load(f)
+    prepare, reset, run, rows = scenario_steps(args.worker, data, args.rows)
+    client = open_app(args.workdir)
+
+    if args.phase == "prepare":
+        if prepare is not None:
+            prepare(client)
+        return
+
+    # 검색 시나리오는 한 번 먼저 실행해서 결과 캐시를 채움 (search_cold는 매번 reset에서 비움)
+    if args.worker.startswith("search"):
+        run(client)
+    timings = []
+    for _ in range(args.repeat):
+        if reset is not None:
+            reset()
+        start = time.perf_counter()
+        run(client)
+        timings.append(time.perf_counter() - start)
+
+    # 병합 파싱 프로세스 풀을 정리해야 자식 프로세스의 RSS가 RUSAGE_CHILDREN에 잡힘
+    from routers import merge_engine
+    if merge_engine._parse_pool is not None:
+        merge_engine._parse_pool.shutdown()
+    wall = min(timings)
+    rss = peak_rss_mb()
+    print(RESULT_PREFIX + json.dumps({
+        "wall_s": round(wall, 4),
+        "peak_rss_mb": round(rss, 1) if rss is not None else None,
+        "rows_per_s": round(rows / wall, 1) if wall > 0 else None,
+    }))
+
+
+def run_phase(name: str, phase: str, workdir: str, data_index: str, args) -> str:
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", name, "--phase", phase, "--workdir", workdir,
+           "--data-index", data_index, "--rows", str(args.rows), "--repeat", str(args.repeat)]
+    proc = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8")
+    if proc.returncode != 0:
+        raise RuntimeError(f"{name} ({phase}) 실패:\n{proc.stderr[-2000:]}")
+    return proc.stdout
+
+
+def run_scenario(name: str, data_index: str, tmp: str, args) -> dict:
+    """새 작업 폴더를 만들어 준비 프로세스, 측정 프로세스를 차례로 실행"""
+    workdir = os.path.join(tmp, name)
+    os.makedirs(os.path.join(workdir, "static"))
+    shutil.copytree(os.path.join(REPO_DIR, "templates"), os.path.join(workdir, "templates"))
+    run_phase(name, "prepare", workdir, data_index, args)
+    output = run_phase(name, "measure", workdir, data_index, args)
+    for line in output.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"{name}: 측정 결과가 없습니다.\n{output[-2000:]}")
+
+
+# --- 기준선 비교 ---
+def compare(results: dict, baseline: dict, threshold: float, rss_threshold: float) -> list[str]:
+    """기준선보다 threshold(비율) 넘게 느려졌거나 rss_threshold 넘게 메모리를 더 쓴 시나리오 목록"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        if current["wall_s"] > base["wall_s"] * (1 + threshold):
+            regressions.append(f"{name}: wall {base['wall_s']:.3f}s -> {current['wall_s']:.3f}s")
+        if current["peak_rss_mb"] and base["peak_rss_mb"] and current["peak_rss_mb"] > base["peak_rss_mb"] * (1 + rss_threshold):
+            regressions.append(f"{name}: peak RSS {base['peak_rss_mb']:.1f}MB -> {current['peak_rss_mb']:.1f}MB")
+    return regressions
+
+
+def print_table(results: dict, baseline: dict = None):
+    def cell(value, spec: str, width: int) -> str:
+        return format(format(value, spec) if value is not None else "-", f">{width}")
+
+    print(f"{'scenario':<14} {'wall_s':>9} {'base':>9} {'rss_mb':>8} {'base':>8} {'rows/s':>12}")
+    for name, current in results.items():
+        base = (baseline or {}).get("results", {}).get(name, {})
+        print(f"{name:<14} {cell(current['wall_s'], '.3f', 9)} {cell(base.get('wall_s'), '.3f', 9)} "
+              f"{cell(current['peak_rss_mb'], '.1f', 8)} {cell(base.get('peak_rss_mb'), '.1f', 8)} "
+              f"{cell(current['rows_per_s'], ',.0f', 12)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=10, help="데이터 파일 수")
+    parser.add_argument("--rows", type=int, default=2000, help="파일당 행 수")
+    parser.add_argument("--repeat", type=int, default=3, help="시나리오별 반복 횟수 (가장 짧은 시간을 기록)")
+    parser.add_argument("--only", nargs="+", choices=SCENARIOS, help="실행할 시나리오")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="기준선 JSON 경로")
+    parser.add_argument("--update-baseline", action="store_true", help="비교하지 않고 이번 결과로 기준선을 덮어씀")
+    parser.add_argument("--threshold", type=float, default=0.25, help="허용하는 wall time 증가 비율")
+    parser.add_argument("--rss-threshold", type=float, default=0.25, help="허용하는 peak RSS 증가 비율")
+    # 자식 프로세스용
+    parser.add_argument("--worker", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--phase", choices=["prepare", "measure"], help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    parser.add_argument("--data-index", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    config = {"files": args.files, "rows": args.rows, "repeat": args.repeat}
+    baseline = None
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print(f"기준선 설정 {baseline.get('config')}과 이번 설정 {config}이 다릅니다. --update-baseline으로 다시 기록하세요.")
+            sys.exit(2)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"generating {args.files} files x {args.rows} rows ...")
+        data = generate_data(os.path.join(tmp, "data"), args.files, args.rows)
+        data_index = os.path.join(tmp, "data.json")
+        with open(data_index, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        for name in args.only or SCENARIOS:
+            print(f"running {name} ...")
+            results[name] = run_scenario(name, data_index, tmp, args)
+
+    print_table(results, baseline)
+
+    if baseline is None:
+        record = {"config": config, "python": platform.python_version(), "platform": platform.platform(),
+                  "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2, ensure_ascii=False)
+        print(f"기준선 저장: {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.threshold, args.rss_threshold)
+    if regressions:
+        print("성능 저하:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("기준선 대비 성능 저하 없음")
+
+
+if __name__ == "__main__":
+    main()
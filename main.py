@@ -1,8 +1,13 @@
+import os
 from fastapi import FastAPI
 import uvicorn
 import routers.api as api
 import routers.search as search
 import routers.menu as menu
+import routers.diff as diff
+import routers.metrics as metrics
+from routers.upload_pipeline import UploadSizeLimitMiddleware
+from routers.metrics import MetricsMiddleware
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 
@@ -13,13 +18,28 @@ templates = Jinja2Templates(directory="templates")
 # css, js용
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+# 업로드 요청 크기 제한 (본문을 다 받기 전에 413으로 거절)
+app.add_middleware(UploadSizeLimitMiddleware)
+
+# 요청별 처리 시간 기록 (가장 바깥에 두어 413 응답까지 포함, /metrics로 조회)
+app.add_middleware(MetricsMiddleware)
+
 # router 추가
 app.include_router(api.router)
 app.include_router(search.router)
 app.include_router(menu.router)
+app.include_router(diff.router)
+app.include_router(metrics.router)
+
 
+# 웹 워커 프로세스 수 (1보다 크면 reload 없이 여러 프로세스로 실행)
+# 워커끼리는 json/metadata.sqlite3, uploads 폴더, json/signals의 변경 신호로 상태를 공유
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", "1"))
 
 # run server by 'python main.py' in windows
 if __name__ == '__main__':
     #uvicorn.run('main:app', reload=True)
-    uvicorn.run('main:app', host="0.0.0.0", port=80, reload=True)
\ No newline at end of file
+    if WEB_CONCURRENCY > 1:
+        uvicorn.run('main:app', host="0.0.0.0", port=80, workers=WEB_CONCURRENCY)
+    else:
+        uvicorn.run('main:app', host="0.0.0.0", port=80, reload=True)
\ No newline at end of file
@@ -0,0 +1,85 @@
+import threading
+from routers import metadata_store, shared_state
+
+
+class AgendaIndex:
+    """
+    안건 번호 양방향 인덱스 (메모리)
+    - 사용자 -> 버전별 안건 번호, 버전별 안건 번호 -> 사용자 집합
+    - 사용자별 ver1/ver2 합집합(정렬)은 번호가 바뀔 때 미리 계산해 두고 조회 때는 그대로 리턴
+    - 처음 사용할 때 metadata_store에서 한 번 읽고, 이후에는 match_agenda_user가 set_numbers()로 갱신
+    - 다른 워커 프로세스가 번호를 바꾸면 신호(shared_state.Signal)를 보고 metadata_store에서 다시 읽음
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._by_user = {}  # user -> {version: frozenset(numbers)}
+        self._by_number = {}  # version -> {number: set(users)}
+        self._unions = {}  # user -> 정렬된 ver1/ver2 합집합 tuple
+        self._signal = shared_state.Signal("agenda")
+
+    def _ensure_loaded(self):
+        if self._loaded and self._signal.changed():
+            self.invalidate()
+        if self._loaded:
+            return
+        agenda = metadata_store.load_all_agenda_numbers()
+        with self._lock:
+            if self._loaded:
+                return
+            for user, versions in agenda.items():
+                self._by_user[user] = {}
+                for version, numbers in versions.items():
+                    self._replace(user, version, numbers)
+                self._unions[user] = self._make_union(user)
+            self._loaded = True
+
+    def _replace(self, user: str, version: str, numbers):
+        """사용자의 해당 버전 번호를 교체하고 역방향 인덱스도 맞춤 (_lock 안에서 호출)"""
+        by_number = self._by_number.setdefault(version, {})
+        old_numbers = self._by_user.setdefault(user, {}).get(version, frozenset())
+        new_numbers = frozenset(int(number) for number in numbers)
+        for number in old_numbers - new_numbers:
+            owners = by_number.get(number)
+            if owners is not None:
+                owners.discard(user)
+                if not owners:
+                    del by_number[number]
+        for number in new_numbers - old_numbers:
+            by_number.setdefault(number, set()).add(user)
+        self._by_user[user][version] = new_numbers
+
+    def _make_union(self, user: str) -> tuple:
+        return tuple(sorted(set().union(*self._by_user.get(user, {}).values())))
+
+    def set_numbers(self, user: str, version: str, numbers):
+        """사용자의 해당 버전 안건 번호를 통째로 교체 (metadata_store에 저장한 뒤 호출)"""
+        self._ensure_loaded()
+        with self._lock:
+            self._replace(user, version, numbers)
+            self._unions[user] = self._make_union(user)
+        self._signal.notify()
+
+    def union_of(self, user: str):
+        """사용자의 ver1/ver2 안건 번호 합집합 (정렬된 tuple, 등록된 사용자가 아니면 None)"""
+        self._ensure_loaded()
+        return self._unions.get(user)
+
+    def owners_of(self, number: int, version: str = None) -> dict:
+        """안건 번호를 가진 사용자 {version: [users]} (version이 주어지면 그 버전만)"""
+        self._ensure_loaded()
+        with self._lock:
+            versions = [version] if version is not None else sorted(set(self._by_number) | {"ver1", "ver2"})
+            return {v: sorted(self._by_number.get(v, {}).get(number, ())) for v in versions}
+
+    def invalidate(self):
+        """다음 조회 때 metadata_store에서 다시 읽도록 비움"""
+        with self._lock:
+            self._by_user = {}
+            self._by_number = {}
+            self._unions = {}
+            self._loaded = False
+
+
+agenda_index = AgendaIndex()
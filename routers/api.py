@@ -1,21 +1,26 @@
 import os
-import shutil
+import uuid
+import asyncio
+import sqlite3
 import openpyxl
-import json
 from datetime import datetime
 from fastapi import Request, UploadFile, File, APIRouter, Query, HTTPException, Depends
-from fastapi.responses import HTMLResponse, FileResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, FileResponse, RedirectResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 from routers.authentification import verify_ip_whitelist
-from routers.menu import match_agenda_user
+from routers.menu import match_agenda_user, match_agenda_users
+from routers import downloads, file_catalog, merge_engine, merge_jobs, metrics, search_index, metadata_store, snapshot, upload_pipeline
+from routers.result_cache import invalidate_latest, result_cache
 
 # --- Configuration ---
 UPLOADS_DIR = "uploads"
 TEMPLATE_FILENAME = "template.xlsx"
 MASTER_MERGE_FILENAME = "master.xlsx"
 VERSIONS = ["ver1", "ver2"]
-FILE_OWNERSHIP_PATH = "json/file_ownership.json"
+MERGED_OUTPUT_DIRNAME = "mergedoutput"
+MERGE_MODES = ["stream", "dedupe", "legacy"]
 # Keywords to match in uploaded result filenames for agenda tracking 이름을 기반으로 아젠다 파일 내 번호 추적
 AGENDA_KEYWORDS = ["김철수", "이영희", "admin"]
 
@@ -25,6 +30,12 @@ for version in VERSIONS:
     os.makedirs(os.path.join(UPLOADS_DIR, version, "results"), exist_ok=True)
     os.makedirs(os.path.join(UPLOADS_DIR, version, "masterdb"), exist_ok=True)
 
+# 홈 화면에 보여줄 폴더들의 파일 목록 (업로드/삭제 시 갱신, 주기적으로 전체 재검색)
+catalog = file_catalog.FileCatalog(
+    UPLOADS_DIR,
+    [""] + [folder for version in VERSIONS for folder in (version, f"{version}/results", f"{version}/masterdb")]
+)
+
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 router.mount("/static", StaticFiles(directory="static"), name="static")
@@ -37,76 +48,58 @@ def get_version_dir(version: str):
 
 
 # --- 파일 소유권 관리 함수들 ---
+# 소유권 정보는 metadata_store(SQLite)에 파일 단위로 저장 (JSON 전체를 다시 쓰지 않음)
 def load_file_ownership():
     """파일 소유권 정보 로드"""
-    if os.path.exists(FILE_OWNERSHIP_PATH):
-        with open(FILE_OWNERSHIP_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
-
-def save_file_ownership(data):
-    """파일 소유권 정보 저장"""
-    with open(FILE_OWNERSHIP_PATH, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    return metadata_store.load_file_ownership()
 
 def register_file_owner(version: str, filename: str, ip: str):
     """파일 업로드 시 소유자 IP 등록 (날짜/시간 포함)"""
-    ownership = load_file_ownership()
-    if version not in ownership:
-        ownership[version] = {}
+    register_file_owners(version, [filename], ip)
 
+def register_file_owners(version: str, filenames: list[str], ip: str):
+    """여러 파일의 소유자 IP를 한 트랜잭션으로 등록 (벌크 업로드)"""
+    if not filenames:
+        return
     now = datetime.now()
-    upload_info = {
-        "ip": ip,
-        "upload_date": now.strftime("%Y-%m-%d"),
-        "upload_time": now.strftime("%H:%M:%S")
-    }
-    ownership[version][filename] = upload_info
-    save_file_ownership(ownership)
+    upload_date, upload_time = now.strftime("%Y-%m-%d"), now.strftime("%H:%M:%S")
+    metadata_store.upsert_file_owners([(version, filename, ip, upload_date, upload_time) for filename in filenames])
+    for filename in filenames:
+        catalog.add(version, filename, owner=ip, upload_time=f"{upload_date} {upload_time}")
 
 def check_file_owner(version: str, filename: str, ip: str) -> bool:
     """현재 IP가 해당 파일의 소유자인지 확인"""
-    ownership = load_file_ownership()
-    file_info = ownership.get(version, {}).get(filename)
-    if isinstance(file_info, dict):
-        return file_info.get("ip") == ip
-    # 이전 버전 호환성 (IP만 문자열로 저장된 경우)
-    return file_info == ip
+    file_info = metadata_store.get_file_owner(version, filename)
+    return file_info is not None and file_info["ip"] == ip
 
 
+# 다른 워커가 파일을 바꿨으면 카탈로그가 폴더를 다시 읽으므로(디렉토리 검색 + SQLite) async가 아닌 일반 함수로 두어
+# 스레드 풀에서 실행 (이벤트 루프를 막지 않도록)
 @router.get("/", response_class=HTMLResponse)
-async def read_home(request: Request, client_ip: str = Depends(verify_ip_whitelist)):
+def read_home(request: Request, client_ip: str = Depends(verify_ip_whitelist)):
     """
     This endpoint serves the home page.
     It now separates the template file from the data files for display.
     """
-    try:
-        all_files = os.listdir(UPLOADS_DIR)
-        files1 = os.listdir(UPLOADS_DIR+"/ver1")
-        files2 = os.listdir(UPLOADS_DIR+"/ver2")
-        template_file = TEMPLATE_FILENAME if TEMPLATE_FILENAME in all_files else None
-        data_files1 = [f for f in files1 if f not in [TEMPLATE_FILENAME, 'merged_output_r1.xlsx']]
-        data_files2 = [f for f in files2 if f not in [TEMPLATE_FILENAME, 'merged_output_r2.xlsx']]
-
-        # results 폴더의 파일 리스트 가져오기
-        results_files1 = os.listdir(UPLOADS_DIR+"/ver1/results")
-        results_files2 = os.listdir(UPLOADS_DIR+"/ver2/results")
-
-        # masterdb 폴더의 파일 리스트 가져오기
-        masterdb_files1 = os.listdir(UPLOADS_DIR+"/ver1/masterdb")
-        masterdb_files2 = os.listdir(UPLOADS_DIR+"/ver2/masterdb")
-    except OSError:
-        template_file = None
-        data_files1 = []
-        data_files2 = []
-        results_files1 = []
-        results_files2 = []
-        masterdb_files1 = []
-        masterdb_files2 = []
-
-    # 삭제 가능 여부 판단 (일반 데이터 파일만)
-    deletable_files1 = {f: check_file_owner("ver1", f, client_ip) for f in data_files1}
-    deletable_files2 = {f: check_file_owner("ver2", f, client_ip) for f in data_files2}
+    # 파일 목록은 메모리의 카탈로그에서 가져옴 (파일 시스템 접근 없음)
+    all_files = catalog.names("")
+    files1 = catalog.files("ver1")
+    files2 = catalog.files("ver2")
+    template_file = TEMPLATE_FILENAME if TEMPLATE_FILENAME in all_files else None
+    data_files1 = [f.name for f in files1 if f.name not in [TEMPLATE_FILENAME, 'merged_output_r1.xlsx']]
+    data_files2 = [f.name for f in files2 if f.name not in [TEMPLATE_FILENAME, 'merged_output_r2.xlsx']]
+
+    # results 폴더의 파일 리스트 가져오기
+    results_files1 = catalog.names("ver1/results")
+    results_files2 = catalog.names("ver2/results")
+
+    # masterdb 폴더의 파일 리스트 가져오기
+    masterdb_files1 = catalog.names("ver1/masterdb")
+    masterdb_files2 = catalog.names("ver2/masterdb")
+
+    # 삭제 가능 여부 판단 (일반 데이터 파일만) - 카탈로그에 있는 소유자 IP와 비교
+    deletable_files1 = {f.name: f.owner == client_ip for f in files1 if f.name in data_files1}
+    deletable_files2 = {f.name: f.owner == client_ip for f in files2 if f.name in data_files2}
 
     context = {
         "request": request,
@@ -137,8 +130,8 @@ async def handle_upload_template(
     It will always be saved as 'template.xlsx'.
     """
     file_path = os.path.join(UPLOADS_DIR, TEMPLATE_FILENAME)
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    await upload_pipeline.save_upload(file, file_path, kind="template")
+    await run_in_threadpool(catalog.add, "", TEMPLATE_FILENAME)
     return RedirectResponse(url="/", status_code=303)
 
 
@@ -154,8 +147,18 @@ async def upload_result(
     filename = f"result_{version}_{timestamp}.xlsx"
     results_dir = os.path.join(get_version_dir(version), "results")
     file_path = os.path.join(results_dir, filename)
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    await upload_pipeline.save_upload(file, file_path, kind="result")
+    await run_in_threadpool(catalog.add, f"{version}/results", filename)
+
+    # 검색 쪽에서 기억해 둔 최신 결과 파일 정보를 버려서 새 파일이 바로 검색되도록 함
+    invalidate_latest(version)
+
+    # 열 단위 스냅샷과 검색용 인덱스를 업로드 시점에 한 번만 만들어 둠 (실패해도 검색 시 다시 만듦)
+    try:
+        await run_in_threadpool(snapshot.create_snapshot, file_path, merge_engine.DEFAULT_SCHEMA.stop_after_empty_rows)
+        await run_in_threadpool(search_index.build_index, get_version_dir(version), file_path)
+    except Exception as e:
+        print(f"Error indexing result file {filename}: {e}")
     return RedirectResponse(url="/", status_code=303)
 
 
@@ -165,56 +168,105 @@ async def handle_upload(
     file: UploadFile = File(...),
     client_ip: str = Depends(verify_ip_whitelist)
 ):
-    file_path = os.path.join(get_version_dir(version), file.filename)
+    # 경로가 붙은 이름이나 숨김 파일 이름(스냅샷 등 내부 파일 자리)은 받지 않음
+    filename = upload_pipeline.safe_upload_filename(file.filename)
+    if filename is None:
+        return HTMLResponse(content="Invalid filename.", status_code=400)
+    file_path = os.path.join(get_version_dir(version), filename)
     # Prevent overwriting the template with a data file of the same name
-    if file.filename == TEMPLATE_FILENAME:
+    if filename == TEMPLATE_FILENAME:
         return HTMLResponse(content="Cannot upload a data file with the name 'template.xlsx'. Please use the dedicated template upload button.", status_code=400)
 
-    # 임시로 파일 저장
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # 임시 파일로 나눠 받으면서 해시 계산 (검증을 통과해야 최종 위치로 옮김)
+    stored = await upload_pipeline.stream_to_temp(file, get_version_dir(version))
 
-    # A5 셀 검증
-    try:
-        wb = openpyxl.load_workbook(file_path)
-        ws = wb.active
-        a5_value = ws['A5'].value
-        wb.close()
-
-        # A5 셀이 비어있거나 None이면 업로드 거부
-        if a5_value is None or str(a5_value).strip() == "":
-            os.remove(file_path)  # 업로드된 파일 삭제
-            return HTMLResponse(content="DRM을 해제해 평문으로 올려주세요", status_code=400)
-    except Exception as e:
-        # 파일 읽기 오류 시 파일 삭제
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        return HTMLResponse(content=f"파일을 읽는 중 오류가 발생했습니다: {str(e)}", status_code=400)
+    # 파일을 한 번만 읽어서 A5 셀 검증, B열 안건 번호 추출, 병합 캐시/스냅샷 생성 (A5 셀이 비어있으면 거절)
+    cache_dir = merge_engine.get_merge_cache_dir(get_version_dir(version))
+    [check] = await upload_pipeline.process_uploads([(stored, file_path)], cache_dir)
+    if not check.accepted:
+        return HTMLResponse(content=check.reason, status_code=400)
 
     # A5 셀에 데이터가 있으면 IP와 업로드 정보 등록
-    register_file_owner(version, file.filename, client_ip)
+    await run_in_threadpool(register_file_owner, version, filename, client_ip)
 
-    # Check if filename contains any agenda keywords and update agenda_no.json
-    match_agenda_user(file.filename, version, file_path, AGENDA_KEYWORDS)
+    # Check if filename contains any agenda keywords and update the agenda numbers
+    match_agenda_user(filename, version, file_path, AGENDA_KEYWORDS, check.agenda_numbers)
 
     return RedirectResponse(url="/", status_code=303)
 
 
+@router.post("/upload/{version}/bulk")
+async def handle_bulk_upload(
+    version: str,
+    files: list[UploadFile] = File(...),
+    client_ip: str = Depends(verify_ip_whitelist)
+):
+    """
+    여러 데이터 파일(또는 .xlsx 파일들을 담은 zip 하나)을 한 번에 업로드
+    - 파일마다 /upload/{version}과 같은 검증(A5 셀, B열 안건 번호)을 프로세스 풀에서 병렬로 실행
+    - 통과한 파일의 소유자와 안건 번호는 마지막에 한 트랜잭션씩으로 기록
+    - 파일별 통과/거절 결과를 JSON으로 리턴
+    """
+    if version not in VERSIONS:
+        raise HTTPException(status_code=400, detail="Invalid version specified.")
+    version_dir = get_version_dir(version)
+
+    items = await upload_pipeline.receive_bulk(files, version_dir)
+    uploads = []
+    reports = {}
+    for idx, item in enumerate(items):
+        if item.stored is None:
+            reports[idx] = {"filename": item.filename, "accepted": False, "reason": item.reason}
+        elif item.filename == TEMPLATE_FILENAME:
+            upload_pipeline.discard_upload(item.stored.path)
+            reports[idx] = {"filename": item.filename, "accepted": False, "reason": "template.xlsx는 템플릿 업로드 버튼으로 올려주세요."}
+        else:
+            uploads.append((idx, item))
+
+    cache_dir = merge_engine.get_merge_cache_dir(version_dir)
+    checks = await upload_pipeline.process_uploads(
+        [(item.stored, os.path.join(version_dir, item.filename)) for _, item in uploads], cache_dir
+    )
+    for (idx, _), check in zip(uploads, checks):
+        reports[idx] = {"filename": check.filename, "accepted": check.accepted, "reason": check.reason, "rows": check.row_count}
+
+    # 소유자/안건 번호는 파일마다 쓰지 않고 한 번에 기록
+    accepted = [check for check in checks if check.accepted]
+    await run_in_threadpool(register_file_owners, version, [check.filename for check in accepted], client_ip)
+    matched = await run_in_threadpool(
+        match_agenda_users, version, [(check.filename, check.agenda_numbers) for check in accepted], AGENDA_KEYWORDS
+    )
+    for report in reports.values():
+        if report["filename"] in matched and report["accepted"]:
+            report["agenda_user"] = matched[report["filename"]]
+
+    return {
+        "version": version,
+        "accepted": len(accepted),
+        "rejected": len(items) - len(accepted),
+        "files": [reports[idx] for idx in range(len(items))],
+    }
+
+
 # 마스터 DB 업로드
 @router.post("/upload/{version}/masterdb", response_class=RedirectResponse)
 async def upload_masterdb(
     version: str,
     file: UploadFile = File(...),
 ):
+    filename = upload_pipeline.safe_upload_filename(file.filename)
+    if filename is None:
+        return HTMLResponse(content="Invalid filename.", status_code=400)
     masterdb_dir = os.path.join(get_version_dir(version), "masterdb")
-    file_path = os.path.join(masterdb_dir, file.filename)
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    file_path = os.path.join(masterdb_dir, filename)
+    await upload_pipeline.save_upload(file, file_path, kind="masterdb")
+    await run_in_threadpool(catalog.add, f"{version}/masterdb", filename)
     return RedirectResponse(url="/", status_code=303)
 
 
 @router.get("/download/{version}/{filename:path}", response_class=FileResponse)
 async def handle_download(
+    request: Request,
     version: str,
     filename: str,
     client_ip: str = Depends(verify_ip_whitelist)
@@ -223,7 +275,8 @@ async def handle_download(
     if os.path.exists(file_path):
         # 실제 파일명만 추출 (경로 제외)
         actual_filename = os.path.basename(filename)
-        return FileResponse(path=file_path, media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', filename=actual_filename)
+        # 내용 해시 ETag (같으면 304), Range 요청은 이어받기용 부분 응답
+        return await downloads.send_file(request, file_path, actual_filename)
     return HTMLResponse(content="File not found.", status_code=404)
 
 
@@ -246,14 +299,25 @@ async def handle_delete(
     if os.path.exists(file_path):
         try:
             os.remove(file_path)
-        except OSError as e:
+            snapshot.remove_snapshot(file_path)
+            folder, name = os.path.split(filename)
+            await run_in_threadpool(catalog.remove, f"{version}/{folder}" if folder else version, name)
+            if folder == "results":
+                # 삭제된 결과 파일이 검색되지 않도록 캐시를 버림 (invalidate_latest가 다른 워커에도 알림)
+                result_cache.invalidate(file_path)
+                invalidate_latest(version)
+                # 검색 인덱스(이력 검색)에서도 그 파일의 행을 바로 삭제
+                await run_in_threadpool(search_index.remove_file, get_version_dir(version), name)
+        except (OSError, sqlite3.Error) as e:
             print(f"Error deleting file {filename}: {e}")
     return RedirectResponse(url="/", status_code=303)
 
 
 @router.get("/merge/{version}", response_class=FileResponse)
 async def handle_merge(
+    request: Request,
     version: str,
+    mode: str = Query("stream", description="stream: read-only/write-only 병합, dedupe: stream + 중복 제거/충돌 분리, legacy: 기존 전체 로드 방식"),
     client_ip: str = Depends(verify_ip_whitelist)
 ):
     """
@@ -262,61 +326,148 @@ async def handle_merge(
     - 각 파일의 5번째 행부터 데이터 가져오기 (1-4행 스킵)
     - template.xlsx의 5번째 행부터 데이터 붙여넣기
     - 각 행의 마지막 데이터가 있는 열까지만 복사
+    - dedupe 모드: 완전히 같은 행은 한 번만 넣고, 다른 파일과 안건 번호(B열)가 겹치면서 내용이 다른 행은 conflicts 시트로 분리
+    - stream/dedupe 모드는 입력 파일 내용이 지난 병합 때와 같으면 새로 병합하지 않고 그때의 결과 파일을 돌려줌
     """
-    # template.xlsx 확인
+    if mode not in MERGE_MODES:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 병합 모드입니다: {mode}")
+
+    # template.xlsx 확인 및 uploads/{version} 폴더의 모든 xlsx 파일 가져오기
+    template_path, filepaths = get_merge_inputs(version)
+
+    # 병합은 오래 걸리는 blocking 작업이므로 이벤트 루프 밖에서 실행
+    if mode == "legacy":
+        # 현재 시간으로 파일명 생성 (병합 작업이 기록해 둔 결과 파일과 겹치지 않도록 _legacy와 임의 ID를 붙임)
+        timestamp = datetime.now().strftime("%y%m%d_%H_%M")
+        output_filename = f"merged_output_{version}_{timestamp}_legacy_{uuid.uuid4().hex[:12]}.xlsx"
+        output_dir = os.path.join(get_version_dir(version), MERGED_OUTPUT_DIRNAME)
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, output_filename)
+        merged_rows = await run_in_threadpool(merge_files_legacy, template_path, filepaths, output_path)
+        metrics.MERGE_ROWS.inc(merged_rows, version=version, mode=mode)
+        return await downloads.send_file(request, output_path, output_filename)
+
+    # 백그라운드 병합 작업으로 등록하고 끝날 때까지 기다림 (같은 입력으로 진행 중인 작업이 있으면 그 작업을 같이 기다림)
+    # 바뀐 파일만 프로세스 풀에서 병렬로 파싱하고(read-only), 결과는 write-only로 써서 메모리 사용을 일정하게 유지
+    job = await run_in_threadpool(submit_merge_job, version, template_path, filepaths, mode == "dedupe")
+    try:
+        await asyncio.wrap_future(job.future)
+    except Exception:
+        raise HTTPException(status_code=500, detail=f"병합 중 오류가 발생했습니다: {job.error}")
+    headers = {"X-Merge-Cache-Hits": str(job.cache_stats["hits"]), "X-Merge-Cache-Misses": str(job.cache_stats["misses"]),
+               "X-Merge-Reused": "1" if job.reused else "0"}
+    if job.dedupe:
+        headers["X-Merge-Duplicates"] = str(job.cache_stats["duplicates"])
+        headers["X-Merge-Conflicts"] = str(job.cache_stats["conflicts"])
+    return await downloads.send_file(request, job.output_path, job.output_filename, headers=headers)
+
+
+def get_merge_inputs(version: str):
+    """병합에 필요한 template.xlsx 경로와 uploads/{version}의 병합 대상 파일 경로 리스트"""
     template_path = os.path.join(UPLOADS_DIR, TEMPLATE_FILENAME)
     if not os.path.exists(template_path):
         raise HTTPException(status_code=404, detail="template.xlsx 파일이 없습니다.")
 
-    # 현재 시간으로 파일명 생성
-    now = datetime.now()
-    timestamp = now.strftime("%y%m%d_%H_%M")
-    output_filename = f"merged_output_{version}_{timestamp}.xlsx"
-    output_path = os.path.join(get_version_dir(version)+"/mergedoutput", output_filename)
+    # 파일명 순으로 정렬해서 병합 결과가 항상 같은 순서가 되도록 함
+    files_to_merge = sorted(f for f in os.listdir(get_version_dir(version))
+                            if f.endswith('.xlsx') and not f.startswith('merged_output_'))
+    return template_path, [os.path.join(get_version_dir(version), f) for f in files_to_merge]
+
+
+def submit_merge_job(version: str, template_path: str, filepaths: list[str], dedupe: bool = False):
+    """병합 작업을 백그라운드로 등록 (같은 입력의 작업이 진행 중이면 그 작업, 같은 입력의 결과 파일이 있으면 끝난 작업 리턴)"""
+    output_dir = os.path.join(get_version_dir(version), MERGED_OUTPUT_DIRNAME)
+    cache_dir = merge_engine.get_merge_cache_dir(get_version_dir(version))
+    return merge_jobs.submit_merge(version, template_path, filepaths, output_dir, cache_dir, dedupe)
+
+
+@router.post("/merge/{version}/jobs")
+async def create_merge_job(
+    version: str,
+    dedupe: bool = Query(False, description="같은 행 제거, 안건 번호 충돌 행은 conflicts 시트로 분리"),
+    client_ip: str = Depends(verify_ip_whitelist)
+):
+    """
+    병합을 백그라운드 작업으로 등록하고 작업 ID 리턴
+    진행률은 /merge/jobs/{job_id}, 결과 파일은 /merge/jobs/{job_id}/download 에서 확인
+    """
+    template_path, filepaths = get_merge_inputs(version)
+    job = await run_in_threadpool(submit_merge_job, version, template_path, filepaths, dedupe)
+    return JSONResponse(job.to_dict(), status_code=202)
+
 
+@router.get("/merge/jobs/{job_id}")
+async def get_merge_job(
+    job_id: str,
+    client_ip: str = Depends(verify_ip_whitelist)
+):
+    """병합 작업 진행률 (끝난 파일 수 / 쓴 행 수) 조회"""
+    job = merge_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="병합 작업을 찾을 수 없습니다.")
+    return job.to_dict()
+
+
+@router.get("/merge/jobs/{job_id}/download", response_class=FileResponse)
+async def download_merge_job(
+    request: Request,
+    job_id: str,
+    client_ip: str = Depends(verify_ip_whitelist)
+):
+    """끝난 병합 작업의 결과 파일 다운로드"""
+    job = merge_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="병합 작업을 찾을 수 없습니다.")
+    if job.status != merge_jobs.JOB_DONE:
+        raise HTTPException(status_code=409, detail=f"병합 작업이 아직 끝나지 않았습니다. (상태: {job.status})")
+    return await downloads.send_file(request, job.output_path, job.output_filename)
+
+
+def merge_files_legacy(template_path: str, filepaths: list[str], output_path: str):
+    """
+    기존 병합 방식: template.xlsx와 각 소스 파일을 전체 로드한 뒤 셀 단위로 복사
+    streaming 병합 결과와 비교용으로 남겨둠, 병합된 데이터 행 수 리턴
+    """
     # template.xlsx를 베이스로 워크북 로드
-    merged_wb = openpyxl.load_workbook(template_path)
+    with metrics.span("merge_legacy_load"):
+        merged_wb = openpyxl.load_workbook(template_path)
     merged_ws = merged_wb.active
 
-    # uploads/{version} 폴더의 모든 xlsx 파일 가져오기
-    files_to_merge = [f for f in os.listdir(get_version_dir(version))
-                      if f.endswith('.xlsx') and f != output_filename
-                      and not f.startswith('merged_output_')]
-
     # 현재 붙여넣기를 시작할 행 번호 (5번째 행부터 시작)
     current_row = 5
 
     # 각 파일을 순회하며 데이터 복사
-    for filename in files_to_merge:
-        filepath = os.path.join(get_version_dir(version), filename)
-        source_wb = openpyxl.load_workbook(filepath)
+    for filepath in filepaths:
+        with metrics.span("merge_legacy_load"):
+            source_wb = openpyxl.load_workbook(filepath)
         source_ws = source_wb.active
 
         # 5번째 행부터 데이터 읽기
-        for row in source_ws.iter_rows(min_row=5, max_col=11, values_only=True):
-            # 행에 데이터가 있는지 확인
-            if any(cell is not None for cell in row):
-                # 뒤에서부터 확인해서 마지막 데이터가 있는 열 찾기
-                last_data_idx = None
-                for i in range(len(row) - 1, -1, -1):
-                    if row[i] is not None:
-                        last_data_idx = i
-                        break
-
-                # 마지막 데이터가 있는 열까지만 복사
-                if last_data_idx is not None:
-                    for col_idx, cell_value in enumerate(row[:last_data_idx + 1], start=1):
-                        merged_ws.cell(row=current_row, column=col_idx, value=cell_value)
-                    current_row += 1
+        with metrics.span("merge_legacy_copy"):
+            for row in source_ws.iter_rows(min_row=5, max_col=11, values_only=True):
+                # 행에 데이터가 있는지 확인
+                if any(cell is not None for cell in row):
+                    # 뒤에서부터 확인해서 마지막 데이터가 있는 열 찾기
+                    last_data_idx = None
+                    for i in range(len(row) - 1, -1, -1):
+                        if row[i] is not None:
+                            last_data_idx = i
+                            break
+
+                    # 마지막 데이터가 있는 열까지만 복사
+                    if last_data_idx is not None:
+                        for col_idx, cell_value in enumerate(row[:last_data_idx + 1], start=1):
+                            merged_ws.cell(row=current_row, column=col_idx, value=cell_value)
+                        current_row += 1
 
         source_wb.close()
 
     # 병합된 파일 저장
-    merged_wb.save(output_path)
+    with metrics.span("merge_save"):
+        merged_wb.save(output_path)
     merged_wb.close()
+    return current_row - 5
 
-    return FileResponse(path=output_path, media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', filename=output_filename)
-    
 
 @router.get("/detail", response_class=HTMLResponse)
 async def read_about(request: Request):
@@ -1,33 +1,82 @@
-import json
 import os
+import ipaddress
+from collections import namedtuple
 from fastapi import Request, HTTPException, status
 from typing import Optional
+from routers.json_cache import ReloadableJson
 
 
-def load_allowed_ips() -> list[str]:
+IP_JSON_PATH = os.path.join(os.path.dirname(__file__), "..", "json", "ip.json")
+
+# 허용 IP 목록: 정확한 IP는 frozenset, "192.168.0.0/24" 같은 CIDR 대역은 네트워크 튜플
+IpWhitelist = namedtuple("IpWhitelist", ["ips", "networks"])
+
+
+def parse_ip_whitelist(data: dict) -> IpWhitelist:
+    """ip.json 내용을 정확한 IP 집합과 CIDR 대역 목록으로 변환"""
+    ips = set()
+    networks = []
+    for entry in data.get("allowed_ips", []):
+        entry = str(entry).strip()
+        if "/" in entry:
+            try:
+                networks.append(ipaddress.ip_network(entry, strict=False))
+            except ValueError:
+                print(f"Invalid CIDR in ip.json: {entry}")
+        else:
+            ips.add(entry)
+    return IpWhitelist(frozenset(ips), tuple(networks))
+
+
+# ip.json은 한 번만 읽어 두고 파일이 바뀌었을 때만 다시 읽음
+_ip_whitelist = ReloadableJson(IP_JSON_PATH, parse_ip_whitelist)
+
+
+def load_ip_whitelist() -> IpWhitelist:
     """
-    json/ip.json 파일에서 허용된 IP 목록을 로드합니다.
+    메모리에 캐시된 허용 IP 목록을 리턴합니다. (json/ip.json이 바뀌면 자동으로 다시 읽음)
 
     Returns:
-        list[str]: 허용된 IP 주소 리스트
+        IpWhitelist: 허용된 IP 집합과 CIDR 대역
     """
-    json_path = os.path.join(os.path.dirname(__file__), "..", "json", "ip.json")
     try:
-        with open(json_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return data.get("allowed_ips", [])
-    except FileNotFoundError:
+        return _ip_whitelist.get()
+    except OSError:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="IP 설정 파일을 찾을 수 없습니다."
         )
-    except json.JSONDecodeError:
+    except ValueError:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="IP 설정 파일 형식이 올바르지 않습니다."
         )
 
 
+def load_allowed_ips() -> list[str]:
+    """
+    json/ip.json 파일에서 허용된 IP 목록을 로드합니다.
+
+    Returns:
+        list[str]: 허용된 IP 주소 리스트 (CIDR 대역 포함)
+    """
+    whitelist = load_ip_whitelist()
+    return sorted(whitelist.ips) + [str(network) for network in whitelist.networks]
+
+
+def is_ip_allowed(client_ip: str, whitelist: IpWhitelist) -> bool:
+    """정확히 일치하는 IP는 집합에서 O(1)로 확인하고, 없으면 CIDR 대역에 속하는지 확인"""
+    if client_ip in whitelist.ips:
+        return True
+    if not whitelist.networks:
+        return False
+    try:
+        address = ipaddress.ip_address(client_ip)
+    except ValueError:
+        return False
+    return any(address in network for network in whitelist.networks)
+
+
 def get_client_ip(request: Request) -> str:
     """
     클라이언트의 실제 IP 주소를 추출합니다.
@@ -72,9 +121,9 @@ async def verify_ip_whitelist(request: Request) -> str:
         HTTPException: IP가 허용 목록에 없는 경우 403 에러
     """
     client_ip = get_client_ip(request)
-    allowed_ips = load_allowed_ips()
+    whitelist = load_ip_whitelist()
 
-    if client_ip not in allowed_ips:
+    if not is_ip_allowed(client_ip, whitelist):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"접근이 거부되었습니다. IP 주소 '{client_ip}'는 허용되지 않습니다."
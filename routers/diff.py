@@ -0,0 +1,210 @@
+import os
+import hashlib
+from collections import Counter, namedtuple
+from fastapi import APIRouter, Query, HTTPException
+from openpyxl.utils import get_column_letter
+from starlette.concurrency import run_in_threadpool
+from routers import merge_engine, search_index, snapshot
+from routers.search import VERSIONS, get_version_dir, list_result_paths, get_latest_result_path
+
+# --- Configuration ---
+# 추가/삭제/변경 목록에 셀 값까지 담아 돌려줄 최대 행 수 (분류별, 개수는 전부 셈)
+DIFF_MAX_DETAIL_ROWS = int(os.environ.get("DIFF_MAX_DETAIL_ROWS", "2000"))
+# 비교할 수 있는 폴더 (결과 파일, 병합 결과 파일)
+DIFF_SOURCES = ["results", "mergedoutput"]
+
+# 비교 결과의 행 하나 (row_no: 시트의 행 번호, cells: 끝의 빈 셀을 뺀 값, 상세 한도를 넘으면 None)
+DiffRow = namedtuple("DiffRow", ["key", "row_no", "cells"])
+
+router = APIRouter()
+
+
+def row_digest(row: tuple) -> bytes:
+    """행 값 전체(B열 키 포함)의 해시 (같은 내용의 행이면 같은 값)"""
+    return hashlib.blake2b(repr(row).encode("utf-8"), digest_size=8).digest()
+
+
+def iter_keyed_rows(path: str, key: str = None):
+    """
+    5번째 행부터 (B열 키, 행 번호, 행 값)을 한 행씩 읽음 (스냅샷이 있으면 스냅샷에서)
+    빈 행은 건너뛰고, key가 주어지면 B열이 그 값인 행만
+    """
+    rows = snapshot.iter_sheet_rows(path, min_row=merge_engine.DATA_START_ROW,
+                                    stop_after_empty_rows=merge_engine.DEFAULT_SCHEMA.stop_after_empty_rows)
+    for row_no, row in enumerate(rows, start=merge_engine.DATA_START_ROW):
+        row = merge_engine.trim_row(row)
+        if not row:
+            continue
+        row_key = search_index.make_key(row)
+        if key is not None and row_key != key:
+            continue
+        yield row_key, row_no, row
+
+
+def collect_rows(path: str, counts: Counter, key: str = None, collect_matched: bool = False) -> tuple[dict, int]:
+    """
+    path의 행을 counts(행 해시별 개수)와 맞춰 봄 - 행 해시가 counts에 남아 있으면 하나 빼고 '짝 있음'
+    collect_matched가 False면 짝 없는 행을, True면 짝 있는 행을 B열 키별로 모음
+    셀 값은 DIFF_MAX_DETAIL_ROWS개까지만 보관하고 나머지는 행 번호만 남김 (메모리 제한)
+
+    Returns:
+        ({키: [DiffRow, ...]}, 모으지 않은 행 수)
+    """
+    collected = {}
+    stored = 0
+    skipped = 0
+    for row_key, row_no, row in iter_keyed_rows(path, key):
+        digest = row_digest(row)
+        matched = counts[digest] > 0
+        if matched:
+            counts[digest] -= 1
+        if matched != collect_matched:
+            skipped += 1
+            continue
+        cells = row if stored < DIFF_MAX_DETAIL_ROWS else None
+        stored += cells is not None
+        collected.setdefault(row_key, []).append(DiffRow(row_key, row_no, cells))
+    return collected, skipped
+
+
+def changed_cells(old_cells: tuple, new_cells: tuple) -> list[dict]:
+    """두 행에서 값이 다른 열만 [{"column": "H", "old": ..., "new": ...}] 로"""
+    changes = []
+    for idx in range(max(len(old_cells), len(new_cells))):
+        old_value = old_cells[idx] if idx < len(old_cells) else None
+        new_value = new_cells[idx] if idx < len(new_cells) else None
+        if old_value != new_value:
+            changes.append({"column": get_column_letter(idx + 1), "old": old_value, "new": new_value})
+    return changes
+
+
+def key_order(key):
+    """B열 키 정렬 순서 (숫자 키는 숫자 순, 키 없는 행은 마지막)"""
+    if key is None:
+        return (2, 0, "")
+    return (0, int(key), key) if key.isdigit() else (1, 0, key)
+
+
+def diff_workbooks(old_path: str, new_path: str, key: str = None) -> dict:
+    """
+    두 워크북을 B열 키 기준으로 비교해서 추가/삭제/변경된 행을 찾음
+    1. 이전 파일을 한 번 훑어 행 해시 개수만 셈 (셀 값은 보관하지 않음)
+    2. 새 파일을 훑으며 같은 해시가 있으면 변경 없음, 없으면 추가/변경 후보로 보관
+    3. 이전 파일에 남은 해시(짝 없는 행)가 있을 때만 한 번 더 훑어 삭제/변경 후보로 보관
+    4. 같은 키 안에서 짝 없는 이전/새 행을 순서대로 짝지으면 변경, 남는 행은 삭제/추가
+
+    Args:
+        old_path: 기준(이전) 파일
+        new_path: 비교할(새) 파일
+        key: 주어지면 B열이 이 값인 행만 비교
+    """
+    counts = Counter(row_digest(row) for _, _, row in iter_keyed_rows(old_path, key))
+    new_unmatched, unchanged = collect_rows(new_path, counts, key)
+
+    # 새 파일과 짝을 찾지 못하고 남은 이전 파일의 행 해시
+    remaining = +counts
+    old_unmatched = {}
+    if remaining:
+        old_unmatched, _ = collect_rows(old_path, remaining, key, collect_matched=True)
+
+    added, removed, changed = [], [], []
+    summary = {"added": 0, "removed": 0, "changed": 0, "unchanged": unchanged}
+    for row_key in sorted(set(old_unmatched) | set(new_unmatched), key=key_order):
+        old_rows = old_unmatched.get(row_key, [])
+        new_rows = new_unmatched.get(row_key, [])
+        for old_row, new_row in zip(old_rows, new_rows):
+            summary["changed"] += 1
+            if len(changed) < DIFF_MAX_DETAIL_ROWS and old_row.cells is not None and new_row.cells is not None:
+                changed.append({
+                    "key": row_key,
+                    "old_row_no": old_row.row_no,
+                    "new_row_no": new_row.row_no,
+                    "cells": changed_cells(old_row.cells, new_row.cells),
+                })
+        for old_row in old_rows[len(new_rows):]:
+            summary["removed"] += 1
+            if len(removed) < DIFF_MAX_DETAIL_ROWS and old_row.cells is not None:
+                removed.append(old_row._asdict())
+        for new_row in new_rows[len(old_rows):]:
+            summary["added"] += 1
+            if len(added) < DIFF_MAX_DETAIL_ROWS and new_row.cells is not None:
+                added.append(new_row._asdict())
+
+    return {
+        "summary": summary,
+        "truncated": len(added) + len(removed) + len(changed) < summary["added"] + summary["removed"] + summary["changed"],
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+    }
+
+
+def list_workbooks(version: str, source: str) -> list[str]:
+    """비교할 수 있는 파일 경로 목록 (파일명 순 = 업로드/병합 순서)"""
+    if version not in VERSIONS:
+        raise HTTPException(status_code=400, detail="Invalid version specified.")
+    if source not in DIFF_SOURCES:
+        raise HTTPException(status_code=400, detail=f"source는 {', '.join(DIFF_SOURCES)} 중 하나여야 합니다.")
+    if source == "results":
+        return list_result_paths(version)
+    folder = os.path.join(get_version_dir(version), source)
+    if not os.path.isdir(folder):
+        return []
+    return [os.path.join(folder, f) for f in sorted(os.listdir(folder)) if f.endswith(".xlsx") and not f.startswith(".")]
+
+
+def pick_workbook(paths: list[str], filename: str) -> str:
+    """목록에서 파일명이 같은 파일 경로 (없으면 404)"""
+    for path in paths:
+        if os.path.basename(path) == filename:
+            return path
+    raise HTTPException(status_code=404, detail=f"'{filename}' 파일을 찾을 수 없습니다.")
+
+
+def file_info(version: str, path: str) -> dict:
+    """응답에 넣을 비교 대상 파일 정보"""
+    return {"version": version, "filename": os.path.basename(path)}
+
+
+@router.get("/api/diff/results", summary="같은 버전의 두 결과(또는 병합) 파일 비교")
+async def diff_results(
+    version: str = Query(..., description="ver1 또는 ver2"),
+    old: str = Query(None, description="기준 파일명 (없으면 new 바로 전 파일)"),
+    new: str = Query(None, description="비교할 파일명 (없으면 가장 최근 파일)"),
+    source: str = Query("results", description="results 또는 mergedoutput"),
+    key: str = Query(None, description="주어지면 B열이 이 값인 행만 비교")
+    ):
+    """
+    B열(안건 번호)을 키로 두 파일을 비교해서 추가/삭제/변경된 행을 셀 단위로 리턴
+    - 행마다 해시만 계산해서 비교하므로 셀 값은 다른 행만 메모리에 올림
+    """
+    paths = list_workbooks(version, source)
+    if not paths:
+        raise HTTPException(status_code=404, detail=f"'{version}/{source}'에 비교할 파일이 없습니다.")
+    new_path = pick_workbook(paths, new) if new else paths[-1]
+    if old:
+        old_path = pick_workbook(paths, old)
+    else:
+        position = paths.index(new_path)
+        if position == 0:
+            raise HTTPException(status_code=404, detail=f"'{os.path.basename(new_path)}' 이전 파일이 없습니다.")
+        old_path = paths[position - 1]
+    try:
+        result = await run_in_threadpool(diff_workbooks, old_path, new_path, key)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"파일 비교 중 오류 발생: {e}")
+    return {"old": file_info(version, old_path), "new": file_info(version, new_path), "key": key, **result}
+
+
+@router.get("/api/diff/versions", summary="ver1과 ver2의 최신 결과 파일 비교")
+async def diff_versions(
+    key: str = Query(None, description="주어지면 B열이 이 값인 행만 비교")
+    ):
+    """ver1 최신 결과 파일(기준)과 ver2 최신 결과 파일을 B열 키 기준으로 비교"""
+    old_path = get_latest_result_path("ver1")
+    new_path = get_latest_result_path("ver2")
+    try:
+        result = await run_in_threadpool(diff_workbooks, old_path, new_path, key)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"파일 비교 중 오류 발생: {e}")
+    return {"old": file_info("ver1", old_path), "new": file_info("ver2", new_path), "key": key, **result}
@@ -0,0 +1,92 @@
+import os
+import threading
+from collections import OrderedDict
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+from starlette.concurrency import run_in_threadpool
+from routers import merge_engine
+
+# --- Configuration ---
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# 메모리에 기억해 둘 파일별 ETag 수
+ETAG_CACHE_MAX_ENTRIES = int(os.environ.get("ETAG_CACHE_MAX_ENTRIES", "4096"))
+# 같은 경로의 파일이 바뀔 수 있으므로 (템플릿 재업로드 등) 저장은 허용하되 매번 ETag로 확인
+DOWNLOAD_CACHE_CONTROL = "no-cache"
+
+
+class EtagCache:
+    """
+    파일 경로별 strong ETag (내용 sha256) 캐시
+    파일 크기/수정시간이 기록과 같으면 다시 해시하지 않음, 오래 안 쓴 항목부터 버림
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # 경로 -> (size, mtime_ns, etag)
+
+    def get(self, path: str, stat: os.stat_result):
+        key = os.path.abspath(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != stat.st_size or entry[1] != stat.st_mtime_ns:
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def put(self, path: str, stat: os.stat_result, etag: str):
+        key = os.path.abspath(path)
+        with self._lock:
+            self._entries[key] = (stat.st_size, stat.st_mtime_ns, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+etag_cache = EtagCache(ETAG_CACHE_MAX_ENTRIES)
+
+
+def make_etag(sha256: str) -> str:
+    return f'"{sha256}"'
+
+
+def remember_etag(path: str, sha256: str):
+    """업로드 단계에서 이미 계산한 내용 해시를 ETag로 기억 (첫 다운로드 때 파일을 다시 읽지 않도록)"""
+    try:
+        etag_cache.put(path, os.stat(path), make_etag(sha256))
+    except OSError as e:
+        print(f"Error remembering ETag for {path}: {e}")
+
+
+def file_etag(path: str) -> tuple[str, os.stat_result]:
+    """파일 내용의 sha256으로 만든 strong ETag와 stat (캐시에 없으면 파일을 읽어서 계산)"""
+    stat = os.stat(path)
+    etag = etag_cache.get(path, stat)
+    if etag is None:
+        etag = make_etag(merge_engine.file_sha256(path))
+        etag_cache.put(path, stat, etag)
+    return etag, stat
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 헤더 값에 etag가 있는지 (weak 비교, "*"는 항상 일치)"""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+async def send_file(request: Request, path: str, filename: str, media_type: str = XLSX_MEDIA_TYPE, headers: dict = None) -> Response:
+    """
+    ETag를 붙여 파일 응답
+    - If-None-Match가 현재 ETag와 같으면 본문 없이 304
+    - Range / If-Range 요청은 FileResponse가 처리 (If-Range는 이 ETag와 비교하므로 파일이 바뀌면 전체를 다시 보냄)
+    """
+    etag, stat = await run_in_threadpool(file_etag, path)
+    cache_headers = {"ETag": etag, "Cache-Control": DOWNLOAD_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=cache_headers)
+    return FileResponse(path=path, media_type=media_type, filename=filename, stat_result=stat,
+                        headers={**(headers or {}), **cache_headers})
@@ -0,0 +1,154 @@
+import os
+import time
+import threading
+from collections import namedtuple
+from routers import metadata_store, shared_state
+
+# --- Configuration ---
+# 업로드/삭제 API를 거치지 않고 바뀐 파일을 반영하기 위한 전체 재검색 주기 (초)
+CATALOG_RESCAN_SECONDS = float(os.environ.get("CATALOG_RESCAN_SECONDS", "30"))
+
+# 폴더 안 파일 하나의 정보 (owner: 업로드한 IP, upload_time: "YYYY-MM-DD HH:MM:SS")
+FileEntry = namedtuple("FileEntry", ["name", "size", "mtime", "owner", "upload_time"])
+
+
+class FileCatalog:
+    """
+    업로드 폴더들의 파일 목록을 메모리에 보관하는 카탈로그
+    - 업로드/삭제 API에서 add()/remove()로 바로 갱신
+    - CATALOG_RESCAN_SECONDS마다 백그라운드 스레드가 전체를 다시 읽어 직접 복사/삭제된 파일도 반영
+    - 다른 워커 프로세스에서 add()/remove()한 경우는 신호(shared_state.Signal)를 보고 다음 조회 때 다시 읽음
+    - 홈 화면은 files()/names()만 호출하므로 파일 시스템에 접근하지 않음
+    """
+
+    def __init__(self, root: str, folders: list[str], rescan_seconds: float = CATALOG_RESCAN_SECONDS):
+        self.root = root
+        self.folders = folders
+        self.rescan_seconds = rescan_seconds
+        self._lock = threading.Lock()
+        # 재검색은 한 번에 하나씩 (백그라운드 스레드, 다른 워커의 신호, 첫 조회가 동시에 재검색할 수 있으므로)
+        self._rescan_lock = threading.Lock()
+        self._entries = {folder: {} for folder in folders}  # folder -> {name: FileEntry}
+        self._ownership = {}  # (version, name) -> (ip, upload_time)
+        self._scanned = False
+        self._thread = None
+        # 재검색 도중에 add()/remove()된 변경 (재검색 결과에 다시 적용해서 잃어버리지 않도록)
+        self._changes = None
+        self._signal = shared_state.Signal("catalog")
+
+    def _folder_path(self, folder: str) -> str:
+        return os.path.join(self.root, folder) if folder else self.root
+
+    def _owner_of(self, folder: str, name: str):
+        # 소유권은 버전 폴더 바로 아래의 데이터 파일에만 있음
+        return self._ownership.get((folder, name), (None, None))
+
+    def rescan(self):
+        """모든 폴더를 다시 읽고 소유권 정보도 한 번에 다시 로드"""
+        with self._rescan_lock:
+            self._rescan()
+
+    def _rescan(self):
+        with self._lock:
+            self._changes = []
+        ownership = {}
+        try:
+            for version, files in metadata_store.load_file_ownership().items():
+                for name, info in files.items():
+                    if isinstance(info, dict):
+                        upload_time = " ".join(v for v in (info.get("upload_date"), info.get("upload_time")) if v) or None
+                        ownership[(version, name)] = (info.get("ip"), upload_time)
+                    else:
+                        ownership[(version, name)] = (info, None)
+        except Exception as e:
+            print(f"Error loading file ownership for catalog: {e}")
+
+        entries = {}
+        for folder in self.folders:
+            folder_entries = {}
+            try:
+                with os.scandir(self._folder_path(folder)) as it:
+                    for item in it:
+                        # 하위 폴더와 업로드 중인 임시 파일(.으로 시작)은 목록에서 제외
+                        if item.name.startswith(".") or not item.is_file():
+                            continue
+                        stat = item.stat()
+                        owner, upload_time = ownership.get((folder, item.name), (None, None))
+                        folder_entries[item.name] = FileEntry(item.name, stat.st_size, stat.st_mtime, owner, upload_time)
+            except OSError:
+                pass
+            entries[folder] = folder_entries
+
+        with self._lock:
+            for op, folder, name, entry in self._changes:
+                if op == "add":
+                    entries.setdefault(folder, {})[name] = entry
+                    if entry.owner is not None:
+                        ownership[(folder, name)] = (entry.owner, entry.upload_time)
+                else:
+                    entries.get(folder, {}).pop(name, None)
+            self._changes = None
+            self._ownership = ownership
+            self._entries = entries
+            self._scanned = True
+
+    def add(self, folder: str, name: str, owner: str = None, upload_time: str = None):
+        """파일이 새로 저장되었을 때 카탈로그에 추가 (같은 이름이 있으면 교체)"""
+        self._ensure_scanned()
+        path = os.path.join(self._folder_path(folder), name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        with self._lock:
+            if owner is not None:
+                self._ownership[(folder, name)] = (owner, upload_time)
+            else:
+                owner, upload_time = self._owner_of(folder, name)
+            entry = FileEntry(name, stat.st_size, stat.st_mtime, owner, upload_time)
+            self._entries.setdefault(folder, {})[name] = entry
+            if self._changes is not None:
+                self._changes.append(("add", folder, name, entry))
+        self._signal.notify()
+
+    def remove(self, folder: str, name: str):
+        """파일이 삭제되었을 때 카탈로그에서 제거"""
+        self._ensure_scanned()
+        with self._lock:
+            self._entries.get(folder, {}).pop(name, None)
+            if self._changes is not None:
+                self._changes.append(("remove", folder, name, None))
+        self._signal.notify()
+
+    def files(self, folder: str) -> list[FileEntry]:
+        """폴더의 파일 목록 (이름 순)"""
+        self._ensure_scanned()
+        with self._lock:
+            return sorted(self._entries.get(folder, {}).values())
+
+    def names(self, folder: str) -> list[str]:
+        """폴더의 파일 이름 목록 (이름 순)"""
+        return [entry.name for entry in self.files(folder)]
+
+    def _ensure_scanned(self):
+        """처음 사용할 때 한 번 전체를 읽고 주기적 재검색 스레드 시작 (다른 워커가 바꿨으면 다시 읽음)"""
+        if self._scanned:
+            if self._signal.changed():
+                self.rescan()
+            return
+        with self._lock:
+            start_thread = self._thread is None
+            if start_thread:
+                self._thread = threading.Thread(target=self._rescan_loop, name="file-catalog", daemon=True)
+        if not self._scanned:
+            self.rescan()
+        if start_thread:
+            self._thread.start()
+
+    def _rescan_loop(self):
+        while True:
+            time.sleep(self.rescan_seconds)
+            try:
+                self.rescan()
+            except Exception as e:
+                print(f"Error rescanning file catalog: {e}")
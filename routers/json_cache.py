@@ -0,0 +1,55 @@
+import os
+import json
+import time
+import threading
+from routers import metrics
+
+# --- Configuration ---
+# 설정 파일이 바뀌었는지(mtime) 확인하는 최소 간격 (초), 이 시간 안에는 메모리 값을 그대로 사용
+RELOAD_CHECK_SECONDS = float(os.environ.get("RELOAD_CHECK_SECONDS", "1"))
+
+
+class ReloadableJson:
+    """
+    JSON 설정 파일을 한 번만 읽어 메모리에 두고, 파일의 수정시간/크기가 바뀌면 다시 읽는 캐시
+    - parse: json.load 결과를 실제로 사용할 형태(frozenset, dict 등)로 바꾸는 함수
+    - 파일이 수정 도중이라 읽기에 실패하면 이전 값을 계속 사용 (처음 읽을 때 실패하면 예외 발생)
+    """
+
+    def __init__(self, path: str, parse=None, check_interval: float = None):
+        self.path = path
+        self.parse = parse or (lambda data: data)
+        self.check_interval = RELOAD_CHECK_SECONDS if check_interval is None else check_interval
+        self._lock = threading.Lock()
+        self._value = None
+        self._signature = None
+        self._checked_at = 0.0
+
+    def get(self):
+        """현재 값 리턴 (check_interval이 지났으면 파일이 바뀌었는지 확인)"""
+        now = time.monotonic()
+        if self._signature is not None and now - self._checked_at < self.check_interval:
+            return self._value
+
+        with self._lock:
+            if self._signature is not None and now - self._checked_at < self.check_interval:
+                return self._value
+            try:
+                stat = os.stat(self.path)
+                signature = (stat.st_mtime_ns, stat.st_size)
+                if signature != self._signature:
+                    with metrics.span("metadata_io"), open(self.path, "r", encoding="utf-8") as f:
+                        value = self.parse(json.load(f))
+                    self._value = value
+                    self._signature = signature
+            except (OSError, ValueError) as e:
+                if self._signature is None:
+                    raise
+                print(f"Error reloading {self.path}, keeping previous value: {e}")
+            self._checked_at = now
+            return self._value
+
+    def invalidate(self):
+        """다음 get()에서 파일을 다시 확인하도록 함"""
+        with self._lock:
+            self._checked_at = 0.0
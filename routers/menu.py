@@ -1,19 +1,25 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, Query, HTTPException
 from fastapi.responses import JSONResponse
-import json
 import os
-import openpyxl
+from types import MappingProxyType
+from routers.json_cache import ReloadableJson
+from routers import merge_engine, metadata_store, snapshot
+from routers.agenda_index import agenda_index
 
 router = APIRouter()
 
+USER_DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "json", "user_data.json")
+
+# user_data.json은 한 번만 읽어 두고 파일이 바뀌었을 때만 다시 읽음 (읽기 전용 dict)
+_user_data = ReloadableJson(USER_DATA_PATH, lambda data: MappingProxyType(dict(data)))
+
+
 def get_user_name_by_ip(ip: str) -> str:
     """
     Get user name from user_data.json based on IP address.
     """
     try:
-        user_data_path = os.path.join(os.path.dirname(__file__), "..", "json", "user_data.json")
-        with open(user_data_path, 'r', encoding='utf-8') as f:
-            user_data = json.load(f)
+        user_data = _user_data.get()
 
         # Return user name for IP, default to "Guest" if not found
         return user_data.get(ip, "Guest")
@@ -49,27 +55,9 @@ async def get_user_agenda(request: Request):
     user_name = get_user_name_by_ip(client_ip)
 
     try:
-        # Load agenda_no.json
-        agenda_path = os.path.join(os.path.dirname(__file__), "..", "json", "agenda_no.json")
-
-        if os.path.exists(agenda_path):
-            with open(agenda_path, 'r', encoding='utf-8') as f:
-                agenda_data = json.load(f)
-        else:
-            return JSONResponse({
-                "user": user_name,
-                "agenda_numbers": []
-            })
-
-        # Get user's ver1 and ver2 lists
-        if user_name in agenda_data:
-            ver1 = agenda_data[user_name].get("ver1", [])
-            ver2 = agenda_data[user_name].get("ver2", [])
-
-            # Create union of ver1 and ver2, remove duplicates and sort
-            agenda_numbers = sorted(list(set(ver1 + ver2)))
-        else:
-            agenda_numbers = []
+        # Union of ver1 and ver2 is precomputed in the agenda index whenever the numbers change
+        union = agenda_index.union_of(user_name)
+        agenda_numbers = list(union) if union is not None else []
 
         return JSONResponse({
             "user": user_name,
@@ -77,33 +65,85 @@ async def get_user_agenda(request: Request):
         })
 
     except Exception as e:
-        print(f"Error reading agenda_no.json: {e}")
+        print(f"Error reading agenda numbers: {e}")
         return JSONResponse({
             "user": user_name,
             "agenda_numbers": []
         })
 
-def match_agenda_user(filename: str, version: str, file_path: str, keywords: list):
+@router.get("/api/agenda-owner/{number}")
+async def get_agenda_owner(
+    number: int,
+    version: str = Query(None, description="ver1 또는 ver2 (없으면 모든 버전)")
+):
+    """
+    Return the users who own the given agenda number, per version.
+    """
+    if version is not None and version not in ("ver1", "ver2"):
+        raise HTTPException(status_code=400, detail="Invalid version specified.")
+    return JSONResponse({
+        "number": number,
+        "owners": agenda_index.owners_of(number, version)
+    })
+
+def find_agenda_user(filename: str, keywords: list):
+    """파일명에 들어 있는 첫 번째 키워드(사용자 이름), 없으면 None"""
+    for keyword in keywords:
+        if keyword in filename:
+            return keyword
+    return None
+
+def match_agenda_users(version: str, uploads: list[tuple], keywords: list) -> dict:
+    """
+    여러 파일을 한꺼번에 match_agenda_user 처리 (벌크 업로드용)
+    안건 번호는 metadata_store에 한 트랜잭션으로 저장 (같은 사용자의 파일이 여러 개면 마지막 파일의 번호가 남음)
+
+    Args:
+        version: Version (ver1 or ver2)
+        uploads: (filename, agenda_numbers) 튜플 리스트 (업로드 순서대로)
+        keywords: List of keywords to search in filename
+
+    Returns:
+        {filename: matched user} (매칭된 파일만)
+    """
+    matched = {}
+    latest = {}
+    for filename, agenda_numbers in uploads:
+        user = find_agenda_user(filename, keywords)
+        if user is not None:
+            matched[filename] = user
+            latest[user] = agenda_numbers
+    if not latest:
+        return matched
+
+    try:
+        metadata_store.set_agenda_numbers_many([(user, version, numbers) for user, numbers in latest.items()])
+        for user, numbers in latest.items():
+            agenda_index.set_numbers(user, version, numbers)
+    except Exception as e:
+        print(f"Error in match_agenda_users: {e}")
+        return {}
+    return matched
+
+def match_agenda_user(filename: str, version: str, file_path: str, keywords: list, agenda_numbers: list = None):
     """
     Check if filename contains any keyword from the keywords list.
     If matched, extract unique values from column B of the Excel file
-    and update agenda_no.json with those values.
+    and update the agenda numbers in metadata_store (and the in-memory agenda index) with those values.
 
     Args:
         filename: Name of the uploaded file
         version: Version (ver1 or ver2)
         file_path: Path to the Excel file
         keywords: List of keywords to search in filename (e.g., ["김철수", "이영희"])
+        agenda_numbers: Column B numbers already extracted by the upload pipeline.
+                        If given, the Excel file is not opened again.
 
     Returns:
         Matched user name if found, None otherwise
     """
     # Check if any keyword exists in filename
-    matched_user = None
-    for keyword in keywords:
-        if keyword in filename:
-            matched_user = keyword
-            break
+    matched_user = find_agenda_user(filename, keywords)
 
     # If no keyword matched, return None
     if matched_user is None:
@@ -111,13 +151,16 @@ def match_agenda_user(filename: str, version: str, file_path: str, keywords: lis
 
     # Read Excel file and extract column B values
     try:
-        wb = openpyxl.load_workbook(file_path)
-        ws = wb.active
+        if agenda_numbers is not None:
+            metadata_store.set_agenda_numbers(matched_user, version, agenda_numbers)
+            agenda_index.set_numbers(matched_user, version, agenda_numbers)
+            return matched_user
 
-        # Extract all values from column B (column index 2)
+        # Extract all values from column B (column index 2), from the snapshot when it is fresh
         b_column_values = []
-        for row in ws.iter_rows(min_row=1, min_col=2, max_col=2, values_only=True):
-            value = row[0]
+        for row in snapshot.iter_sheet_rows(file_path, min_row=1, max_col=2,
+                                            stop_after_empty_rows=merge_engine.DEFAULT_SCHEMA.stop_after_empty_rows):
+            value = row[1] if len(row) > 1 else None
             # Only add non-None numeric values
             if value is not None:
                 try:
@@ -127,31 +170,12 @@ def match_agenda_user(filename: str, version: str, file_path: str, keywords: lis
                     # Skip non-numeric values
                     pass
 
-        wb.close()
-
         # Remove duplicates by converting to set and back to list
         unique_values = list(set(b_column_values))
 
-        # Update agenda_no.json
-        agenda_path = os.path.join(os.path.dirname(__file__), "..", "json", "agenda_no.json")
-
-        # Load current agenda data
-        if os.path.exists(agenda_path):
-            with open(agenda_path, 'r', encoding='utf-8') as f:
-                agenda_data = json.load(f)
-        else:
-            agenda_data = {}
-
-        # Initialize user entry if not exists
-        if matched_user not in agenda_data:
-            agenda_data[matched_user] = {"ver1": [], "ver2": []}
-
-        # Update the specific version list with unique values
-        agenda_data[matched_user][version] = unique_values
-
-        # Save updated agenda data
-        with open(agenda_path, 'w', encoding='utf-8') as f:
-            json.dump(agenda_data, f, indent=4, ensure_ascii=False)
+        # Update the specific version list with unique values (only this user/version is rewritten)
+        metadata_store.set_agenda_numbers(matched_user, version, unique_values)
+        agenda_index.set_numbers(matched_user, version, unique_values)
 
         return matched_user
 
@@ -0,0 +1,483 @@
+import os
+import json
+import time
+import hashlib
+from operator import itemgetter
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter, column_index_from_string
+from routers import metrics, snapshot
+
+# --- Configuration ---
+# 템플릿에서 그대로 가져올 헤더 행 수 (1-4행)
+HEADER_ROWS = 4
+# 데이터가 시작되는 행 번호
+DATA_START_ROW = HEADER_ROWS + 1
+# 병합할 원본 열 (쉼표로 구분, 범위는 "-", 예: "A-K" 또는 "A,B,D-K") - 결과 파일에는 적힌 순서대로 A열부터 씀
+MERGE_COLUMNS = os.environ.get("MERGE_COLUMNS", "A-K")
+# 값이 있는 마지막 행 아래로는 빈 행을 이만큼까지만 읽음 (0이면 시트 끝까지 읽음)
+# 서식만 1,048,576행까지 들어가서 시트 크기가 부풀려진 파일 대비 - 마지막 값 위쪽은 빈 구간이 길어도 모두 읽으므로 결과는 같음
+# 업로드 검증, 스냅샷, 검색 인덱스, 비교도 같은 값으로 읽음 (스냅샷은 같은 설정으로 만든 것만 사용하므로)
+MERGE_STOP_AFTER_EMPTY_ROWS = int(os.environ.get("MERGE_STOP_AFTER_EMPTY_ROWS", "1000"))
+# 병합 캐시 파일 형식 (추출 규칙이 바뀌면 올려서 예전 캐시/결과 파일을 쓰지 않도록 함)
+MERGE_CACHE_FORMAT_VERSION = 2
+# 안건 번호 열 (B열), 중복 제거 병합에서 충돌 여부를 판단하는 키
+MERGE_KEY_COLUMN = 1
+# 중복 제거 병합에서 같은 안건 번호의 다른 내용 행을 모아 두는 시트 이름
+CONFLICTS_SHEET_TITLE = "conflicts"
+# 파일 파싱에 사용할 프로세스 수 (환경변수 MERGE_WORKERS, 1이면 현재 프로세스에서 순차 처리)
+# 지정하지 않으면 CPU 수를 웹 워커 수(WEB_CONCURRENCY)로 나눈 값 (워커마다 파싱 풀을 따로 가지므로)
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", "1"))
+MERGE_WORKERS = int(os.environ.get("MERGE_WORKERS", "0")) or max(1, (os.cpu_count() or 1) // max(1, WEB_CONCURRENCY))
+# 진행률 콜백을 부르는 행 간격
+PROGRESS_ROW_INTERVAL = 1000
+# 병합 캐시 폴더 이름 접미사 (uploads/ver1 옆에 uploads/ver1.mergecache 로 생성)
+MERGE_CACHE_SUFFIX = ".mergecache"
+MERGE_CACHE_INDEX = "index.json"
+MERGE_OUTPUT_INDEX = "outputs.json"
+# 추출한 행을 저장하는 캐시 파일 확장자 (JSON 한 줄, 예전 형식의 .pkl 파일은 다음 병합 때 정리)
+MERGE_CACHE_ROWS_SUFFIX = ".rows"
+LEGACY_CACHE_SUFFIX = ".pkl"
+
+_parse_pool = None
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """파일 파싱용 프로세스 풀 (처음 사용할 때 생성)"""
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=MERGE_WORKERS)
+    return _parse_pool
+
+
+# 병합 스키마: columns는 병합할 원본 열 번호(0부터) tuple, stop_after_empty_rows는 마지막 값 아래로 읽는 빈 행 수
+MergeSchema = namedtuple("MergeSchema", ["columns", "stop_after_empty_rows"])
+
+
+def parse_columns(spec: str) -> tuple[int, ...]:
+    """ "A-K", "A,B,D-K" 같은 열 지정을 0부터 시작하는 열 번호 tuple로 변환 (잘못된 지정이면 ValueError)"""
+    columns = []
+    for part in spec.replace(" ", "").upper().split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        start = column_index_from_string(first)
+        end = column_index_from_string(last) if last else start
+        if end < start:
+            raise ValueError(f"잘못된 열 범위: {part}")
+        columns.extend(range(start - 1, end))
+    if not columns:
+        raise ValueError(f"병합할 열이 없습니다: {spec!r}")
+    return tuple(columns)
+
+
+def make_schema(columns: str = MERGE_COLUMNS, stop_after_empty_rows: int = MERGE_STOP_AFTER_EMPTY_ROWS) -> MergeSchema:
+    return MergeSchema(parse_columns(columns), max(0, stop_after_empty_rows))
+
+
+DEFAULT_SCHEMA = make_schema()
+
+
+def schema_key(schema: MergeSchema) -> str:
+    """스키마를 구분하는 짧은 해시 (병합 캐시 파일 이름, 병합 입력 fingerprint에 사용)"""
+    return hashlib.sha256(repr((MERGE_CACHE_FORMAT_VERSION,) + tuple(schema)).encode("utf-8")).hexdigest()[:12]
+
+
+def schema_width(schema: MergeSchema) -> int:
+    """원본에서 읽어야 하는 열 수 (가장 오른쪽 병합 열까지)"""
+    return max(schema.columns) + 1
+
+
+def key_index(schema: MergeSchema):
+    """병합된 행에서 안건 번호 열(MERGE_KEY_COLUMN)의 위치 (병합하지 않는 열이면 None)"""
+    return schema.columns.index(MERGE_KEY_COLUMN) if MERGE_KEY_COLUMN in schema.columns else None
+
+
+def row_projector(schema: MergeSchema):
+    """
+    원본 행에서 병합할 열만 골라내는 함수
+    앞에서부터 이어진 열(A-K 등)이면 슬라이스 한 번, 아니면 itemgetter로 한 번에 가져옴
+    (스냅샷의 행은 원래 길이대로라 짧을 수 있으므로 그때만 열마다 확인)
+    """
+    columns = schema.columns
+    width = len(columns)
+    if columns == tuple(range(width)):
+        return lambda row: row[:width]
+    getter = itemgetter(*columns)
+    if width == 1:
+        return lambda row: (getter(row),) if len(row) > columns[0] else (None,)
+    last = max(columns)
+    return lambda row: getter(row) if len(row) > last else tuple(row[col] if col < len(row) else None for col in columns)
+
+
+def trim_row(row: tuple) -> tuple:
+    """
+    행의 마지막 데이터가 있는 열까지만 잘라서 리턴
+    데이터가 하나도 없는 행이면 빈 튜플 리턴
+    """
+    last = len(row)
+    while last > 0 and row[last - 1] is None:
+        last -= 1
+    return tuple(row[:last])
+
+
+def project_rows(rows, schema: MergeSchema = DEFAULT_SCHEMA):
+    """5번째 행부터의 원본 행들에서 병합할 열만 골라 뒤쪽 빈 값을 잘라낸 행을 내놓음 (빈 행은 건너뜀)"""
+    project = row_projector(schema)
+    for row in rows:
+        trimmed = trim_row(project(row))
+        if trimmed:
+            yield trimmed
+
+
+def iter_source_rows(filepath: str, schema: MergeSchema = DEFAULT_SCHEMA):
+    """
+    업로드된 엑셀 파일의 5번째 행부터 병합할 열의 데이터를 한 행씩 내놓는 제너레이터
+    최신 스냅샷이 있으면 스냅샷에서, 없으면 read_only 모드로 읽기 때문에 파일 크기와 상관없이 메모리 사용이 일정함
+    """
+    rows = snapshot.iter_sheet_rows(filepath, min_row=DATA_START_ROW, max_col=schema_width(schema),
+                                    stop_after_empty_rows=schema.stop_after_empty_rows)
+    try:
+        yield from project_rows(rows, schema)
+    finally:
+        # 중간에 멈춰도 read-only 워크북을 바로 닫음
+        rows.close()
+
+
+def extract_rows(filepath: str, schema: MergeSchema = DEFAULT_SCHEMA) -> list[tuple]:
+    """업로드된 엑셀 파일의 5번째 행부터 병합할 열의 데이터를 리스트로 리턴"""
+    return list(iter_source_rows(filepath, schema))
+
+
+def _copy_header(template_ws, merged_ws):
+    """템플릿의 1-4행을 스타일, 열 너비, 병합 셀과 함께 write-only 시트에 복사"""
+    for key, dim in template_ws.column_dimensions.items():
+        merged_dim = merged_ws.column_dimensions[key]
+        merged_dim.width = dim.width
+        merged_dim.hidden = dim.hidden
+    for idx in range(1, HEADER_ROWS + 1):
+        if idx in template_ws.row_dimensions:
+            merged_ws.row_dimensions[idx].height = template_ws.row_dimensions[idx].height
+    for cell_range in template_ws.merged_cells.ranges:
+        if cell_range.max_row <= HEADER_ROWS:
+            merged_ws.merged_cells.add(cell_range.coord)
+    merged_ws.freeze_panes = template_ws.freeze_panes
+
+    # 템플릿이 4행보다 짧아도 빈 행으로 채워지므로 데이터는 항상 5번째 행부터 시작
+    max_col = template_ws.max_column
+    for template_row in template_ws.iter_rows(min_row=1, max_row=HEADER_ROWS, max_col=max_col):
+        header_row = []
+        for template_cell in template_row:
+            cell = WriteOnlyCell(merged_ws, value=template_cell.value)
+            if template_cell.has_style:
+                cell.font = template_cell.font.copy()
+                cell.fill = template_cell.fill.copy()
+                cell.border = template_cell.border.copy()
+                cell.alignment = template_cell.alignment.copy()
+                cell.number_format = template_cell.number_format
+                cell.protection = template_cell.protection.copy()
+            header_row.append(cell)
+        merged_ws.append(header_row)
+
+
+class RowDeduper:
+    """
+    병합하면서 한 번 훑는 동안 같은 행을 걸러내고 안건 번호 충돌을 찾음
+    - 내용이 완전히 같은 행(파일이 달라도)은 처음 한 번만 남김 (행 해시 집합으로 확인)
+    - 같은 안건 번호(B열)를 다른 파일에서 다른 내용으로 올린 행은 충돌로 분류
+      (한 파일 안에서 같은 안건 번호의 여러 행은 정상)
+    """
+
+    DUPLICATE = "duplicate"
+    CONFLICT = "conflict"
+
+    def __init__(self, key_column=MERGE_KEY_COLUMN):
+        # 병합된 행에서 안건 번호가 있는 위치 (None이면 충돌은 확인하지 않고 같은 행만 걸러냄)
+        self.key_column = key_column
+        self.seen = set()
+        self.key_owner = {}  # 안건 번호 -> 처음 올린 파일 순번
+        self.duplicates = 0
+        self.conflicts = 0
+
+    def check(self, row: tuple, source: int):
+        """
+        행을 확인하고 (분류, 안건 번호를 먼저 올린 파일 순번) 리턴
+        분류는 None(병합), DUPLICATE(버림), CONFLICT(충돌 시트로) 중 하나
+        """
+        digest = hashlib.blake2b(repr(row).encode("utf-8"), digest_size=8).digest()
+        if digest in self.seen:
+            self.duplicates += 1
+            return self.DUPLICATE, None
+        self.seen.add(digest)
+
+        if self.key_column is None or len(row) <= self.key_column or row[self.key_column] is None:
+            return None, None
+        key = str(row[self.key_column]).strip()
+        owner = self.key_owner.setdefault(key, source)
+        if owner != source:
+            self.conflicts += 1
+            return self.CONFLICT, owner
+        return None, None
+
+
+def write_merged_workbook(template_path: str, row_blocks, output_path: str, progress=None,
+                          dedupe: bool = False, source_names: list[str] = None, schema: MergeSchema = DEFAULT_SCHEMA) -> tuple[int, dict]:
+    """
+    template.xlsx의 1-4행을 헤더로 깔고, 그 아래(5번째 행부터) row_blocks의 행들을 이어 붙여 저장
+    write-only 워크북을 사용하므로 병합되는 행 수와 상관없이 메모리 사용이 일정함
+    dedupe이면 같은 행은 한 번만 쓰고, 다른 파일과 안건 번호가 겹치는 행은 conflicts 시트에 따로 씀 (같은 한 번의 순회에서)
+
+    Args:
+        template_path: template.xlsx 경로
+        row_blocks: 파일별 행 리스트를 순서대로 내놓는 iterable
+        output_path: 저장할 경로
+        progress: 진행률 콜백 progress(끝난 파일 수, 쓴 행 수) - PROGRESS_ROW_INTERVAL 행마다, 파일이 끝날 때마다 호출
+        dedupe: 중복 제거/충돌 분리 여부
+        source_names: row_blocks 순서대로의 파일 이름 (conflicts 시트에 표시)
+        schema: 행을 만든 병합 스키마 (conflicts 시트의 원본 열 이름과 안건 번호 위치에 사용)
+
+    Returns:
+        (병합된 데이터 행 수, {"duplicates": 버린 같은 행 수, "conflicts": 충돌 시트로 보낸 행 수})
+    """
+    template_wb = openpyxl.load_workbook(template_path)
+    merged_wb = openpyxl.Workbook(write_only=True)
+    try:
+        template_ws = template_wb.active
+        merged_ws = merged_wb.create_sheet(title=template_ws.title)
+        _copy_header(template_ws, merged_ws)
+    finally:
+        template_wb.close()
+
+    deduper = None
+    conflicts_ws = None
+    if dedupe:
+        deduper = RowDeduper(key_index(schema))
+        # write-only 시트는 시트마다 따로 임시 파일에 쓰므로 두 시트에 번갈아 써도 한 번만 훑으면 됨
+        conflicts_ws = merged_wb.create_sheet(title=CONFLICTS_SHEET_TITLE)
+        conflicts_ws.append(["파일", "먼저 올린 파일"] + [get_column_letter(col + 1) for col in schema.columns])
+
+    def source_name(index: int) -> str:
+        return source_names[index] if source_names and index < len(source_names) else str(index + 1)
+
+    row_count = 0
+    for files_done, rows in enumerate(row_blocks, start=1):
+        source = files_done - 1
+        for row in rows:
+            if deduper is not None:
+                verdict, owner = deduper.check(row, source)
+                if verdict == RowDeduper.DUPLICATE:
+                    continue
+                if verdict == RowDeduper.CONFLICT:
+                    conflicts_ws.append([source_name(source), source_name(owner)] + list(row))
+                    continue
+            merged_ws.append(row)
+            row_count += 1
+            if progress is not None and row_count % PROGRESS_ROW_INTERVAL == 0:
+                progress(source, row_count)
+        if progress is not None:
+            progress(files_done, row_count)
+
+    with metrics.span("merge_save"):
+        merged_wb.save(output_path)
+    stats = {"duplicates": deduper.duplicates, "conflicts": deduper.conflicts} if deduper else {"duplicates": 0, "conflicts": 0}
+    return row_count, stats
+
+
+def iter_row_blocks(filepaths: list[str], workers: int = None, schema: MergeSchema = DEFAULT_SCHEMA):
+    """
+    filepaths의 각 파일을 파싱해서 파일별 행 리스트를 filepaths 순서대로 내놓음
+    workers가 2 이상이면 프로세스 풀에서 병렬로 파싱하고, 결과 순서는 항상 filepaths 순서를 따름
+    """
+    workers = MERGE_WORKERS if workers is None else workers
+    if workers <= 1 or len(filepaths) <= 1:
+        for path in filepaths:
+            yield iter_source_rows(path, schema)
+        return
+    schemas = [schema] * len(filepaths)
+    if workers == MERGE_WORKERS:
+        pool = get_parse_pool()
+        yield from pool.map(extract_rows, filepaths, schemas)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(extract_rows, filepaths, schemas)
+
+
+def merge_files(template_path: str, filepaths: list[str], output_path: str, workers: int = None, progress=None,
+                schema: MergeSchema = DEFAULT_SCHEMA) -> int:
+    """filepaths 순서대로 각 파일의 5번째 행부터를 읽어 하나의 파일로 병합"""
+    row_count, _ = write_merged_workbook(template_path, iter_row_blocks(filepaths, workers, schema), output_path, progress,
+                                         schema=schema)
+    return row_count
+
+
+# --- 증분 병합 캐시 ---
+# uploads/{version}.mergecache/
+#   index.json      : {파일명: {"size", "mtime_ns", "sha256"}}
+#   {sha256}.{스키마 해시}.rows : 해당 내용의 파일에서 그 병합 스키마로 추출한 5번째 행 이후 데이터
+#                     (MERGE_COLUMNS 등이 바뀌면 이름이 달라지므로 예전 캐시는 다음 병합 때 정리됨)
+#   outputs.json    : {입력 fingerprint: 그 입력으로 만든 병합 결과 파일 정보} (merge_jobs에서 재사용)
+# 파일 크기/수정시간이 같으면 그대로 사용하고, 달라졌으면 해시를 비교해서 내용이 바뀐 파일만 다시 파싱
+
+def get_merge_cache_dir(version_dir: str) -> str:
+    """버전 폴더 옆에 위치한 병합 캐시 폴더 경로"""
+    return os.path.normpath(version_dir) + MERGE_CACHE_SUFFIX
+
+
+def file_sha256(filepath: str) -> str:
+    """파일 내용의 sha256 해시"""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def indexed_sha256(path: str, stat: os.stat_result, index: dict) -> str:
+    """크기/수정시간이 인덱스에 기록된 값과 같으면 기록된 해시를, 아니면 파일을 읽어 계산한 해시를 리턴"""
+    entry = index.get(os.path.basename(path))
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha256"]
+    return file_sha256(path)
+
+
+def load_merge_cache_index(cache_dir: str, name: str = MERGE_CACHE_INDEX) -> dict:
+    """병합 캐시 인덱스 로드 (없거나 깨졌으면 빈 인덱스)"""
+    index_path = os.path.join(cache_dir, name)
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_merge_cache_index(cache_dir: str, index: dict, name: str = MERGE_CACHE_INDEX):
+    """병합 캐시 인덱스를 임시 파일에 쓴 뒤 교체 (동시에 읽는 쪽이 깨진 파일을 보지 않도록)"""
+    index_path = os.path.join(cache_dir, name)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, index_path)
+
+
+def cache_filename(sha256: str, schema: MergeSchema = DEFAULT_SCHEMA) -> str:
+    return f"{sha256}.{schema_key(schema)}{MERGE_CACHE_ROWS_SUFFIX}"
+
+
+def write_cached_rows(cache_path: str, rows: list[tuple]):
+    """추출한 행을 캐시 파일로 저장 (snapshot과 같은 JSON 형식)"""
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            snapshot.dump_values(rows, f)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, cache_path)
+
+
+@metrics.timed("merge_load_cached")
+def read_cached_rows(cache_path: str) -> list[tuple]:
+    """캐시 파일에서 행 로드 (형식이 맞지 않으면 ValueError)"""
+    with open(cache_path, "r", encoding="utf-8") as f:
+        rows = snapshot.load_values(f.read())
+    if not isinstance(rows, list) or not all(isinstance(row, list) for row in rows):
+        raise ValueError(f"잘못된 병합 캐시 파일입니다: {cache_path}")
+    return [tuple(row) for row in rows]
+
+
+def store_cached_rows(cache_dir: str, sha256: str, rows: list[tuple], schema: MergeSchema = DEFAULT_SCHEMA):
+    """
+    업로드 단계에서 이미 추출한 행(schema로 추출)을 병합 캐시에 미리 저장
+    캐시는 내용 해시로 찾기 때문에 다음 병합 때 이 파일은 다시 파싱하지 않음
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = os.path.join(cache_dir, cache_filename(sha256, schema))
+    if not os.path.exists(cache_path):
+        write_cached_rows(cache_path, rows)
+
+
+def parse_to_cache(filepath: str, cache_path: str, schema: MergeSchema = DEFAULT_SCHEMA) -> tuple[int, float]:
+    """
+    파일을 파싱해서 바로 캐시 파일로 저장 (프로세스 풀에서 실행)
+    지표는 부모 프로세스에만 쌓이므로 파싱 시간을 재서 같이 리턴
+
+    Returns:
+        (행 수, 파싱+저장에 걸린 초)
+    """
+    start = time.perf_counter()
+    rows = extract_rows(filepath, schema)
+    write_cached_rows(cache_path, rows)
+    return len(rows), time.perf_counter() - start
+
+
+def refresh_merge_cache(filepaths: list[str], cache_dir: str, workers: int = None,
+                        schema: MergeSchema = DEFAULT_SCHEMA) -> tuple[list[str], dict]:
+    """
+    filepaths 기준으로 병합 캐시를 최신 상태로 맞춤
+    - 크기/수정시간이 같거나 내용 해시가 같은 파일: 캐시 사용 (hit)
+    - 새로 추가되었거나 내용이 바뀐 파일: 다시 파싱 (miss)
+    - 더 이상 없는 파일: 캐시에서 제거
+
+    Returns:
+        (filepaths 순서대로의 캐시 파일 경로 리스트, {"hits", "misses", "dropped"})
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    old_index = load_merge_cache_index(cache_dir)
+    new_index = {}
+    to_parse = {}
+    hits = 0
+
+    for path in filepaths:
+        filename = os.path.basename(path)
+        stat = os.stat(path)
+        sha = indexed_sha256(path, stat, old_index)
+        cache_path = os.path.join(cache_dir, cache_filename(sha, schema))
+        new_index[filename] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha}
+        if os.path.exists(cache_path):
+            hits += 1
+        else:
+            to_parse[cache_path] = path
+
+    # 바뀐 파일만 프로세스 풀에서 파싱
+    workers = MERGE_WORKERS if workers is None else workers
+    if workers <= 1 or len(to_parse) <= 1:
+        parsed = [parse_to_cache(path, cache_path, schema) for cache_path, path in to_parse.items()]
+    else:
+        pool = get_parse_pool() if workers == MERGE_WORKERS else ProcessPoolExecutor(max_workers=workers)
+        parsed = list(pool.map(parse_to_cache, to_parse.values(), to_parse.keys(), [schema] * len(to_parse)))
+        if pool is not _parse_pool:
+            pool.shutdown()
+    for _, elapsed in parsed:
+        metrics.SPAN_LATENCY.observe(elapsed, span="merge_parse")
+
+    # 삭제된 파일의 캐시 정리
+    live = {cache_filename(entry["sha256"], schema) for entry in new_index.values()}
+    dropped = 0
+    for name in os.listdir(cache_dir):
+        if name.endswith((MERGE_CACHE_ROWS_SUFFIX, LEGACY_CACHE_SUFFIX)) and name not in live:
+            os.remove(os.path.join(cache_dir, name))
+            dropped += 1
+
+    save_merge_cache_index(cache_dir, new_index)
+    cache_paths = [os.path.join(cache_dir, cache_filename(new_index[os.path.basename(p)]["sha256"], schema)) for p in filepaths]
+    return cache_paths, {"hits": hits, "misses": len(filepaths) - hits, "dropped": dropped}
+
+
+def merge_files_cached(template_path: str, filepaths: list[str], output_path: str, cache_dir: str, workers: int = None, progress=None,
+                       dedupe: bool = False, schema: MergeSchema = DEFAULT_SCHEMA) -> tuple[int, dict]:
+    """
+    병합 캐시를 사용해서 병합 (바뀐 파일만 다시 파싱)
+    캐시 파일은 병합하면서 하나씩 로드하므로 메모리 사용은 가장 큰 파일 하나 크기로 제한됨
+
+    Returns:
+        (병합된 데이터 행 수, 캐시 hit/miss 통계와 중복/충돌 행 수)
+    """
+    cache_paths, stats = refresh_merge_cache(filepaths, cache_dir, workers, schema)
+    row_count, dedupe_stats = write_merged_workbook(
+        template_path, (read_cached_rows(path) for path in cache_paths), output_path, progress,
+        dedupe=dedupe, source_names=[os.path.basename(path) for path in filepaths], schema=schema
+    )
+    stats.update(dedupe_stats)
+    return row_count, stats
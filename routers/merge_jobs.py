@@ -0,0 +1,293 @@
+import os
+import time
+import uuid
+import hashlib
+import threading
+from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from routers import merge_engine, metadata_store, metrics, shared_state
+
+# --- Configuration ---
+# 동시에 실행할 수 있는 병합 작업 수
+MERGE_JOB_WORKERS = int(os.environ.get("MERGE_JOB_WORKERS", "2"))
+# 끝난 작업 정보를 보관하는 시간 (초)
+MERGE_JOB_RETENTION_SECONDS = int(os.environ.get("MERGE_JOB_RETENTION_SECONDS", "3600"))
+# 진행률을 공유 저장소(metadata_store)에 기록하는 최소 간격 (초), 다른 워커 프로세스로 온 진행률 조회에 사용
+MERGE_JOB_SYNC_SECONDS = float(os.environ.get("MERGE_JOB_SYNC_SECONDS", "1"))
+# 결과 파일 이름에 붙이는 작업 ID 길이
+OUTPUT_ID_LENGTH = 12
+# 병합 캐시 폴더 안의 잠금 파일 (같은 버전의 병합은 워커 프로세스 사이에서도 한 번에 하나씩)
+MERGE_LOCK_FILENAME = "merge.lock"
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class MergeJob:
+    """
+    백그라운드 병합 작업 하나의 상태와 진행률
+    상태는 metadata_store에도 기록해서 다른 워커 프로세스에서도 get_job()으로 조회할 수 있음
+    """
+
+    def __init__(self, version: str, fingerprint: str, template_path: str, filepaths: list[str], output_dir: str, cache_dir: str,
+                 dedupe: bool = False):
+        self.id = uuid.uuid4().hex
+        self.version = version
+        self.fingerprint = fingerprint
+        self.template_path = template_path
+        self.filepaths = filepaths
+        self.output_dir = output_dir
+        self.cache_dir = cache_dir
+        self.dedupe = dedupe
+        self.status = JOB_QUEUED
+        self.files_total = len(filepaths)
+        self.files_done = 0
+        self.rows_written = 0
+        self.output_path = None
+        self.output_filename = None
+        self.cache_stats = None
+        self.reused = False
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.future = None
+        self._synced_at = 0.0
+
+    @classmethod
+    def from_state(cls, state: dict):
+        """metadata_store에 기록된 상태로 만든 조회용 MergeJob (다른 워커 프로세스에서 실행 중이거나 끝난 작업)"""
+        job = cls(state["version"], state["fingerprint"], None, [], state["output_dir"], state["cache_dir"], state["dedupe"])
+        job.id = state["job_id"]
+        for name in ("status", "files_total", "files_done", "rows_written", "output_path", "output_filename",
+                     "cache_stats", "reused", "error", "created_at", "finished_at"):
+            setattr(job, name, state[name])
+        return job
+
+    def state(self) -> dict:
+        """metadata_store에 기록할 상태"""
+        return {**self.to_dict(), "fingerprint": self.fingerprint, "output_dir": self.output_dir, "cache_dir": self.cache_dir,
+                "output_path": self.output_path, "created_at": self.created_at, "finished_at": self.finished_at}
+
+    def sync(self, force: bool = True):
+        """상태를 metadata_store에 기록 (force가 아니면 MERGE_JOB_SYNC_SECONDS에 한 번만)"""
+        now = time.monotonic()
+        if not force and now - self._synced_at < MERGE_JOB_SYNC_SECONDS:
+            return
+        self._synced_at = now
+        try:
+            metadata_store.save_merge_job(self.id, self.state())
+        except Exception as e:
+            print(f"Error saving merge job {self.id} state: {e}")
+
+    def update_progress(self, files_done: int, rows_written: int):
+        """merge_engine에서 파일 하나를 다 쓸 때마다(또는 일정 행마다) 호출"""
+        self.files_done = files_done
+        self.rows_written = rows_written
+        self.sync(force=False)
+
+    def run(self):
+        """작업 스레드에서 실제 병합 실행"""
+        try:
+            # 같은 버전의 병합은 워커 프로세스 사이에서도 한 번에 하나씩 (병합 캐시와 결과 파일 이름을 같이 쓰므로)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with shared_state.file_lock(os.path.join(self.cache_dir, MERGE_LOCK_FILENAME)):
+                self.status = JOB_RUNNING
+                self.sync()
+                # 기다리는 동안 다른 워커가 같은 입력으로 병합을 끝냈으면 새로 병합하지 않고 그 결과 파일을 사용
+                entry = load_output(self.fingerprint, self.output_dir, self.cache_dir)
+                if entry is not None:
+                    apply_output(self, entry)
+                else:
+                    self.merge()
+            self.status = JOB_DONE
+        except Exception as e:
+            print(f"Error in merge job {self.id} ({self.version}): {e}")
+            self.error = str(e)
+            self.status = JOB_FAILED
+            raise
+        finally:
+            self.finished_at = time.time()
+            self.sync()
+            _release(self)
+
+    def merge(self):
+        """병합 캐시를 써서 병합하고 결과 파일을 입력 fingerprint로 기록 (merge.lock 안에서 호출)"""
+        # 현재 시간 + 작업 ID로 파일명 생성 (같은 분에 끝난 다른 병합이 기록된 결과 파일을 덮어쓰지 않도록)
+        timestamp = datetime.now().strftime("%y%m%d_%H_%M")
+        suffix = "_dedupe" if self.dedupe else ""
+        self.output_filename = f"merged_output_{self.version}_{timestamp}{suffix}_{self.id[:OUTPUT_ID_LENGTH]}.xlsx"
+        os.makedirs(self.output_dir, exist_ok=True)
+        output_path = os.path.join(self.output_dir, self.output_filename)
+        row_count, self.cache_stats = merge_engine.merge_files_cached(
+            self.template_path, self.filepaths, output_path, self.cache_dir, progress=self.update_progress, dedupe=self.dedupe
+        )
+        metrics.MERGE_ROWS.inc(row_count, version=self.version, mode="dedupe" if self.dedupe else "stream")
+        self.output_path = output_path
+        self.rows_written = row_count
+        try:
+            record_output(self)
+        except OSError as e:
+            print(f"Error recording merge output {self.output_filename}: {e}")
+
+    def to_dict(self) -> dict:
+        """진행률 조회 API 응답용"""
+        return {
+            "job_id": self.id,
+            "version": self.version,
+            "dedupe": self.dedupe,
+            "status": self.status,
+            "files_total": self.files_total,
+            "files_done": self.files_done,
+            "rows_written": self.rows_written,
+            "output_filename": self.output_filename,
+            "cache_stats": self.cache_stats,
+            "reused": self.reused,
+            "error": self.error,
+            "download_url": f"/merge/jobs/{self.id}/download" if self.status == JOB_DONE else None,
+        }
+
+
+_executor = ThreadPoolExecutor(max_workers=MERGE_JOB_WORKERS, thread_name_prefix="merge-job")
+_jobs = {}  # job id -> MergeJob
+_active = {}  # 입력 fingerprint -> 진행 중인 MergeJob
+_lock = threading.Lock()
+_outputs_lock = threading.Lock()  # outputs.json 읽기/쓰기
+
+
+def input_fingerprint(version: str, template_path: str, filepaths: list[str], cache_dir: str, dedupe: bool = False) -> str:
+    """
+    버전, 병합 방식, 병합 스키마, 템플릿, 병합 대상 파일들(이름/내용 해시)로 입력 조합을 식별하는 해시
+    파일 내용 해시는 병합 캐시 인덱스에 기록된 크기/수정시간이 같으면 다시 읽지 않음
+    """
+    index = merge_engine.load_merge_cache_index(cache_dir)
+    digest = hashlib.sha256(f"{version}\0{'dedupe' if dedupe else 'all'}".encode("utf-8"))
+    digest.update(f"\0schema\0{merge_engine.schema_key(merge_engine.DEFAULT_SCHEMA)}".encode("utf-8"))
+    digest.update(f"\0template\0{merge_engine.file_sha256(template_path)}".encode("utf-8"))
+    for path in filepaths:
+        sha = merge_engine.indexed_sha256(path, os.stat(path), index)
+        digest.update(f"\0{os.path.basename(path)}\0{sha}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def record_output(job: MergeJob):
+    """병합 결과 파일을 입력 fingerprint로 기록 (같은 입력으로 다시 병합하면 이 파일을 재사용)"""
+    stat = os.stat(job.output_path)
+    with _outputs_lock:
+        outputs = merge_engine.load_merge_cache_index(job.cache_dir, merge_engine.MERGE_OUTPUT_INDEX)
+        # 지워졌거나 같은 이름으로 덮어쓴 결과 파일 기록은 정리
+        outputs = {fingerprint: entry for fingerprint, entry in outputs.items() if _output_is_intact(job.output_dir, entry)}
+        outputs[job.fingerprint] = {
+            "filename": job.output_filename,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "rows": job.rows_written,
+            "files": job.files_total,
+            "cache_stats": job.cache_stats,
+        }
+        merge_engine.save_merge_cache_index(job.cache_dir, outputs, merge_engine.MERGE_OUTPUT_INDEX)
+
+
+def _output_is_intact(output_dir: str, entry: dict) -> bool:
+    """기록된 결과 파일이 그대로 있는지 (크기/수정시간이 기록과 같은지)"""
+    try:
+        stat = os.stat(os.path.join(output_dir, entry["filename"]))
+    except OSError:
+        return False
+    return stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]
+
+
+def load_output(fingerprint: str, output_dir: str, cache_dir: str):
+    """같은 입력으로 만든 결과 파일이 그대로 남아 있으면 그 기록 (없으면 None)"""
+    with _outputs_lock:
+        entry = merge_engine.load_merge_cache_index(cache_dir, merge_engine.MERGE_OUTPUT_INDEX).get(fingerprint)
+    if entry is None or not _output_is_intact(output_dir, entry):
+        return None
+    return entry
+
+
+def apply_output(job: MergeJob, entry: dict):
+    """기록된 결과 파일을 이 작업의 결과로 사용 (병합하지 않음)"""
+    job.reused = True
+    job.files_done = entry["files"]
+    job.rows_written = entry["rows"]
+    job.output_filename = entry["filename"]
+    job.output_path = os.path.join(job.output_dir, entry["filename"])
+    job.cache_stats = entry["cache_stats"]
+
+
+def find_output(version: str, fingerprint: str, template_path: str, filepaths: list[str], output_dir: str, cache_dir: str,
+                dedupe: bool = False):
+    """같은 입력으로 만든 결과 파일이 그대로 남아 있으면 이미 끝난 MergeJob으로 리턴 (없으면 None)"""
+    entry = load_output(fingerprint, output_dir, cache_dir)
+    if entry is None:
+        return None
+    job = MergeJob(version, fingerprint, template_path, filepaths, output_dir, cache_dir, dedupe)
+    apply_output(job, entry)
+    job.status = JOB_DONE
+    job.finished_at = job.created_at
+    job.future = Future()
+    job.future.set_result(None)
+    return job
+
+
+def submit_merge(version: str, template_path: str, filepaths: list[str], output_dir: str, cache_dir: str,
+                 dedupe: bool = False) -> MergeJob:
+    """
+    병합 작업을 백그라운드로 등록
+    같은 버전, 같은 병합 방식, 같은 입력 파일 조합의 작업이 이미 대기/실행 중이면 새로 만들지 않고 그 작업을 리턴
+    입력 내용이 지난 병합 때와 같고 그 결과 파일이 남아 있으면 병합하지 않고 이미 끝난 작업으로 그 파일을 리턴
+    (입력 파일 해시를 계산할 수 있으므로 이벤트 루프 밖에서 호출)
+    """
+    fingerprint = input_fingerprint(version, template_path, filepaths, cache_dir, dedupe)
+    with _lock:
+        _prune()
+        job = _active.get(fingerprint)
+        if job is not None:
+            return job
+        job = find_output(version, fingerprint, template_path, filepaths, output_dir, cache_dir, dedupe)
+        if job is not None:
+            _jobs[job.id] = job
+        else:
+            job = MergeJob(version, fingerprint, template_path, filepaths, output_dir, cache_dir, dedupe)
+            # 실행 전에 먼저 기록해서 다른 워커 프로세스로 간 진행률 조회도 바로 찾을 수 있도록 함
+            job.sync()
+            # 같은 입력으로 들어온 다른 요청이 _active에서 이 작업을 찾았을 때 future가 항상 있도록 _lock 안에서 실행 등록
+            job.future = _executor.submit(job.run)
+            _jobs[job.id] = job
+            _active[fingerprint] = job
+            return job
+    job.sync()
+    return job
+
+
+def get_job(job_id: str):
+    """작업 ID로 작업 조회 (이 프로세스에 없으면 metadata_store에 기록된 다른 워커의 작업, 둘 다 없으면 None)"""
+    with _lock:
+        job = _jobs.get(job_id)
+    if job is not None:
+        return job
+    state = metadata_store.load_merge_job(job_id)
+    return MergeJob.from_state(state) if state is not None else None
+
+
+def _release(job: MergeJob):
+    """끝난 작업을 진행 중 목록에서 제거 (이후 같은 입력으로 요청하면 새 작업 생성)"""
+    with _lock:
+        if _active.get(job.fingerprint) is job:
+            del _active[job.fingerprint]
+
+
+def _prune():
+    """보관 시간이 지난 끝난 작업 정리 (_lock 안에서 호출)"""
+    now = time.time()
+    expired = [job_id for job_id, job in _jobs.items()
+               if job.finished_at is not None and now - job.finished_at > MERGE_JOB_RETENTION_SECONDS]
+    for job_id in expired:
+        del _jobs[job_id]
+    if expired:
+        try:
+            metadata_store.prune_merge_jobs(now - MERGE_JOB_RETENTION_SECONDS)
+        except Exception as e:
+            print(f"Error pruning merge job states: {e}")
@@ -0,0 +1,281 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from routers import metrics
+
+# --- Configuration ---
+JSON_DIR = os.path.join(os.path.dirname(__file__), "..", "json")
+# 여러 워커 프로세스(WEB_CONCURRENCY)가 같은 DB 파일을 공유 (WAL 모드라 읽기는 쓰기와 동시에 가능)
+METADATA_DB_PATH = os.environ.get("METADATA_DB_PATH", os.path.join(JSON_DIR, "metadata.sqlite3"))
+# 예전에 쓰던 JSON 파일 (처음 DB를 만들 때 한 번만 옮겨옴)
+FILE_OWNERSHIP_PATH = os.path.join(JSON_DIR, "file_ownership.json")
+AGENDA_PATH = os.path.join(JSON_DIR, "agenda_no.json")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_ownership (
+    version TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    ip TEXT NOT NULL,
+    upload_date TEXT,
+    upload_time TEXT,
+    PRIMARY KEY (version, filename)
+);
+CREATE INDEX IF NOT EXISTS file_ownership_ip ON file_ownership (version, ip);
+CREATE TABLE IF NOT EXISTS agenda_users (
+    user TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS agenda_numbers (
+    user TEXT NOT NULL,
+    version TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    PRIMARY KEY (user, version, number)
+);
+CREATE INDEX IF NOT EXISTS agenda_numbers_number ON agenda_numbers (version, number);
+CREATE TABLE IF NOT EXISTS merge_jobs (
+    id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_initialized = False
+_init_lock = threading.Lock()
+
+
+def connect() -> sqlite3.Connection:
+    """메타데이터 DB 연결 (처음 연결할 때 스키마 생성 및 JSON 마이그레이션)"""
+    conn = sqlite3.connect(METADATA_DB_PATH, timeout=30)
+    if not _initialized:
+        init_store(conn)
+    return conn
+
+
+def init_store(conn: sqlite3.Connection):
+    """WAL 모드 설정, 스키마 생성, 예전 JSON 파일 마이그레이션 (한 번만)"""
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        # 여러 프로세스가 동시에 시작해도 한 번만 옮기도록 쓰기 잠금을 잡고 확인
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            done = conn.execute("SELECT value FROM meta WHERE key = 'json_migrated'").fetchone()
+            if done is None:
+                migrate_json(conn)
+                conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', '1')")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        _initialized = True
+
+
+def _read_json(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except ValueError as e:
+        print(f"Error reading {path} for migration: {e}")
+        return {}
+
+
+def migrate_json(conn: sqlite3.Connection):
+    """
+    file_ownership.json, agenda_no.json 내용을 DB로 옮김
+    - 이전 버전 호환성: 소유권이 IP 문자열만 저장된 경우 업로드 날짜/시간은 비워 둠
+    """
+    for version, files in _read_json(FILE_OWNERSHIP_PATH).items():
+        for filename, info in files.items():
+            if isinstance(info, dict):
+                record = (version, filename, info.get("ip", ""), info.get("upload_date"), info.get("upload_time"))
+            else:
+                record = (version, filename, str(info), None, None)
+            conn.execute(
+                "INSERT OR REPLACE INTO file_ownership (version, filename, ip, upload_date, upload_time) VALUES (?, ?, ?, ?, ?)",
+                record
+            )
+
+    for user, versions in _read_json(AGENDA_PATH).items():
+        conn.execute("INSERT OR IGNORE INTO agenda_users (user) VALUES (?)", (user,))
+        for version, numbers in versions.items():
+            conn.executemany(
+                "INSERT OR IGNORE INTO agenda_numbers (user, version, number) VALUES (?, ?, ?)",
+                [(user, version, int(number)) for number in numbers]
+            )
+
+
+# --- 파일 소유권 ---
+@metrics.timed("metadata_io")
+def upsert_file_owners(records: list[tuple]):
+    """
+    여러 파일의 소유자 정보를 한 트랜잭션으로 저장 (있으면 교체)
+
+    Args:
+        records: (version, filename, ip, upload_date, upload_time) 튜플 리스트
+    """
+    conn = connect()
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO file_ownership (version, filename, ip, upload_date, upload_time) VALUES (?, ?, ?, ?, ?)",
+                records
+            )
+    finally:
+        conn.close()
+
+
+def upsert_file_owner(version: str, filename: str, ip: str, upload_date: str = None, upload_time: str = None):
+    """파일 하나의 소유자 정보 저장 (있으면 교체)"""
+    upsert_file_owners([(version, filename, ip, upload_date, upload_time)])
+
+
+@metrics.timed("metadata_io")
+def get_file_owner(version: str, filename: str):
+    """파일 소유자 정보 {"ip", "upload_date", "upload_time"} 리턴 (없으면 None)"""
+    conn = connect()
+    try:
+        row = conn.execute(
+            "SELECT ip, upload_date, upload_time FROM file_ownership WHERE version = ? AND filename = ?",
+            (version, filename)
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    return {"ip": row[0], "upload_date": row[1], "upload_time": row[2]}
+
+
+@metrics.timed("metadata_io")
+def get_owned_files(version: str, ip: str) -> set[str]:
+    """해당 IP가 올린 파일 이름 집합 (한 번의 쿼리로 조회)"""
+    conn = connect()
+    try:
+        rows = conn.execute("SELECT filename FROM file_ownership WHERE version = ? AND ip = ?", (version, ip)).fetchall()
+    finally:
+        conn.close()
+    return {filename for (filename,) in rows}
+
+
+@metrics.timed("metadata_io")
+def load_file_ownership() -> dict:
+    """전체 소유권 정보를 예전 file_ownership.json과 같은 형태의 dict로 리턴"""
+    conn = connect()
+    try:
+        rows = conn.execute("SELECT version, filename, ip, upload_date, upload_time FROM file_ownership").fetchall()
+    finally:
+        conn.close()
+    ownership = {}
+    for version, filename, ip, upload_date, upload_time in rows:
+        if upload_date is None and upload_time is None:
+            ownership.setdefault(version, {})[filename] = ip
+        else:
+            ownership.setdefault(version, {})[filename] = {"ip": ip, "upload_date": upload_date, "upload_time": upload_time}
+    return ownership
+
+
+# --- 안건 번호 ---
+@metrics.timed("metadata_io")
+def set_agenda_numbers_many(entries: list[tuple]):
+    """
+    여러 사용자/버전의 안건 번호 목록을 한 트랜잭션으로 통째로 교체
+
+    Args:
+        entries: (user, version, numbers) 튜플 리스트 (같은 user/version이 여러 번 있으면 마지막 것이 남음)
+    """
+    conn = connect()
+    try:
+        with conn:
+            for user, version, numbers in entries:
+                conn.execute("INSERT OR IGNORE INTO agenda_users (user) VALUES (?)", (user,))
+                conn.execute("DELETE FROM agenda_numbers WHERE user = ? AND version = ?", (user, version))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO agenda_numbers (user, version, number) VALUES (?, ?, ?)",
+                    [(user, version, int(number)) for number in numbers]
+                )
+    finally:
+        conn.close()
+
+
+def set_agenda_numbers(user: str, version: str, numbers):
+    """사용자의 해당 버전 안건 번호 목록을 통째로 교체"""
+    set_agenda_numbers_many([(user, version, numbers)])
+
+
+@metrics.timed("metadata_io")
+def get_agenda_numbers(user: str):
+    """사용자의 버전별 안건 번호 {"ver1": [...], "ver2": [...]} 리턴 (등록된 사용자가 아니면 None)"""
+    conn = connect()
+    try:
+        if conn.execute("SELECT 1 FROM agenda_users WHERE user = ?", (user,)).fetchone() is None:
+            return None
+        rows = conn.execute(
+            "SELECT version, number FROM agenda_numbers WHERE user = ? ORDER BY version, number", (user,)
+        ).fetchall()
+    finally:
+        conn.close()
+    agenda = {"ver1": [], "ver2": []}
+    for version, number in rows:
+        agenda.setdefault(version, []).append(number)
+    return agenda
+
+
+@metrics.timed("metadata_io")
+def load_all_agenda_numbers() -> dict:
+    """전체 사용자의 버전별 안건 번호 {user: {"ver1": [...], "ver2": [...]}} (한 번의 쿼리로 조회, 인덱스 초기화용)"""
+    conn = connect()
+    try:
+        users = conn.execute("SELECT user FROM agenda_users").fetchall()
+        rows = conn.execute("SELECT user, version, number FROM agenda_numbers ORDER BY user, version, number").fetchall()
+    finally:
+        conn.close()
+    agenda = {user: {"ver1": [], "ver2": []} for (user,) in users}
+    for user, version, number in rows:
+        agenda.setdefault(user, {"ver1": [], "ver2": []}).setdefault(version, []).append(number)
+    return agenda
+
+
+# --- 병합 작업 상태 (여러 워커 프로세스가 같은 작업의 진행률을 조회할 수 있도록) ---
+@metrics.timed("metadata_io")
+def save_merge_job(job_id: str, state: dict):
+    """병합 작업 상태(dict)를 저장 (있으면 교체)"""
+    conn = connect()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO merge_jobs (id, state, updated_at) VALUES (?, ?, ?)",
+                (job_id, json.dumps(state, ensure_ascii=False), time.time())
+            )
+    finally:
+        conn.close()
+
+
+@metrics.timed("metadata_io")
+def load_merge_job(job_id: str):
+    """저장된 병합 작업 상태 (없으면 None)"""
+    conn = connect()
+    try:
+        row = conn.execute("SELECT state FROM merge_jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    return json.loads(row[0]) if row is not None else None
+
+
+@metrics.timed("metadata_io")
+def prune_merge_jobs(older_than: float):
+    """older_than(epoch 초) 전에 마지막으로 갱신된 병합 작업 상태 삭제"""
+    conn = connect()
+    try:
+        with conn:
+            conn.execute("DELETE FROM merge_jobs WHERE updated_at < ?", (older_than,))
+    finally:
+        conn.close()
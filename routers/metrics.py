@@ -0,0 +1,172 @@
+import time
+import threading
+import functools
+from bisect import bisect_left
+from contextlib import contextmanager
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+# --- Configuration ---
+# 히스토그램 구간 (초), 병합처럼 오래 걸리는 작업도 구분되도록 기본 Prometheus 구간에 30/60/120초 추가
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0, 30.0, 60.0, 120.0)
+# Prometheus text exposition format
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter()
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """계속 증가만 하는 값 (예: 병합된 행 수, 업로드된 바이트 수)"""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}  # 라벨 값 tuple -> 누적값
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """구간별 누적 개수와 합계로 분포를 기록 (예: 요청 처리 시간)"""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._values = {}  # 라벨 값 tuple -> [구간별 개수 리스트, 합계, 개수]
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    le = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                inf = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{inf} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+# --- 수집하는 지표 ---
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency in seconds.", ("method", "route", "status"))
+SPAN_LATENCY = Histogram("app_span_duration_seconds", "Latency of named code spans in seconds.", ("span",))
+MERGE_ROWS = Counter("merge_rows_total", "Data rows written to merged workbooks.", ("version", "mode"))
+UPLOAD_BYTES = Counter("upload_bytes_total", "Bytes received in uploaded files.", ("kind",))
+
+REGISTRY = [REQUEST_LATENCY, SPAN_LATENCY, MERGE_ROWS, UPLOAD_BYTES]
+
+
+@contextmanager
+def span(name: str):
+    """with 블록 실행 시간을 app_span_duration_seconds{span=name}에 기록 (예외가 나도 기록)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        SPAN_LATENCY.observe(time.perf_counter() - start, span=name)
+
+
+def timed(name: str):
+    """함수 실행 시간을 span으로 기록하는 데코레이터"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def render_metrics() -> str:
+    """모든 지표를 Prometheus text 형식으로"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    모든 HTTP 요청의 처리 시간을 method, route(경로 템플릿), status별로 기록하는 ASGI 미들웨어
+    route는 /merge/{version} 같은 템플릿을 쓰므로 파일명/키가 달라도 라벨 수가 늘어나지 않음
+    (스트리밍 응답은 본문 전송이 끝날 때까지의 시간)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status_code,
+            )
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus 수집용 지표"""
+    return PlainTextResponse(render_metrics(), media_type=METRICS_CONTENT_TYPE)
@@ -0,0 +1,159 @@
+import os
+import sys
+import time
+import threading
+from collections import OrderedDict, namedtuple
+from routers import shared_state
+
+# --- Configuration ---
+# 캐시에 보관할 최대 결과 파일 수
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "8"))
+# 캐시가 차지할 수 있는 최대 메모리 (대략적인 바이트 수)
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# 최신 결과 파일 경로를 다시 확인하기 전까지 디스크를 보지 않는 시간 (초)
+# 업로드로 바뀐 경우는 invalidate_latest()로 즉시 반영되고, 직접 복사한 파일은 이 시간 후에 반영됨
+RESULT_REVALIDATE_SECONDS = float(os.environ.get("RESULT_REVALIDATE_SECONDS", "5"))
+
+# 결과 파일 하나를 파싱한 내용
+# rows: 화면에 보여줄 행 (빈 셀은 ""), key_rows: B열 검색 키 -> 그 키가 있는 rows 위치 리스트,
+# search_buffer: A, F, G, H, I열 소문자 문자열을 이어 붙인 SearchBuffer (부분 문자열 검색용)
+ParsedResult = namedtuple("ParsedResult", ["rows", "key_rows", "search_buffer"])
+
+
+def index_keys(keys) -> dict:
+    """행마다의 B열 검색 키로 키 -> 행 위치 리스트 사전을 만듦 (키가 없는 행은 제외)"""
+    key_rows = {}
+    for idx, key in enumerate(keys):
+        if key is not None:
+            key_rows.setdefault(key, []).append(idx)
+    return key_rows
+
+
+def estimate_size(parsed: ParsedResult) -> int:
+    """파싱된 결과가 차지하는 메모리를 대략 계산 (바이트)"""
+    size = sys.getsizeof(parsed.rows) + sys.getsizeof(parsed.key_rows) + parsed.search_buffer.nbytes()
+    for row in parsed.rows:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(cell) for cell in row)
+    for key, positions in parsed.key_rows.items():
+        size += sys.getsizeof(key) + sys.getsizeof(positions)
+    return size
+
+
+class ResultCache:
+    """
+    결과 파일 경로별로 파싱된 행을 보관하는 LRU 캐시
+    - 항목 수와 전체 바이트 수 두 가지로 크기를 제한
+    - 같은 경로라도 수정시간(mtime)이 다르면 캐시에 없는 것으로 취급
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # path -> (mtime_ns, size, parsed)
+        self._oversized = set()  # 캐시에 넣기엔 너무 큰 (path, mtime_ns)
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path: str, mtime_ns: int):
+        """캐시된 결과 리턴 (없거나 파일이 바뀌었으면 None)"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != mtime_ns:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, path: str, mtime_ns: int, parsed: ParsedResult) -> bool:
+        """결과를 캐시에 추가하고, 제한을 넘으면 가장 오래 안 쓴 항목부터 제거. 너무 커서 못 넣으면 False"""
+        size = estimate_size(parsed)
+        with self._lock:
+            self._remove(path)
+            if size > self.max_bytes:
+                self._oversized.add((path, mtime_ns))
+                return False
+            self._entries[path] = (mtime_ns, size, parsed)
+            self.total_bytes += size
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+            return True
+
+    def is_oversized(self, path: str, mtime_ns: int) -> bool:
+        """캐시에 넣기엔 너무 커서 거절된 파일인지 확인"""
+        with self._lock:
+            return (path, mtime_ns) in self._oversized
+
+    def invalidate(self, path: str = None):
+        """해당 경로(없으면 전체)의 캐시 제거"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._oversized.clear()
+                self.total_bytes = 0
+            else:
+                self._remove(path)
+                self._oversized = {item for item in self._oversized if item[0] != path}
+
+    def _remove(self, path: str):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+    def stats(self) -> dict:
+        """hit/miss/eviction 카운터와 현재 사용량"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+result_cache = ResultCache(RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_MAX_BYTES)
+
+# version -> (최신 결과 파일 경로, mtime_ns, 확인한 시각)
+_latest = {}
+_latest_lock = threading.Lock()
+_latest_signal = shared_state.Signal("results")
+
+
+def get_latest(version: str, resolve) -> tuple[str, int]:
+    """
+    버전별 최신 결과 파일 (경로, mtime_ns) 리턴
+    RESULT_REVALIDATE_SECONDS 안에 다시 부르면 디스크를 보지 않고 기억해 둔 값을 그대로 사용
+    (다른 워커 프로세스에서 결과 파일이 올라왔다는 신호가 있으면 기억해 둔 값을 모두 버림)
+
+    Args:
+        version: ver1 또는 ver2
+        resolve: 최신 결과 파일 경로를 찾는 함수 (version -> path)
+    """
+    now = time.monotonic()
+    with _latest_lock:
+        if _latest_signal.changed():
+            _latest.clear()
+        cached = _latest.get(version)
+    if cached and now - cached[2] < RESULT_REVALIDATE_SECONDS:
+        return cached[0], cached[1]
+
+    path = resolve(version)
+    mtime_ns = os.stat(path).st_mtime_ns
+    with _latest_lock:
+        _latest[version] = (path, mtime_ns, now)
+    return path, mtime_ns
+
+
+def invalidate_latest(version: str):
+    """결과 파일이 새로 올라왔을 때 기억해 둔 최신 파일 정보를 지움 (다른 워커 프로세스에도 알림)"""
+    with _latest_lock:
+        _latest.pop(version, None)
+    _latest_signal.notify()
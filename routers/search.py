@@ -1,16 +1,41 @@
 import os
-import openpyxl
+import re
+import asyncio
+from datetime import datetime
+from collections import namedtuple
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import Request, APIRouter, Query, HTTPException, Depends
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from routers.authentification import verify_ip_whitelist
+from routers import metrics, search_index
+from routers.result_cache import result_cache, ParsedResult, get_latest, index_keys
+from routers.search_buffer import SearchBuffer
 
 # --- Configuration ---
 UPLOADS_DIR = "uploads"
 VERSIONS = ["ver1", "ver2"]
+# 동시에 실행할 수 있는 검색 수 (버전별 검색 하나가 스레드 하나를 씀)
+SEARCH_WORKERS = int(os.environ.get("SEARCH_WORKERS", "4"))
+# 버전별 검색 제한 시간 (초), 넘으면 해당 버전은 빈 결과로 표시
+SEARCH_TIMEOUT_SECONDS = float(os.environ.get("SEARCH_TIMEOUT_SECONDS", "10"))
+# 버전별로 한 페이지에 보여줄 기본 행 수와 최대 행 수
+SEARCH_PAGE_SIZE = int(os.environ.get("SEARCH_PAGE_SIZE", "500"))
+SEARCH_MAX_PAGE_SIZE = int(os.environ.get("SEARCH_MAX_PAGE_SIZE", "5000"))
+# 이력 검색에서 결과 파일 하나당 보여줄 최대 행 수
+SEARCH_HISTORY_ROWS_PER_FILE = int(os.environ.get("SEARCH_HISTORY_ROWS_PER_FILE", "100"))
+# 결과 파일명에 들어 있는 업로드 시각 (예: result_ver1_251017_19시31분.xlsx)
+RESULT_TIMESTAMP_PATTERN = re.compile(r"_(\d{6}_\d{2}시\d{2}분)")
+
+# 버전 하나의 검색 결과 한 페이지 (rows: offset부터 최대 limit개의 행, total: 일치하는 전체 행 수)
+SearchPage = namedtuple("SearchPage", ["rows", "total", "offset", "limit"])
+# 이력 검색에서 결과 파일 하나의 검색 결과 (timestamp: 파일 업로드 시각 "YYYY-MM-DD HH:MM")
+HistoryGroup = namedtuple("HistoryGroup", ["filename", "timestamp", "rows", "total"])
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
+_search_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="search")
 
 
 def get_version_dir(version: str):
@@ -18,106 +43,169 @@ def get_version_dir(version: str):
     return os.path.join(UPLOADS_DIR, version)
 
 
-def search_key_in_excel(version: str, key_value: str) -> list[dict]:
+def list_result_paths(version: str) -> list[str]:
+    """version/results 디렉토리에서 'result'로 시작하는 모든 결과 파일 경로 (파일명 순 = 업로드 순)"""
+    results_dir = os.path.join(get_version_dir(version), "results")
+    master_files = [f for f in os.listdir(results_dir) if f.startswith('result') and f.endswith('.xlsx')]
+    return [os.path.join(results_dir, f) for f in sorted(master_files)]
+
+
+def get_latest_result_path(version: str) -> str:
+    """
+    version/results 디렉토리에서 'result'로 시작하는 파일 중 가장 최근 파일 경로 (파일명 기준 정렬)
     """
-    업로드된 엑셀 파일의 두 번째 열(B열)에서 key_value와 일치하는 모든 행 찾기
+    result_paths = list_result_paths(version)
+
+    if not result_paths:
+        raise HTTPException(status_code=404, detail=f"'{version}/results' 디렉토리에서 'result'로 시작하는 파일을 찾을 수 없습니다.")
+
+    return result_paths[-1]
+
+
+def result_timestamp(result_path: str) -> str:
+    """결과 파일명의 업로드 시각을 "YYYY-MM-DD HH:MM"으로 (이름에 없으면 파일 수정시간)"""
+    match = RESULT_TIMESTAMP_PATTERN.search(os.path.basename(result_path))
+    if match:
+        try:
+            return datetime.strptime(match.group(1), "%y%m%d_%H시%M분").strftime("%Y-%m-%d %H:%M")
+        except ValueError:
+            pass
+    try:
+        return datetime.fromtimestamp(os.path.getmtime(result_path)).strftime("%Y-%m-%d %H:%M")
+    except OSError:
+        return ""
 
-    Args:
-        version (str): 버전 디렉토리 (ver1 또는 ver2)
-        key_value (str): 검색할 키 값.
+
+@metrics.timed("search_load")
+def get_parsed_result(version: str):
+    """
+    최신 결과 파일의 파싱된 행을 리턴
+    result_cache에 있고 파일이 바뀌지 않았으면 디스크를 전혀 보지 않고, 없으면 검색 인덱스에서 읽어 캐시에 넣음
 
     Returns:
-        List[dict]: 키 값과 일치하는 모든 행의 데이터와 스타일 정보.
-                    각 딕셔너리는 'cells' (셀 값 리스트)와 'styles' (스타일 리스트)를 포함.
+        (결과 파일 경로, ParsedResult) - 캐시에 넣기엔 너무 큰 파일이면 ParsedResult 대신 None
     """
-    matching_rows = []
-    try:
-        # version/results 디렉토리에서 'result'로 시작하는 파일 찾기
-        version_dir = get_version_dir(version)
-        results_dir = os.path.join(version_dir, "results")
-        master_files = [f for f in os.listdir(results_dir) if f.startswith('result') and f.endswith('.xlsx')]
+    master_path, mtime_ns = get_latest(version, get_latest_result_path)
+    parsed = result_cache.get(master_path, mtime_ns)
+    if parsed is not None:
+        return master_path, parsed
 
-        if not master_files:
-            raise HTTPException(status_code=404, detail=f"'{version}/results' 디렉토리에서 'result'로 시작하는 파일을 찾을 수 없습니다.")
+    version_dir = get_version_dir(version)
+    search_index.ensure_indexed(version_dir, master_path)
+    if result_cache.is_oversized(master_path, mtime_ns):
+        return master_path, None
 
-        # 가장 최근 파일 사용 (파일명 기준 정렬)
-        master_file = sorted(master_files)[-1]
-        master_path = os.path.join(results_dir, master_file)
+    rows, keys, search_texts = search_index.load_file_rows(version_dir, os.path.basename(master_path))
+    parsed = ParsedResult(rows, index_keys(keys), SearchBuffer(search_texts))
+    result_cache.put(master_path, mtime_ns, parsed)
+    return master_path, parsed
 
-        workbook = openpyxl.load_workbook(master_path)
-        sheet = workbook.active
 
-        # 옵션 1. 데이터 셀 색은 빼고 데이터만 추출하기 (현재 사용 중)
-        for row in sheet.iter_rows(min_row=5, values_only=True):
-            # 행에 데이터가 있고, 다섯 번째 열이 존재하는지 확인
-            if len(row) > 1 and row[1] is not None:
-                # 다섯 번째 열(인덱스 1)의 값을 문자열로 변환하여 비교
-                if str(row[1]).strip() == str(key_value).strip():
-                    # 빈 셀(None)은 빈 문자열로 변환하여 추가
-                    clean_row = ["" if cell is None else cell for cell in row]
-                    matching_rows.append(clean_row)
+def search_key_in_excel(version: str, key_value: str, offset: int = 0, limit: int = None) -> SearchPage:
+    """
+    업로드된 엑셀 파일의 두 번째 열(B열)에서 key_value와 일치하는 행 찾기
+    메모리에 캐시된 행에서 찾고, 캐시할 수 없는 큰 파일은 검색 인덱스(search_index)에 직접 질의
+
+    Args:
+        version (str): 버전 디렉토리 (ver1 또는 ver2)
+        key_value (str): 검색할 키 값.
+        offset (int): 건너뛸 일치 행 수
+        limit (int): 가져올 최대 행 수 (None이면 전부)
 
+    Returns:
+        SearchPage: offset부터 최대 limit개의 일치하는 행과 전체 일치 행 수
+    """
+    try:
+        master_path, parsed = get_parsed_result(version)
+        with metrics.span("search_scan"):
+            if parsed is None:
+                rows, total = search_index.search_key(get_version_dir(version), os.path.basename(master_path), key_value, offset, limit)
+                return SearchPage(rows, total, offset, limit)
+
+            # 캐시에 넣을 때 만든 키 사전에서 바로 찾음 (행 수와 상관없음)
+            matches = parsed.key_rows.get(str(key_value).strip(), [])
+            return page_rows(parsed, matches, offset, limit)
     except Exception as e:
         # 파일 처리 중 오류 발생 시 예외 처리
         raise HTTPException(status_code=400, detail=f"'master' 파일 처리 중 오류 발생: {e}")
 
-    return matching_rows
 
-
-def search_signal_in_excel(version: str, search_keyword: str) -> list[dict]:
+def search_signal_in_excel(version: str, search_keyword: str, offset: int = 0, limit: int = None) -> SearchPage:
     """
-    엑셀 파일의 A, F, G, H, I열에서 search_keyword를 포함하는 모든 행 찾기
+    엑셀 파일의 A, F, G, H, I열에서 search_keyword를 포함하는 행 찾기
+    메모리에 캐시된 검색 버퍼(SearchBuffer)에서 찾고, 캐시할 수 없는 큰 파일은 검색 인덱스(search_index)에 직접 질의
 
     Args:
         version (str): 버전 디렉토리 (ver1 또는 ver2)
         search_keyword (str): 검색할 키워드 (문자열)
+        offset (int): 건너뛸 일치 행 수
+        limit (int): 가져올 최대 행 수 (None이면 전부)
 
     Returns:
-        List[dict]: 키워드를 포함하는 모든 행의 데이터.
+        SearchPage: offset부터 최대 limit개의 일치하는 행과 전체 일치 행 수
     """
-    matching_rows = []
     try:
-        # version/results 디렉토리에서 'result'로 시작하는 파일 찾기
-        version_dir = get_version_dir(version)
-        results_dir = os.path.join(version_dir, "results")
-        master_files = [f for f in os.listdir(results_dir) if f.startswith('result') and f.endswith('.xlsx')]
+        master_path, parsed = get_parsed_result(version)
+        with metrics.span("search_scan"):
+            if parsed is None:
+                rows, total = search_index.search_substring(get_version_dir(version), os.path.basename(master_path), search_keyword, offset, limit)
+                return SearchPage(rows, total, offset, limit)
 
-        if not master_files:
-            raise HTTPException(status_code=404, detail=f"'{version}/results' 디렉토리에서 'result'로 시작하는 파일을 찾을 수 없습니다.")
+            return page_rows(parsed, parsed.search_buffer.find_rows(search_keyword.lower()), offset, limit)
+    except Exception as e:
+        # 파일 처리 중 오류 발생 시 예외 처리
+        raise HTTPException(status_code=400, detail=f"'master' 파일 처리 중 오류 발생: {e}")
 
-        # 가장 최근 파일 사용 (파일명 기준 정렬)
-        master_file = sorted(master_files)[-1]
-        master_path = os.path.join(results_dir, master_file)
 
-        workbook = openpyxl.load_workbook(master_path)
-        sheet = workbook.active
+def search_history_in_excel(version: str, key_value: str, limit_per_file: int = SEARCH_HISTORY_ROWS_PER_FILE) -> list[HistoryGroup]:
+    """
+    버전의 모든 결과 파일에서 검색 (키가 언제 처음 나타났고 어떻게 바뀌었는지 확인용)
+    검색 전에 새로 올라온 결과 파일만 인덱스에 추가하고, 이미 인덱싱된 파일은 다시 읽지 않음
 
-        # A, F, G, H, I열 (인덱스 0, 5, 6, 7, 8)에서 검색
-        search_columns = [0, 5, 6, 7, 8]
+    Args:
+        version (str): 버전 디렉토리 (ver1 또는 ver2)
+        key_value (str): 숫자만 있으면 B열 정확히 일치, 아니면 A, F, G, H, I열 부분 문자열
+        limit_per_file (int): 결과 파일 하나당 가져올 최대 행 수
 
-        for row in sheet.iter_rows(min_row=5, values_only=True):
-            # 행에 데이터가 있는지 확인
-            if len(row) > max(search_columns):
-                # 지정된 열 중 하나라도 키워드를 포함하면 해당 행 추가
-                found = False
-                for col_idx in search_columns:
-                    cell_value = row[col_idx]
-                    if cell_value is not None and search_keyword.lower() in str(cell_value).lower():
-                        found = True
-                        break
+    Returns:
+        List[HistoryGroup]: 일치하는 행이 있는 결과 파일별 검색 결과 (오래된 파일부터)
+    """
+    try:
+        version_dir = get_version_dir(version)
+        result_paths = list_result_paths(version)
+        search_index.sync_index(version_dir, result_paths)
+        if key_value.isdigit():
+            groups = search_index.search_key_all_files(version_dir, key_value, limit_per_file)
+        else:
+            groups = search_index.search_substring_all_files(version_dir, key_value, limit_per_file)
+        results_dir = os.path.join(version_dir, "results")
+        return [HistoryGroup(filename, result_timestamp(os.path.join(results_dir, filename)), rows, total)
+                for filename, rows, total in groups]
+    except Exception as e:
+        # 파일 처리 중 오류 발생 시 예외 처리
+        raise HTTPException(status_code=400, detail=f"결과 파일 이력 검색 중 오류 발생: {e}")
 
-                if found:
-                    # 빈 셀(None)은 빈 문자열로 변환하여 추가
-                    clean_row = ["" if cell is None else cell for cell in row]
-                    matching_rows.append(clean_row)
 
-        workbook.close()
+async def run_history_search(version: str, key: str, limit_per_file: int) -> tuple[list[HistoryGroup], bool]:
+    """이력 검색을 검색 전용 스레드 풀에서 실행 (제한 시간을 넘으면 빈 결과와 시간 초과 여부 True)"""
+    loop = asyncio.get_running_loop()
+    try:
+        groups = await asyncio.wait_for(
+            loop.run_in_executor(_search_executor, search_history_in_excel, version, key, limit_per_file),
+            timeout=SEARCH_TIMEOUT_SECONDS
+        )
+        return groups, False
+    except asyncio.TimeoutError:
+        print(f"History search timed out: {version} '{key}' ({SEARCH_TIMEOUT_SECONDS}s)")
+        return [], True
+    except HTTPException:
+        return [], False
 
-    except Exception as e:
-        # 파일 처리 중 오류 발생 시 예외 처리
-        raise HTTPException(status_code=400, detail=f"'master' 파일 처리 중 오류 발생: {e}")
 
-    return matching_rows
+def page_rows(parsed: ParsedResult, matches: list[int], offset: int, limit: int = None) -> SearchPage:
+    """일치하는 행 번호 중 offset부터 limit개만 행 데이터로 바꿈 (나머지 행은 복사하지 않음)"""
+    end = len(matches) if limit is None else offset + limit
+    return SearchPage([list(parsed.rows[idx]) for idx in matches[offset:end]], len(matches), offset, limit)
 
 
 def get_cell_styles(cell):
@@ -133,48 +221,174 @@ def get_cell_styles(cell):
     return "".join(styles)
 
 
+async def run_search(search_func, version: str, key: str, offset: int = 0, limit: int = None) -> tuple[SearchPage, bool]:
+    """
+    검색 함수를 이벤트 루프 밖(검색 전용 스레드 풀)에서 실행
+    SEARCH_TIMEOUT_SECONDS 안에 끝나지 않으면 기다리지 않고 빈 결과로 처리
+
+    Returns:
+        (검색 결과 페이지, 시간 초과 여부)
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        page = await asyncio.wait_for(
+            loop.run_in_executor(_search_executor, search_func, version, key, offset, limit),
+            timeout=SEARCH_TIMEOUT_SECONDS
+        )
+        return page, False
+    except asyncio.TimeoutError:
+        print(f"Search timed out: {version} '{key}' ({SEARCH_TIMEOUT_SECONDS}s)")
+        return SearchPage([], 0, offset, limit), True
+    except HTTPException:
+        return SearchPage([], 0, offset, limit), False
+
+
+def get_search_func(key: str):
+    """
+    숫자만 입력된 경우: search_key_in_excel 사용 (B열에서 정확히 일치)
+    문자가 포함된 경우: search_signal_in_excel 사용 (A, F, G, H, I열에서 키워드 검색)
+    """
+    return search_key_in_excel if key.isdigit() else search_signal_in_excel
+
+
+async def search_versions(key: str, offsets: dict, limit: int) -> list[tuple[str, SearchPage, bool]]:
+    """ver1, ver2 검색을 스레드 풀에서 동시에 실행하고 함께 기다림 (버전마다 offset이 다름)"""
+    search_func = get_search_func(key)
+    results = await asyncio.gather(*(run_search(search_func, version, key, offsets.get(version, 0), limit) for version in VERSIONS))
+    return [(version, page, is_timeout) for version, (page, is_timeout) in zip(VERSIONS, results)]
+
+
+def page_link(key: str, offsets: dict, limit: int, version: str, offset: int) -> str:
+    """다른 버전의 위치는 그대로 두고 해당 버전만 offset으로 옮긴 검색 페이지 주소"""
+    params = {"key": key, "limit": limit}
+    params.update({f"{v}_offset": offsets.get(v, 0) for v in VERSIONS})
+    params[f"{version}_offset"] = offset
+    return "/search/?" + urlencode(params)
+
+
 @router.get("/search/", summary="key 또는 signal로 행 검색", response_class=HTMLResponse)
 async def search_rows(
     request: Request,
-    key: str = Query(..., description="The value to search for (number or text)")
+    key: str = Query(..., description="The value to search for (number or text)"),
+    limit: int = Query(SEARCH_PAGE_SIZE, ge=1, le=SEARCH_MAX_PAGE_SIZE, description="버전별 한 페이지 행 수"),
+    ver1_offset: int = Query(0, ge=0, description="ver1 결과에서 건너뛸 행 수"),
+    ver2_offset: int = Query(0, ge=0, description="ver2 결과에서 건너뛸 행 수")
     ):
     """
     엑셀 파일에서 주어진 `key` 값으로 행을 검색합니다.
     - 숫자만 입력된 경우: B열에서 정확히 일치하는 행 검색
     - 문자가 포함된 경우: A, F, G, H, I열에서 키워드를 포함하는 행 검색
+    - 버전별로 `limit`개씩 나눠 보여주고, `ver1_offset`/`ver2_offset`으로 다음 페이지 이동
+    - 페이지는 다 만들어질 때까지 기다리지 않고 렌더링되는 대로 바로 전송
 
     - **key**: 검색할 값 (예: 14 또는 "signal_name")
     """
-    # 입력값이 숫자인지 확인
-    is_numeric = key.isdigit()
+    offsets = {"ver1": ver1_offset, "ver2": ver2_offset}
+    results = await search_versions(key, offsets, limit)
+
+    data = []
+    for version, page, _ in results:
+        end = page.offset + len(page.rows)
+        data.append([version, page.rows, {
+            "total": page.total,
+            "start": page.offset + 1 if page.rows else 0,
+            "end": end,
+            "prev_url": page_link(key, offsets, limit, version, max(page.offset - limit, 0)) if page.offset > 0 else None,
+            "next_url": page_link(key, offsets, limit, version, end) if end < page.total else None,
+        }])
+    timed_out = [version for version, _, is_timeout in results if is_timeout]
 
-    if is_numeric:
-        # 숫자인 경우: search_key_in_excel 사용 (B열에서 정확히 일치)
-        try:
-            r1_data = search_key_in_excel("ver1", key)
-        except HTTPException:
-            r1_data = []
+    context = {
+        "request": request,
+        "key": key,
+        "data": data,
+        "timed_out": timed_out
+    }
 
-        try:
-            r2_data = search_key_in_excel("ver2", key)
-        except HTTPException:
-            r2_data = []
-    else:
-        # 문자가 포함된 경우: search_signal_in_excel 사용 (A, F, G, H, I열에서 키워드 검색)
-        try:
-            r1_data = search_signal_in_excel("ver1", key)
-        except HTTPException:
-            r1_data = []
+    # 행이 많아도 전체 HTML을 메모리에 만들지 않도록 템플릿을 조각 단위로 스트리밍
+    template = templates.get_template("search.html")
+    return StreamingResponse(template.generate(context), media_type="text/html")
 
-        try:
-            r2_data = search_signal_in_excel("ver2", key)
-        except HTTPException:
-            r2_data = []
+
+@router.get("/api/search", summary="key 또는 signal로 행 검색 (JSON)")
+async def search_rows_json(
+    key: str = Query(..., description="The value to search for (number or text)"),
+    version: str = Query(None, description="ver1 또는 ver2 (없으면 모든 버전)"),
+    offset: int = Query(0, ge=0, description="건너뛸 행 수"),
+    limit: int = Query(SEARCH_PAGE_SIZE, ge=1, le=SEARCH_MAX_PAGE_SIZE, description="가져올 최대 행 수")
+    ):
+    """
+    /search/ 와 같은 검색을 JSON으로 리턴
+    다음 페이지는 응답의 next_offset을 offset으로 넘겨서 요청 (더 없으면 null)
+    """
+    if version is not None and version not in VERSIONS:
+        raise HTTPException(status_code=400, detail="Invalid version specified.")
+    search_func = get_search_func(key)
+    versions = [version] if version else VERSIONS
+    pages = await asyncio.gather(*(run_search(search_func, v, key, offset, limit) for v in versions))
+
+    results = []
+    for v, (page, is_timeout) in zip(versions, pages):
+        end = page.offset + len(page.rows)
+        results.append({
+            "version": v,
+            "total": page.total,
+            "offset": page.offset,
+            "limit": page.limit,
+            "next_offset": end if end < page.total else None,
+            "timed_out": is_timeout,
+            "rows": page.rows,
+        })
+    return {"key": key, "results": results}
+
+
+@router.get("/search/history/", summary="모든 결과 파일에서 key 또는 signal 검색", response_class=HTMLResponse)
+async def search_history_rows(
+    request: Request,
+    key: str = Query(..., description="The value to search for (number or text)"),
+    version: str = Query(None, description="ver1 또는 ver2 (없으면 모든 버전)"),
+    limit: int = Query(SEARCH_HISTORY_ROWS_PER_FILE, ge=1, le=SEARCH_MAX_PAGE_SIZE, description="결과 파일 하나당 최대 행 수")
+    ):
+    """
+    최신 결과 파일만이 아니라 results 폴더의 모든 결과 파일에서 검색하고 파일 업로드 시각별로 묶어서 보여줍니다.
+    """
+    if version is not None and version not in VERSIONS:
+        raise HTTPException(status_code=400, detail="Invalid version specified.")
+    versions = [version] if version else VERSIONS
+    results = await asyncio.gather(*(run_history_search(v, key, limit) for v in versions))
 
     context = {
         "request": request,
         "key": key,
-        "data": [['ver1', r1_data], ['ver2', r2_data]]
+        "data": [[v, groups] for v, (groups, _) in zip(versions, results)],
+        "timed_out": [v for v, (_, is_timeout) in zip(versions, results) if is_timeout]
+    }
+    template = templates.get_template("search_history.html")
+    return StreamingResponse(template.generate(context), media_type="text/html")
+
+
+@router.get("/api/search/history", summary="모든 결과 파일에서 key 또는 signal 검색 (JSON)")
+async def search_history_json(
+    key: str = Query(..., description="The value to search for (number or text)"),
+    version: str = Query(None, description="ver1 또는 ver2 (없으면 모든 버전)"),
+    limit: int = Query(SEARCH_HISTORY_ROWS_PER_FILE, ge=1, le=SEARCH_MAX_PAGE_SIZE, description="결과 파일 하나당 최대 행 수")
+    ):
+    """/search/history/ 와 같은 검색을 JSON으로 리턴 (버전별, 결과 파일 업로드 시각 순)"""
+    if version is not None and version not in VERSIONS:
+        raise HTTPException(status_code=400, detail="Invalid version specified.")
+    versions = [version] if version else VERSIONS
+    results = await asyncio.gather(*(run_history_search(v, key, limit) for v in versions))
+    return {
+        "key": key,
+        "results": [{
+            "version": v,
+            "timed_out": is_timeout,
+            "files": [group._asdict() for group in groups],
+        } for v, (groups, is_timeout) in zip(versions, results)]
     }
 
-    return templates.TemplateResponse("search.html", context)
\ No newline at end of file
+
+@router.get("/api/search-cache", summary="검색 결과 캐시 상태")
+async def search_cache_stats(client_ip: str = Depends(verify_ip_whitelist)):
+    """결과 파일 캐시의 hit/miss/eviction 카운터와 사용량"""
+    return result_cache.stats()
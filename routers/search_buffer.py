@@ -0,0 +1,73 @@
+import sys
+from array import array
+from bisect import bisect_right
+from itertools import islice
+
+# 행과 행 사이 구분 문자 (검색 문자열의 열 구분 문자 \x1f와 겹치지 않게 \x1e 사용)
+ROW_SEPARATOR = "\x1e"
+# 버퍼 검색 중 이만큼 찾을 때마다 일치 비율을 확인
+DENSE_CHECK_HITS = 256
+# 지금까지 훑은 행 중 1/DENSE_ROW_RATIO 넘게 일치하면 나머지 행은 행별 검색으로 전환
+# (일치 하나당 find + bisect 비용이 행 하나의 `in` 검사보다 8배쯤 비싸므로, 넓은 검색어는 행별 검색이 빠름)
+DENSE_ROW_RATIO = 8
+
+
+class SearchBuffer:
+    """
+    행별 검색 문자열(A, F, G, H, I열 소문자)을 하나의 긴 문자열로 이어 붙인 버퍼
+    - ends[i]: i번째 행 문자열이 버퍼에서 끝나는 위치 (바로 뒤가 행 구분 문자)
+    - 키워드 검색은 str.find로 버퍼를 훑고, 찾은 위치를 bisect로 행 번호로 바꾼 뒤 다음 행부터 다시 찾음
+      (행마다 파이썬 루프를 돌지 않으므로 일치하는 행 수만큼만 파이썬 코드가 실행됨)
+    - 일치하는 행이 많은 검색어(user3, v1 등)는 도중에 행별 문자열에 대한 `in` 검사로 전환
+    """
+
+    def __init__(self, search_texts: list):
+        self.row_count = len(search_texts)
+        # bisect는 array보다 list에서 빠르므로 끝 위치는 list로 보관
+        self.ends = []
+        # 검색 문자열이 있는 행 (빈 키워드는 이 행들과 모두 일치)
+        self.present = array("q", (idx for idx, text in enumerate(search_texts) if text is not None))
+        position = 0
+        for text in search_texts:
+            position += len(text or "")
+            self.ends.append(position)
+            position += 1
+        # 행별 검색 문자열 (검색 문자열이 없는 행은 "", 문자열 객체는 search_texts와 공유)
+        self._texts = [text or "" for text in search_texts]
+        self.text = ROW_SEPARATOR.join(self._texts)
+
+    def find_rows(self, keyword: str) -> list[int]:
+        """keyword(소문자)를 포함하는 행 번호 리스트 (행 순서)"""
+        if keyword == "":
+            return list(self.present)
+        if ROW_SEPARATOR in keyword:
+            # 구분 문자가 들어간 키워드는 행 경계를 넘어 일치할 수 있으므로 행 단위로 확인
+            return self.scan_rows(keyword)
+
+        find = self.text.find
+        ends = self.ends
+        matches = []
+        append = matches.append
+        pos = find(keyword)
+        while pos >= 0:
+            row = bisect_right(ends, pos)
+            append(row)
+            if len(matches) % DENSE_CHECK_HITS == 0 and len(matches) * DENSE_ROW_RATIO > row:
+                matches.extend(self.scan_rows(keyword, row + 1))
+                return matches
+            # 같은 행에서 또 찾지 않도록 행 끝(구분 문자)부터 다시 검색
+            pos = find(keyword, ends[row])
+        return matches
+
+    def scan_rows(self, keyword: str, start: int = 0) -> list[int]:
+        """start행부터 행별 문자열에 keyword가 있는지 하나씩 확인 (일치하는 행이 많을 때 버퍼 검색보다 빠름)"""
+        return [idx for idx, text in enumerate(islice(self._texts, start, None), start) if keyword in text]
+
+    def texts(self) -> list[str]:
+        """행별 검색 문자열 (검색 문자열이 없는 행은 "")"""
+        return self._texts
+
+    def nbytes(self) -> int:
+        """버퍼와 행별 문자열이 차지하는 메모리 (바이트, 행별 문자열 객체 포함)"""
+        return (sys.getsizeof(self.text) + sys.getsizeof(self.ends) + sum(map(sys.getsizeof, self.ends)) + sys.getsizeof(self.present)
+                + sys.getsizeof(self._texts) + sum(map(sys.getsizeof, self._texts)))
@@ -0,0 +1,326 @@
+import os
+import json
+import sqlite3
+from routers import merge_engine, snapshot
+
+# --- Configuration ---
+# 검색 인덱스 파일 접미사 (uploads/ver1 옆에 uploads/ver1.searchindex.sqlite 로 생성)
+SEARCH_INDEX_SUFFIX = ".searchindex.sqlite"
+# 데이터가 시작되는 행 번호
+DATA_START_ROW = 5
+# B열 (안건 번호)
+KEY_COLUMN = 1
+# A, F, G, H, I열 (시그널 검색 대상)
+SEARCH_COLUMNS = [0, 5, 6, 7, 8]
+# 한 행 안에서 열 사이를 구분하는 문자 (검색어가 두 열에 걸쳐 매칭되지 않도록)
+COLUMN_SEPARATOR = "\x1f"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    row_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rows (
+    id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL,
+    row_no INTEGER NOT NULL,
+    key TEXT,
+    cells TEXT NOT NULL,
+    search_text TEXT
+);
+CREATE INDEX IF NOT EXISTS rows_file_key ON rows (file, key);
+CREATE INDEX IF NOT EXISTS rows_file_row ON rows (file, row_no);
+CREATE INDEX IF NOT EXISTS rows_key ON rows (key);
+"""
+
+_fts_available = None
+
+
+def get_index_path(version_dir: str) -> str:
+    """버전 폴더 옆에 위치한 검색 인덱스 파일 경로"""
+    return os.path.normpath(version_dir) + SEARCH_INDEX_SUFFIX
+
+
+def fts_available() -> bool:
+    """sqlite에서 FTS5 trigram 토크나이저를 쓸 수 있는지 확인 (sqlite 3.34 이상)"""
+    global _fts_available
+    if _fts_available is None:
+        try:
+            conn = sqlite3.connect(":memory:")
+            conn.execute("CREATE VIRTUAL TABLE t USING fts5(x, tokenize='trigram')")
+            conn.close()
+            _fts_available = True
+        except sqlite3.OperationalError:
+            _fts_available = False
+    return _fts_available
+
+
+def connect(index_path: str) -> sqlite3.Connection:
+    """검색 인덱스 DB 연결 (없으면 스키마 생성)"""
+    conn = sqlite3.connect(index_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    if fts_available():
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS rows_fts USING fts5(search_text, tokenize='trigram')")
+    return conn
+
+
+def make_search_text(row: tuple):
+    """A, F, G, H, I열 값을 소문자 문자열로 만들어 하나로 합침 (검색할 열이 없으면 None)"""
+    if len(row) <= max(SEARCH_COLUMNS):
+        return None
+    values = [str(row[idx]).lower() for idx in SEARCH_COLUMNS if row[idx] is not None]
+    return COLUMN_SEPARATOR.join(values) if values else None
+
+
+def make_key(row: tuple):
+    """B열 값을 검색 키 문자열로 변환 (값이 없으면 None)"""
+    if len(row) > KEY_COLUMN and row[KEY_COLUMN] is not None:
+        return str(row[KEY_COLUMN]).strip()
+    return None
+
+
+def iter_result_rows(result_path: str):
+    """결과 파일의 5번째 행부터 (행 번호, 행 값) 를 읽음 (최신 스냅샷이 있으면 스냅샷에서, 없으면 read-only 모드로)"""
+    rows = snapshot.iter_sheet_rows(result_path, min_row=DATA_START_ROW,
+                                    stop_after_empty_rows=merge_engine.DEFAULT_SCHEMA.stop_after_empty_rows)
+    yield from enumerate(rows, start=DATA_START_ROW)
+
+
+def build_index(version_dir: str, result_path: str) -> int:
+    """
+    결과 파일 하나를 읽어 검색 인덱스에 추가 (같은 이름의 파일이 이미 있으면 교체)
+    - B열 값은 key 컬럼 (인덱스가 걸려 있어 정확히 일치하는 검색이 빠름)
+    - A, F, G, H, I열은 소문자로 합쳐 search_text 컬럼과 FTS5 trigram 인덱스에 저장 (부분 문자열 검색용)
+
+    Returns:
+        인덱싱된 행 수
+    """
+    filename = os.path.basename(result_path)
+    stat = os.stat(result_path)
+    conn = connect(get_index_path(version_dir))
+    try:
+        with conn:
+            remove_file_rows(conn, filename)
+            row_count = 0
+            for row_no, row in iter_result_rows(result_path):
+                # 빈 셀(None)은 빈 문자열로 변환해서 저장 (화면에 그대로 표시)
+                clean_row = ["" if cell is None else cell for cell in row]
+                search_text = make_search_text(row)
+                cursor = conn.execute(
+                    "INSERT INTO rows (file, row_no, key, cells, search_text) VALUES (?, ?, ?, ?, ?)",
+                    (filename, row_no, make_key(row), json.dumps(clean_row, ensure_ascii=False, default=str), search_text)
+                )
+                if search_text is not None and fts_available():
+                    conn.execute("INSERT INTO rows_fts (rowid, search_text) VALUES (?, ?)", (cursor.lastrowid, search_text))
+                row_count += 1
+            conn.execute(
+                "INSERT OR REPLACE INTO files (name, size, mtime_ns, row_count) VALUES (?, ?, ?, ?)",
+                (filename, stat.st_size, stat.st_mtime_ns, row_count)
+            )
+    finally:
+        conn.close()
+    return row_count
+
+
+def remove_file_rows(conn: sqlite3.Connection, filename: str):
+    """인덱스에서 해당 파일의 행을 모두 삭제"""
+    if fts_available():
+        conn.execute("DELETE FROM rows_fts WHERE rowid IN (SELECT id FROM rows WHERE file = ?)", (filename,))
+    conn.execute("DELETE FROM rows WHERE file = ?", (filename,))
+    conn.execute("DELETE FROM files WHERE name = ?", (filename,))
+
+
+def remove_file(version_dir: str, filename: str):
+    """결과 파일을 삭제했을 때 인덱스에서 그 파일의 행을 삭제 (인덱스가 없으면 아무것도 안 함)"""
+    index_path = get_index_path(version_dir)
+    if not os.path.exists(index_path):
+        return
+    conn = connect(index_path)
+    try:
+        with conn:
+            remove_file_rows(conn, filename)
+    finally:
+        conn.close()
+
+
+def is_indexed(version_dir: str, result_path: str) -> bool:
+    """결과 파일이 현재 내용(크기/수정시간) 그대로 인덱싱되어 있는지 확인"""
+    index_path = get_index_path(version_dir)
+    if not os.path.exists(index_path):
+        return False
+    stat = os.stat(result_path)
+    conn = connect(index_path)
+    try:
+        found = conn.execute(
+            "SELECT 1 FROM files WHERE name = ? AND size = ? AND mtime_ns = ?",
+            (os.path.basename(result_path), stat.st_size, stat.st_mtime_ns)
+        ).fetchone()
+    finally:
+        conn.close()
+    return found is not None
+
+
+def ensure_indexed(version_dir: str, result_path: str):
+    """인덱스가 없거나 오래되었으면 (업로드 없이 직접 복사된 파일 등) 새로 만듦"""
+    if not is_indexed(version_dir, result_path):
+        build_index(version_dir, result_path)
+
+
+def sync_index(version_dir: str, result_paths: list[str]) -> dict:
+    """
+    버전의 모든 결과 파일을 인덱스와 맞춤 (이력 검색용)
+    - 새로 생겼거나 바뀐 파일만 읽어서 추가 (이미 인덱싱된 파일은 다시 읽지 않음)
+    - 폴더에서 사라진 파일은 인덱스에서 삭제
+
+    Returns:
+        {"added": 새로 인덱싱한 파일 수, "removed": 삭제한 파일 수, "unchanged": 그대로 둔 파일 수}
+    """
+    conn = connect(get_index_path(version_dir))
+    try:
+        indexed = {name: (size, mtime_ns) for name, size, mtime_ns in conn.execute("SELECT name, size, mtime_ns FROM files")}
+    finally:
+        conn.close()
+
+    stats = {"added": 0, "removed": 0, "unchanged": 0}
+    current = set()
+    for path in result_paths:
+        name = os.path.basename(path)
+        current.add(name)
+        stat = os.stat(path)
+        if indexed.get(name) == (stat.st_size, stat.st_mtime_ns):
+            stats["unchanged"] += 1
+            continue
+        build_index(version_dir, path)
+        stats["added"] += 1
+
+    removed = [name for name in indexed if name not in current]
+    if removed:
+        conn = connect(get_index_path(version_dir))
+        try:
+            with conn:
+                for name in removed:
+                    remove_file_rows(conn, name)
+        finally:
+            conn.close()
+        stats["removed"] = len(removed)
+    return stats
+
+
+def search_key(version_dir: str, filename: str, key_value: str, offset: int = 0, limit: int = None) -> tuple[list[list], int]:
+    """
+    인덱스에서 B열 값이 key_value와 일치하는 행 검색 (행 순서 유지)
+
+    Returns:
+        (offset부터 최대 limit개의 행, 일치하는 전체 행 수)
+    """
+    return _search_file(version_dir, filename, *_key_source(key_value), offset, limit)
+
+
+def search_substring(version_dir: str, filename: str, search_keyword: str, offset: int = 0, limit: int = None) -> tuple[list[list], int]:
+    """
+    인덱스에서 A, F, G, H, I열 중 하나라도 search_keyword를 포함하는 행 검색 (대소문자 무시, 행 순서 유지)
+
+    Returns:
+        (offset부터 최대 limit개의 행, 일치하는 전체 행 수)
+    """
+    return _search_file(version_dir, filename, *_substring_source(search_keyword), offset, limit)
+
+
+def search_key_all_files(version_dir: str, key_value: str, limit_per_file: int = None) -> list[tuple[str, list[list], int]]:
+    """
+    인덱싱된 모든 결과 파일에서 B열 값이 key_value와 일치하는 행 검색
+
+    Returns:
+        [(파일명, 최대 limit_per_file개의 행, 일치하는 전체 행 수), ...] - 일치하는 행이 있는 파일만, 파일명 순
+    """
+    return _search_grouped(version_dir, *_key_source(key_value), limit_per_file)
+
+
+def search_substring_all_files(version_dir: str, search_keyword: str, limit_per_file: int = None) -> list[tuple[str, list[list], int]]:
+    """
+    인덱싱된 모든 결과 파일에서 A, F, G, H, I열 중 하나라도 search_keyword를 포함하는 행 검색
+
+    Returns:
+        [(파일명, 최대 limit_per_file개의 행, 일치하는 전체 행 수), ...] - 일치하는 행이 있는 파일만, 파일명 순
+    """
+    return _search_grouped(version_dir, *_substring_source(search_keyword), limit_per_file)
+
+
+def _key_source(key_value: str) -> tuple[str, tuple]:
+    """B열 정확히 일치 검색의 FROM/WHERE 절과 파라미터"""
+    return "FROM rows WHERE rows.key = ?", (str(key_value).strip(),)
+
+
+def _substring_source(search_keyword: str) -> tuple[str, tuple]:
+    """A, F, G, H, I열 부분 문자열 검색의 FROM/WHERE 절과 파라미터"""
+    keyword = search_keyword.lower()
+    if fts_available() and len(keyword) >= 3 and COLUMN_SEPARATOR not in keyword:
+        # trigram 인덱스로 후보를 좁힌 뒤 instr로 정확히 한 번 더 확인
+        phrase = '"' + keyword.replace('"', '""') + '"'
+        return ("FROM rows_fts JOIN rows ON rows.id = rows_fts.rowid "
+                "WHERE rows_fts MATCH ? AND instr(rows.search_text, ?) > 0"), (phrase, keyword)
+    # 3글자 미만은 trigram으로 찾을 수 없으므로 행을 훑어봄
+    return "FROM rows WHERE instr(rows.search_text, ?) > 0", (keyword,)
+
+
+def _search_file(version_dir: str, filename: str, source: str, params: tuple, offset: int, limit: int = None) -> tuple[list[list], int]:
+    """파일 하나에서 source 조건에 맞는 행 중 offset부터 limit개와 전체 수"""
+    source += " AND rows.file = ?"
+    params += (filename,)
+    conn = connect(get_index_path(version_dir))
+    try:
+        total = conn.execute(f"SELECT COUNT(*) {source}", params).fetchone()[0]
+        cursor = conn.execute(
+            f"SELECT rows.cells {source} ORDER BY rows.row_no LIMIT ? OFFSET ?",
+            params + (_sql_limit(limit), offset)
+        )
+        return [json.loads(cells) for (cells,) in cursor], total
+    finally:
+        conn.close()
+
+
+def _search_grouped(version_dir: str, source: str, params: tuple, limit_per_file: int = None) -> list[tuple[str, list[list], int]]:
+    """모든 파일에서 source 조건에 맞는 행을 파일별로 묶어서 (파일마다 최대 limit_per_file개)"""
+    conn = connect(get_index_path(version_dir))
+    try:
+        totals = conn.execute(
+            f"SELECT rows.file, COUNT(*) {source} GROUP BY rows.file ORDER BY rows.file", params
+        ).fetchall()
+        groups = []
+        for filename, total in totals:
+            cursor = conn.execute(
+                f"SELECT rows.cells {source} AND rows.file = ? ORDER BY rows.row_no LIMIT ?",
+                params + (filename, _sql_limit(limit_per_file))
+            )
+            groups.append((filename, [json.loads(cells) for (cells,) in cursor], total))
+        return groups
+    finally:
+        conn.close()
+
+
+def _sql_limit(limit: int = None) -> int:
+    """SQLite LIMIT 값 (-1은 제한 없음)"""
+    return -1 if limit is None else limit
+
+
+def load_file_rows(version_dir: str, filename: str) -> tuple[list, list, list]:
+    """
+    인덱스에서 파일 하나의 전체 행을 읽어옴 (xlsx를 열지 않음)
+
+    Returns:
+        (행 리스트, B열 키 리스트, A/F/G/H/I열 검색 문자열 리스트) - 모두 행 순서
+    """
+    conn = connect(get_index_path(version_dir))
+    try:
+        cursor = conn.execute("SELECT cells, key, search_text FROM rows WHERE file = ? ORDER BY row_no", (filename,))
+        rows, keys, search_texts = [], [], []
+        for cells, key, search_text in cursor:
+            rows.append(tuple(json.loads(cells)))
+            keys.append(key)
+            search_texts.append(search_text)
+        return rows, keys, search_texts
+    finally:
+        conn.close()
@@ -0,0 +1,129 @@
+import os
+import time
+import uuid
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# --- Configuration ---
+# 워커 프로세스 사이의 변경 신호 파일을 두는 폴더 (모든 워커가 같은 폴더를 봐야 함)
+SIGNAL_DIR = os.environ.get("SIGNAL_DIR", os.path.join(os.path.dirname(__file__), "..", "json", "signals"))
+# 신호 파일을 확인하는 최소 간격 (초), 0이면 매번 확인 (stat 한 번이라 비용이 거의 없음)
+SIGNAL_CHECK_SECONDS = float(os.environ.get("SIGNAL_CHECK_SECONDS", "0"))
+
+
+class Signal:
+    """
+    여러 워커 프로세스가 메모리에 들고 있는 데이터가 바뀌었음을 서로 알리는 파일 신호
+    - notify(): 신호 파일을 새 파일로 교체 (inode/수정시간이 바뀜)
+    - changed(): 마지막으로 본 뒤 다른 프로세스가 notify()했으면 True (자기가 보낸 신호는 무시)
+    uvicorn/gunicorn 워커들이 같은 폴더를 공유하므로 별도 서버 없이 stat 한 번으로 확인
+    """
+
+    def __init__(self, name: str, check_interval: float = None):
+        self.path = os.path.join(SIGNAL_DIR, name)
+        self.check_interval = SIGNAL_CHECK_SECONDS if check_interval is None else check_interval
+        self._lock = threading.Lock()
+        self._seen = self._signature()
+        self._checked_at = time.monotonic()
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def notify(self):
+        """다른 워커에 변경을 알림"""
+        try:
+            os.makedirs(SIGNAL_DIR, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(f"{os.getpid()} {time.time()}\n")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error writing signal {self.path}: {e}")
+            return
+        with self._lock:
+            self._seen = self._signature()
+
+    def changed(self) -> bool:
+        """다른 워커가 notify()한 뒤 처음 부르면 True"""
+        now = time.monotonic()
+        if self.check_interval and now - self._checked_at < self.check_interval:
+            return False
+        signature = self._signature()
+        with self._lock:
+            self._checked_at = now
+            if signature == self._seen:
+                return False
+            self._seen = signature
+            return True
+
+
+class FileLock:
+    """
+    여러 프로세스 사이의 배타 잠금 (with 블록 동안 유지, 같은 프로세스의 스레드끼리도 배타적)
+    잠금 파일은 지우지 않고 계속 재사용
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a+b")
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        self._file.seek(0)
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK은 10초 동안 재시도한 뒤 실패하므로 잡힐 때까지 다시 시도
+                        continue
+        except BaseException:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+            self._thread_lock.release()
+        return False
+
+
+_file_locks = {}
+_file_locks_lock = threading.Lock()
+
+
+def file_lock(path: str) -> FileLock:
+    """경로별 FileLock (같은 경로면 같은 객체를 돌려줘서 프로세스 안의 스레드끼리도 배타적)"""
+    path = os.path.abspath(path)
+    with _file_locks_lock:
+        lock = _file_locks.get(path)
+        if lock is None:
+            lock = _file_locks[path] = FileLock(path)
+        return lock
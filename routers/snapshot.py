@@ -0,0 +1,293 @@
+import os
+import re
+import json
+import datetime
+from itertools import islice
+from collections import namedtuple
+import openpyxl
+from openpyxl.worksheet.formula import ArrayFormula, DataTableFormula
+
+# --- Configuration ---
+# 엑셀 파일 옆에 숨김 파일로 저장 (예: uploads/ver1/.data.xlsx.colsnap)
+SNAPSHOT_SUFFIX = ".colsnap"
+SNAPSHOT_FORMAT_VERSION = 5
+# 스냅샷 첫 줄(헤더)로 읽는 최대 길이
+SNAPSHOT_HEADER_MAX_BYTES = 4096
+# 시트 XML에서 마지막으로 값이 있는 행을 찾을 때 읽는 단위와, 조각 경계에 걸친 태그를 놓치지 않도록 겹쳐 읽는 길이
+SHEET_SCAN_CHUNK_SIZE = 1024 * 1024
+SHEET_SCAN_OVERLAP = 1024
+# <row r="..."> 태그와 값이 있는 셀의 <v>, <is>(인라인 문자열), <f>(수식) 태그 (네임스페이스 접두사 허용)
+_SHEET_TAG_PATTERN = re.compile(rb'<(?:\w+:)?row\b([^>]*)>|<(?:\w+:)?(?:v|is|f)[\s>/]|</(?:\w+:)?sheetData>')
+_ROW_NUMBER_PATTERN = re.compile(rb'\sr="(\d+)"')
+
+# JSON으로 바로 쓸 수 없는 셀 값(날짜/시간, 배열/데이터 표 수식)은 {"$type": 종류, "value": 값}으로 저장
+_VALUE_TYPE_KEY = "$type"
+# 데이터 표 수식은 이 순서대로 속성 값 리스트로 저장
+_DATA_TABLE_ATTRS = ("ref", "ca", "dt2D", "dtr", "r1", "r2", "del1", "del2")
+
+# 열 단위로 저장된 시트 값 (columns[c][r] = r+1번째 행, c+1번째 열 값)
+# row_lengths: 행마다 길이가 다를 때 각 행의 원래 길이 (모두 같으면 None) - openpyxl이 읽은 모양 그대로 돌려주기 위함
+Snapshot = namedtuple("Snapshot", ["row_count", "columns", "row_lengths"])
+
+
+def _encode_value(value):
+    """json.dumps의 default: openpyxl이 읽어 오는 값 중 JSON 기본 형식이 아닌 값을 표시를 붙인 객체로 변환"""
+    if isinstance(value, datetime.datetime):
+        return {_VALUE_TYPE_KEY: "datetime", "value": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {_VALUE_TYPE_KEY: "date", "value": value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {_VALUE_TYPE_KEY: "time", "value": value.isoformat()}
+    if isinstance(value, datetime.timedelta):
+        return {_VALUE_TYPE_KEY: "timedelta", "value": [value.days, value.seconds, value.microseconds]}
+    if isinstance(value, ArrayFormula):
+        return {_VALUE_TYPE_KEY: "array_formula", "value": [value.ref, value.text]}
+    if isinstance(value, DataTableFormula):
+        return {_VALUE_TYPE_KEY: "data_table_formula", "value": [getattr(value, name) for name in _DATA_TABLE_ATTRS]}
+    raise TypeError(f"저장할 수 없는 셀 값 형식입니다: {type(value).__name__}")
+
+
+def _decode_value(obj: dict):
+    """json.loads의 object_hook: _encode_value로 바꾼 값을 원래 형식으로 되돌림 (셀 값은 리스트 안에 있으므로 표시된 값만 여기로 옴)"""
+    kind = obj.get(_VALUE_TYPE_KEY)
+    value = obj.get("value")
+    if kind == "datetime":
+        return datetime.datetime.fromisoformat(value)
+    if kind == "date":
+        return datetime.date.fromisoformat(value)
+    if kind == "time":
+        return datetime.time.fromisoformat(value)
+    if kind == "timedelta":
+        return datetime.timedelta(*value)
+    if kind == "array_formula":
+        return ArrayFormula(*value)
+    if kind == "data_table_formula":
+        return DataTableFormula(**dict(zip(_DATA_TABLE_ATTRS, value)))
+    raise ValueError(f"알 수 없는 셀 값 형식입니다: {kind}")
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_encode_value)
+
+
+def dump_values(obj, f):
+    """
+    셀 값이 담긴 리스트/튜플을 JSON 한 줄로 f(텍스트 파일)에 씀
+    업로드 폴더에 놓이는 파일이므로 pickle처럼 읽을 때 코드가 실행될 수 있는 형식은 쓰지 않음
+    """
+    f.write(_dumps(obj))
+    f.write("\n")
+
+
+def load_values(text: str):
+    """dump_values로 쓴 JSON을 읽음 (튜플은 리스트로 돌아옴, 형식이 맞지 않으면 ValueError)"""
+    try:
+        return json.loads(text, object_hook=_decode_value)
+    except (TypeError, AttributeError, OverflowError) as e:
+        raise ValueError(f"잘못된 셀 값입니다: {e}") from e
+
+
+class SnapshotBuilder:
+    """
+    행을 하나씩 받아 바로 열 리스트에 나눠 담는 Snapshot 생성기
+    행 리스트를 따로 모았다가 열로 바꾸지 않으므로 값은 열 리스트에 한 번만 보관됨
+    """
+
+    def __init__(self):
+        self.columns = []
+        self.row_lengths = []
+
+    def add(self, row):
+        length = len(row)
+        if length > len(self.columns):
+            # 더 긴 행이 나오면 새 열을 앞쪽 행 수만큼 None으로 채워서 추가
+            self.columns.extend([None] * len(self.row_lengths) for _ in range(length - len(self.columns)))
+        for column, value in zip(self.columns, row):
+            column.append(value)
+        for column in self.columns[length:]:
+            column.append(None)
+        self.row_lengths.append(length)
+
+    def build(self) -> Snapshot:
+        width = len(self.columns)
+        row_lengths = None if all(length == width for length in self.row_lengths) else self.row_lengths
+        return Snapshot(len(self.row_lengths), self.columns, row_lengths)
+
+
+def snapshot_path(source_path: str) -> str:
+    """엑셀 파일의 스냅샷 파일 경로 (.으로 시작하므로 파일 목록/병합 대상에 잡히지 않음)"""
+    folder, name = os.path.split(source_path)
+    return os.path.join(folder, f".{name}{SNAPSHOT_SUFFIX}")
+
+
+def write_snapshot(source_path: str, snap: Snapshot, stop_after_empty_rows: int = 0, max_col: int = None) -> int:
+    """
+    SnapshotBuilder로 모은 시트 값(1행부터)을 스냅샷 파일로 저장
+    첫 줄에 원본 크기/수정시간을 담은 헤더를 따로 저장해서, 데이터를 읽지 않고도 최신 여부를 확인할 수 있음
+    다음 줄부터 열 목록(열 하나씩 이어서 씀)과 행 길이 (모두 JSON, 저장할 수 없는 형식의 셀 값이 있으면 TypeError)
+
+    Args:
+        source_path: 원본 엑셀 파일 경로 (이미 최종 위치에 있어야 함)
+        snap: 저장할 시트 값
+        stop_after_empty_rows: 행을 iter_openpyxl_rows(stop_after_empty_rows=...)로 읽었으면 그 값
+            (0이 아니면 마지막 값 아래의 빈 행이 빠져 있으므로, 같은 값으로 읽는 쪽만 이 스냅샷을 사용)
+        max_col: 행을 max_col열까지만 읽었으면 그 값 (그보다 많은 열을 읽는 쪽은 이 스냅샷을 쓰지 않음)
+
+    Returns:
+        저장된 행 수
+    """
+    stat = os.stat(source_path)
+    header = {
+        "format": SNAPSHOT_FORMAT_VERSION,
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "row_count": snap.row_count,
+        "stop_after_empty_rows": stop_after_empty_rows,
+        "max_col": max_col,
+    }
+    path = snapshot_path(source_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header) + "\n")
+            # 열 전체를 한 문자열로 만들지 않도록 열 하나씩 씀
+            f.write("[")
+            for idx, column in enumerate(snap.columns):
+                if idx:
+                    f.write(",")
+                f.write(_dumps(column))
+            f.write("]\n")
+            dump_values(snap.row_lengths, f)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return snap.row_count
+
+
+def read_snapshot(source_path: str, stop_after_empty_rows: int = 0, max_col: int = None):
+    """
+    스냅샷이 있고 원본과 크기/수정시간, 빈 행을 잘라낸 설정이 같으면 Snapshot 리턴, 아니면 None
+    max_col열까지 읽으려는데 스냅샷에 그보다 적은 열만 저장되어 있어도 None (max_col이 None이면 모든 열)
+    """
+    path = snapshot_path(source_path)
+    try:
+        stat = os.stat(source_path)
+        with open(path, "r", encoding="utf-8") as f:
+            header = json.loads(f.readline(SNAPSHOT_HEADER_MAX_BYTES))
+            if (not isinstance(header, dict)
+                    or header.get("format") != SNAPSHOT_FORMAT_VERSION
+                    or header.get("source_size") != stat.st_size
+                    or header.get("source_mtime_ns") != stat.st_mtime_ns
+                    or header.get("stop_after_empty_rows") != stop_after_empty_rows
+                    or not _covers_columns(header.get("max_col"), max_col)):
+                return None
+            columns = load_values(f.readline())
+            row_lengths = load_values(f.readline())
+    except (OSError, ValueError, TypeError):
+        return None
+    if (not isinstance(header.get("row_count"), int) or not isinstance(columns, list)
+            or not all(isinstance(column, list) for column in columns)
+            or not (row_lengths is None or isinstance(row_lengths, list))):
+        return None
+    return Snapshot(header["row_count"], columns, row_lengths)
+
+
+def _covers_columns(saved_max_col, max_col) -> bool:
+    """saved_max_col열까지 저장한 스냅샷으로 max_col열까지 읽을 수 있는지"""
+    if saved_max_col is None:
+        return True
+    return max_col is not None and isinstance(saved_max_col, int) and max_col <= saved_max_col
+
+
+def remove_snapshot(source_path: str):
+    """원본 파일을 지울 때 스냅샷도 함께 삭제"""
+    path = snapshot_path(source_path)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def last_value_row(sheet):
+    """
+    read-only 시트에서 값(또는 수식)이 있는 마지막 행 번호 (값이 하나도 없으면 0, 알 수 없으면 None)
+    openpyxl로 셀을 만들지 않고 시트 XML을 그대로 훑기 때문에 서식만 있는 행이 아주 많아도 빠름
+    """
+    current_row = None
+    last_row = 0
+    tail = b""
+    try:
+        with sheet._get_source() as src:
+            for chunk in iter(lambda: src.read(SHEET_SCAN_CHUNK_SIZE), b""):
+                buffer = tail + chunk
+                scanned = 0
+                for match in _SHEET_TAG_PATTERN.finditer(buffer):
+                    scanned = match.end()
+                    if match.group(1) is not None:
+                        number = _ROW_NUMBER_PATTERN.search(match.group(1))
+                        if number is None:
+                            # r 속성이 없는 행이 있으면 행 번호를 알 수 없으므로 끝까지 읽도록 함
+                            return None
+                        current_row = int(number.group(1))
+                    elif match.group(0).startswith(b"</"):
+                        return last_row
+                    elif current_row is not None:
+                        last_row = max(last_row, current_row)
+                # 이미 확인한 태그는 다시 보지 않고, 끝에 걸친 태그 조각만 다음 조각 앞에 붙임
+                tail = buffer[max(scanned, len(buffer) - SHEET_SCAN_OVERLAP):]
+    except (AttributeError, OSError) as e:
+        print(f"Error scanning sheet rows: {e}")
+        return None
+    return last_row
+
+
+def iter_openpyxl_rows(source, min_row: int = 1, max_col: int = None, stop_after_empty_rows: int = 0):
+    """
+    openpyxl read-only 모드로 행 값을 읽음 (스냅샷이 없을 때 사용, source는 경로 또는 파일 객체)
+    stop_after_empty_rows가 0이 아니면 값이 있는 마지막 행 아래로는 그만큼의 빈 행까지만 읽음
+    (서식만 1,048,576행까지 들어가 시트 크기가 부풀려진 파일 대비, 데이터 중간의 빈 구간은 그대로 읽음)
+    """
+    workbook = openpyxl.load_workbook(source, read_only=True)
+    try:
+        sheet = workbook.active
+        max_row = None
+        if stop_after_empty_rows:
+            last_row = last_value_row(sheet)
+            if last_row is not None:
+                max_row = last_row + stop_after_empty_rows
+        if max_row is not None and max_row < min_row:
+            return
+        for row in sheet.iter_rows(min_row=min_row, max_row=max_row, max_col=max_col, values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+def iter_sheet_rows(source_path: str, min_row: int = 1, max_col: int = None, stop_after_empty_rows: int = 0):
+    """
+    활성 시트의 min_row행부터 행 값 튜플을 내놓음
+    최신 스냅샷이 있으면 xlsx를 열지 않고 스냅샷에서 읽고, 없으면 openpyxl로 읽음
+    stop_after_empty_rows는 iter_openpyxl_rows와 같음 (스냅샷도 같은 설정으로 만든 것만 사용)
+    """
+    snap = read_snapshot(source_path, stop_after_empty_rows, max_col)
+    if snap is None:
+        yield from iter_openpyxl_rows(source_path, min_row, max_col, stop_after_empty_rows)
+        return
+    columns = snap.columns[:max_col] if max_col is not None else snap.columns
+    # 열을 잘라 복사하지 않도록 islice로 앞쪽 행만 건너뜀
+    rows = zip(*(islice(column, min_row - 1, None) for column in columns)) if columns else (() for _ in range(snap.row_count - min_row + 1))
+    if snap.row_lengths is None:
+        yield from rows
+        return
+    for row, length in zip(rows, islice(snap.row_lengths, min_row - 1, None)):
+        yield row[:length] if length < len(row) else row
+
+
+def create_snapshot(source_path: str, stop_after_empty_rows: int = 0) -> int:
+    """원본 엑셀 파일을 openpyxl로 한 번 읽어 스냅샷 생성 (이미 최신이면 건너뜀), 행 수 리턴"""
+    snap = read_snapshot(source_path, stop_after_empty_rows)
+    if snap is not None:
+        return snap.row_count
+    builder = SnapshotBuilder()
+    for row in iter_openpyxl_rows(source_path, stop_after_empty_rows=stop_after_empty_rows):
+        builder.add(row)
+    return write_snapshot(source_path, builder.build(), stop_after_empty_rows)
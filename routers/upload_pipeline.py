@@ -0,0 +1,396 @@
+import os
+import time
+import uuid
+import asyncio
+import hashlib
+import zipfile
+from collections import namedtuple
+from fastapi import UploadFile, HTTPException, status
+from fastapi.responses import HTMLResponse
+from starlette.concurrency import run_in_threadpool
+from routers import downloads, merge_engine, metrics, snapshot
+
+# --- Configuration ---
+# 업로드를 읽고 쓰는 단위 (바이트)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# 업로드 파일 하나의 최대 크기 (바이트), 환경변수 MAX_UPLOAD_BYTES로 변경
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+# 파일 외 multipart 폼 데이터(경계 문자열, 헤더 등)에 허용하는 여유분
+FORM_OVERHEAD_BYTES = 64 * 1024
+# 벌크 업로드 요청 하나의 최대 크기 (zip은 압축을 푼 크기 합계에도 적용), 환경변수 BULK_UPLOAD_MAX_BYTES로 변경
+BULK_UPLOAD_MAX_BYTES = int(os.environ.get("BULK_UPLOAD_MAX_BYTES", str(1024 * 1024 * 1024)))
+# 벌크 업로드 요청 하나에 넣을 수 있는 최대 파일 수 (zip 안의 파일 포함)
+BULK_MAX_FILES = int(os.environ.get("BULK_MAX_FILES", "200"))
+# 템플릿의 데이터 열 수 (A-K열)
+TEMPLATE_COLUMNS = 11
+# 업로드 검증에서 읽는 열 수 (템플릿 열까지, 병합 열이 더 넓으면 병합 열까지) - 스냅샷도 이 열까지만 저장
+UPLOAD_SCAN_COLUMNS = max(TEMPLATE_COLUMNS, merge_engine.schema_width(merge_engine.DEFAULT_SCHEMA))
+
+# 임시 파일로 받아 둔 업로드 (path: 임시 파일 경로, size: 바이트 수, sha256: 내용 해시)
+StoredUpload = namedtuple("StoredUpload", ["path", "size", "sha256"])
+
+# 업로드된 워크북을 한 번 읽어서 얻은 정보
+# a5_value: A5 셀 값 (DRM 검사용), agenda_numbers: B열의 숫자 값 (중복 제거),
+# row_count: 5번째 행 이후 데이터가 있는 행 수, sha256: 파일 내용 해시,
+# merge_rows: 병합에 쓰일 5번째 행 이후 A-K열 데이터 (병합 캐시에 그대로 저장),
+# sheet: 1행부터의 행 값을 열 단위로 모은 snapshot.Snapshot (스냅샷으로 그대로 저장)
+WorkbookInspection = namedtuple("WorkbookInspection", ["a5_value", "agenda_numbers", "row_count", "sha256", "merge_rows", "sheet"])
+
+# 업로드 하나의 검증/반영 결과 (워커 프로세스에서 돌려받으므로 행 값 같은 큰 데이터는 담지 않음)
+# reason: 거절 사유 (통과하면 None), seconds: 검증+반영에 걸린 초
+UploadCheck = namedtuple("UploadCheck", ["filename", "accepted", "reason", "agenda_numbers", "row_count", "seconds"])
+
+# 벌크 업로드에서 받은 파일 하나 (stored: 임시 파일, 검증 전에 거절되면 None과 reason)
+BulkItem = namedtuple("BulkItem", ["filename", "stored", "reason"])
+
+
+def format_size(num_bytes: int) -> str:
+    """크기 제한을 안내 문구용으로 표시 (1MB 미만은 KB, 그 이상은 소수점 한 자리 MB)"""
+    if num_bytes < 1024 * 1024:
+        return f"{num_bytes / 1024:.1f}KB"
+    return f"{num_bytes / (1024 * 1024):.1f}MB"
+
+
+def safe_upload_filename(filename: str):
+    """
+    클라이언트가 보낸 파일명에서 경로를 떼어 낸 이름 (비었거나 .으로 시작하면 None)
+    .으로 시작하는 이름은 스냅샷, 업로드 임시 파일 같은 내부 파일 자리이므로 받지 않음
+    """
+    name = os.path.basename((filename or "").replace("\\", "/"))
+    if not name or name.startswith("."):
+        return None
+    return name
+
+
+def is_valid_a5(a5_value) -> bool:
+    """A5 셀이 비어있거나 None이면 DRM이 걸린 파일로 판단"""
+    return a5_value is not None and str(a5_value).strip() != ""
+
+
+def to_agenda_number(value):
+    """B열 값을 안건 번호(int)로 변환, 숫자가 아니면 None"""
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def inspect_workbook(file_path: str, sha256: str = None) -> WorkbookInspection:
+    """
+    업로드된 워크북을 read-only 모드로 한 번만 읽어서 업로드 처리에 필요한 정보를 모두 추출
+    - A5 셀 값 (DRM 해제 여부 확인)
+    - B열 안건 번호 (match_agenda_user에서 사용)
+    - 5번째 행 이후 병합할 열의 데이터와 행 수 (병합 캐시에서 사용, merge_engine.DEFAULT_SCHEMA 기준)
+    - UPLOAD_SCAN_COLUMNS열까지의 행 값 (열 단위 스냅샷에서 사용)
+    MERGE_STOP_AFTER_EMPTY_ROWS가 0이 아니면 마지막 값 아래의 빈 행은 그만큼까지만 읽음 (스냅샷에도 그 설정을 기록)
+    시트 크기가 1,048,576행 x 수십 열로 잡힌 파일도 실제 데이터 크기만큼만 읽음
+
+    Args:
+        file_path: 업로드된 파일 경로
+        sha256: 업로드하면서 이미 계산한 해시가 있으면 전달 (없으면 파일을 읽어 계산)
+    """
+    # 확장자가 .xlsx가 아닌 임시 파일도 읽을 수 있도록 파일 객체로 전달
+    with open(file_path, "rb") as f:
+        a5_value, agenda_numbers, merge_rows, sheet = _scan_workbook(f)
+
+    if sha256 is None:
+        sha256 = merge_engine.file_sha256(file_path)
+
+    return WorkbookInspection(a5_value, sorted(agenda_numbers), len(merge_rows), sha256, merge_rows, sheet)
+
+
+def _scan_workbook(file_obj):
+    """워크북을 한 행씩 읽으며 A5 값, B열 안건 번호, 병합용 행, UPLOAD_SCAN_COLUMNS열까지의 행(열 단위)을 모음"""
+    a5_value = None
+    agenda_numbers = set()
+    merge_rows = []
+    builder = snapshot.SnapshotBuilder()
+    # 병합 때 스냅샷에서 읽는 것과 같은 규칙(열 선택, 뒤쪽 빈 값 제거, 빈 행 제외)으로 병합용 행 추출
+    project = merge_engine.row_projector(merge_engine.DEFAULT_SCHEMA)
+
+    rows = snapshot.iter_openpyxl_rows(file_obj, max_col=UPLOAD_SCAN_COLUMNS,
+                                       stop_after_empty_rows=merge_engine.DEFAULT_SCHEMA.stop_after_empty_rows)
+    for row_no, row in enumerate(rows, start=1):
+        builder.add(row)
+        if not row:
+            continue
+        if row_no >= merge_engine.DATA_START_ROW:
+            merge_row = merge_engine.trim_row(project(row))
+            if merge_row:
+                merge_rows.append(merge_row)
+        if len(row) > 1:
+            number = to_agenda_number(row[1])
+            if number is not None:
+                agenda_numbers.add(number)
+        if row_no == merge_engine.DATA_START_ROW:
+            a5_value = row[0]
+    return a5_value, agenda_numbers, merge_rows, builder.build()
+
+
+# --- 업로드 저장 ---
+async def stream_to_temp(file: UploadFile, dest_dir: str, max_bytes: int = MAX_UPLOAD_BYTES, kind: str = "data") -> StoredUpload:
+    """
+    업로드 파일을 UPLOAD_CHUNK_SIZE 단위로 읽어 dest_dir 안의 임시 파일에 저장하면서 해시 계산
+    디스크 쓰기는 스레드 풀에서 실행해 이벤트 루프를 막지 않음
+    max_bytes를 넘으면 즉시 중단하고 413 에러
+    받은 바이트 수는 upload_bytes_total{kind} 지표에 더함
+
+    Returns:
+        StoredUpload (임시 파일은 publish_upload로 옮기거나 discard_upload로 지워야 함)
+    """
+    # .xlsx로 끝나지 않는 숨김 파일이므로 병합/목록에 잡히지 않음
+    temp_path = os.path.join(dest_dir, f".upload_{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+    buffer = await run_in_threadpool(open, temp_path, "wb")
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"업로드 파일이 너무 큽니다. (최대 {format_size(max_bytes)})"
+                )
+            digest.update(chunk)
+            await run_in_threadpool(buffer.write, chunk)
+        await run_in_threadpool(buffer.close)
+    except BaseException:
+        buffer.close()
+        discard_upload(temp_path)
+        raise
+    finally:
+        metrics.UPLOAD_BYTES.inc(size, kind=kind)
+    return StoredUpload(temp_path, size, digest.hexdigest())
+
+
+def publish_upload(stored: StoredUpload, dest_path: str):
+    """임시 파일을 최종 위치로 원자적으로 옮김 (같은 폴더 안에서 rename), 받으면서 계산한 해시는 다운로드 ETag로 기억"""
+    os.replace(stored.path, dest_path)
+    downloads.remember_etag(dest_path, stored.sha256)
+
+
+def discard_upload(temp_path: str):
+    """임시 파일 삭제"""
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+
+async def save_upload(file: UploadFile, dest_path: str, max_bytes: int = MAX_UPLOAD_BYTES, kind: str = "data") -> StoredUpload:
+    """업로드 파일을 임시 파일로 받은 뒤 dest_path로 원자적으로 옮김"""
+    stored = await stream_to_temp(file, os.path.dirname(dest_path) or ".", max_bytes, kind)
+    publish_upload(stored, dest_path)
+    return stored._replace(path=dest_path)
+
+
+# --- 데이터 파일 검증/반영 ---
+def process_upload(stored: StoredUpload, dest_path: str, cache_dir: str) -> UploadCheck:
+    """
+    임시 파일로 받은 데이터 파일 하나를 검증하고, 통과하면 dest_path로 옮긴 뒤 병합 캐시와 스냅샷까지 만듦
+    - 파일을 한 번만 읽어서 A5 셀 검증, B열 안건 번호, 병합용 데이터, 전체 행을 모두 추출
+    - A5 셀이 비어 있거나 읽을 수 없는 파일은 임시 파일을 지우고 거절
+    벌크 업로드에서는 프로세스 풀에서 실행되므로 소유권/안건 번호 기록은 호출한 쪽에서 한꺼번에 함
+    """
+    start = time.perf_counter()
+    filename = os.path.basename(dest_path)
+    try:
+        inspection = inspect_workbook(stored.path, stored.sha256)
+    except Exception as e:
+        discard_upload(stored.path)
+        return UploadCheck(filename, False, f"파일을 읽는 중 오류가 발생했습니다: {e}", [], 0, time.perf_counter() - start)
+
+    # A5 셀이 비어있거나 None이면 업로드 거부
+    if not is_valid_a5(inspection.a5_value):
+        discard_upload(stored.path)
+        return UploadCheck(filename, False, "DRM을 해제해 평문으로 올려주세요", [], 0, time.perf_counter() - start)
+
+    publish_upload(stored, dest_path)
+
+    # 추출해 둔 병합용 데이터를 병합 캐시에 넣고, 전체 행은 열 단위 스냅샷으로 저장해서 이후에 xlsx를 다시 파싱하지 않도록 함
+    try:
+        merge_engine.store_cached_rows(cache_dir, inspection.sha256, inspection.merge_rows)
+        snapshot.write_snapshot(dest_path, inspection.sheet, merge_engine.DEFAULT_SCHEMA.stop_after_empty_rows,
+                                UPLOAD_SCAN_COLUMNS)
+    except (OSError, TypeError) as e:
+        print(f"Error priming merge cache for {filename}: {e}")
+    return UploadCheck(filename, True, None, inspection.agenda_numbers, inspection.row_count, time.perf_counter() - start)
+
+
+async def process_uploads(uploads: list[tuple[StoredUpload, str]], cache_dir: str) -> list[UploadCheck]:
+    """
+    (임시 파일, 최종 경로) 목록을 병렬로 process_upload (병합 파싱과 같은 프로세스 풀 사용)
+    워커가 하나뿐이거나 파일이 하나면 스레드 풀에서 차례로 실행, 결과는 입력 순서대로
+    """
+    if len(uploads) > 1 and merge_engine.MERGE_WORKERS > 1:
+        pool = merge_engine.get_parse_pool()
+        outcomes = await asyncio.gather(
+            *(asyncio.wrap_future(pool.submit(process_upload, stored, dest_path, cache_dir)) for stored, dest_path in uploads),
+            return_exceptions=True
+        )
+    else:
+        outcomes = []
+        for stored, dest_path in uploads:
+            try:
+                outcomes.append(await run_in_threadpool(process_upload, stored, dest_path, cache_dir))
+            except Exception as e:
+                outcomes.append(e)
+
+    checks = []
+    for (stored, dest_path), outcome in zip(uploads, outcomes):
+        if isinstance(outcome, BaseException):
+            # 워커 프로세스가 죽는 등 process_upload 밖에서 실패한 경우
+            discard_upload(stored.path)
+            outcome = UploadCheck(os.path.basename(dest_path), False, f"파일을 처리하는 중 오류가 발생했습니다: {outcome}", [], 0, 0.0)
+        else:
+            metrics.SPAN_LATENCY.observe(outcome.seconds, span="upload_validate")
+            if outcome.accepted:
+                # 워커 프로세스에서 기억한 ETag는 이 프로세스에 남지 않으므로 다시 기억
+                downloads.remember_etag(dest_path, stored.sha256)
+        checks.append(outcome)
+    return checks
+
+
+# --- 벌크 업로드 ---
+def is_zip_upload(filename: str) -> bool:
+    return filename.lower().endswith(".zip")
+
+
+def extract_zip(zip_path: str, dest_dir: str, max_files: int = BULK_MAX_FILES, max_total_bytes: int = BULK_UPLOAD_MAX_BYTES) -> list[BulkItem]:
+    """
+    zip 안의 .xlsx 파일을 하나씩 dest_dir의 임시 파일로 풀면서 해시 계산 (폴더 구조는 무시하고 파일명만 사용)
+    폴더, 숨김 파일, __MACOSX 항목은 건너뛰고, .xlsx가 아닌 파일은 거절 사유와 함께 돌려줌
+    압축을 푼 크기는 실제로 쓴 바이트로 세어 파일 하나는 MAX_UPLOAD_BYTES, 전체는 max_total_bytes를 넘으면 413
+    """
+    items = []
+    total = 0
+    try:
+        archive = zipfile.ZipFile(zip_path)
+    except zipfile.BadZipFile as e:
+        raise HTTPException(status_code=400, detail=f"zip 파일을 열 수 없습니다: {e}")
+    with archive:
+        for member in archive.infolist():
+            filename = safe_upload_filename(member.filename)
+            if member.is_dir() or filename is None or member.filename.startswith("__MACOSX/"):
+                continue
+            if len(items) >= max_files:
+                raise HTTPException(status_code=400, detail=f"한 번에 올릴 수 있는 파일은 최대 {max_files}개입니다.")
+            if not filename.lower().endswith(".xlsx"):
+                items.append(BulkItem(filename, None, "xlsx 파일만 올릴 수 있습니다."))
+                continue
+            if member.file_size > MAX_UPLOAD_BYTES:
+                items.append(BulkItem(filename, None, f"파일이 너무 큽니다. (최대 {format_size(MAX_UPLOAD_BYTES)})"))
+                continue
+
+            temp_path = os.path.join(dest_dir, f".upload_{uuid.uuid4().hex}.part")
+            digest = hashlib.sha256()
+            size = 0
+            try:
+                with archive.open(member) as source, open(temp_path, "wb") as target:
+                    for chunk in iter(lambda: source.read(UPLOAD_CHUNK_SIZE), b""):
+                        size += len(chunk)
+                        total += len(chunk)
+                        # 헤더에 적힌 크기를 믿지 않고 실제로 푼 크기로 제한 (zip bomb 방지)
+                        if size > MAX_UPLOAD_BYTES or total > max_total_bytes:
+                            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                                detail="zip 안의 파일이 너무 큽니다.")
+                        digest.update(chunk)
+                        target.write(chunk)
+            except BaseException:
+                discard_upload(temp_path)
+                discard_bulk_items(items)
+                raise
+            items.append(BulkItem(filename, StoredUpload(temp_path, size, digest.hexdigest()), None))
+    return items
+
+
+def discard_bulk_items(items: list[BulkItem]):
+    """아직 검증하지 않은 임시 파일 삭제"""
+    for item in items:
+        if item.stored is not None:
+            discard_upload(item.stored.path)
+
+
+async def receive_bulk(files: list[UploadFile], dest_dir: str) -> list[BulkItem]:
+    """
+    벌크 업로드의 파일들을 임시 파일로 받음 (zip은 풀어서 안의 .xlsx 파일들로)
+    파일 수가 BULK_MAX_FILES를 넘으면 400, 이름이 같은 파일이 여러 개면 처음 것만 받고 나머지는 거절
+    """
+    items = []
+    try:
+        for file in files:
+            filename = safe_upload_filename(file.filename)
+            if filename is None:
+                items.append(BulkItem(file.filename or "", None, "사용할 수 없는 파일 이름입니다."))
+                continue
+            max_bytes = BULK_UPLOAD_MAX_BYTES if is_zip_upload(filename) else MAX_UPLOAD_BYTES
+            stored = await stream_to_temp(file, dest_dir, max_bytes, kind="bulk")
+            if is_zip_upload(filename):
+                try:
+                    items.extend(await run_in_threadpool(extract_zip, stored.path, dest_dir, BULK_MAX_FILES - len(items)))
+                finally:
+                    discard_upload(stored.path)
+            elif not filename.lower().endswith(".xlsx"):
+                discard_upload(stored.path)
+                items.append(BulkItem(filename, None, "xlsx 파일만 올릴 수 있습니다."))
+            else:
+                items.append(BulkItem(filename, stored, None))
+            if len(items) > BULK_MAX_FILES:
+                raise HTTPException(status_code=400, detail=f"한 번에 올릴 수 있는 파일은 최대 {BULK_MAX_FILES}개입니다.")
+    except BaseException:
+        discard_bulk_items(items)
+        raise
+
+    seen = set()
+    for idx, item in enumerate(items):
+        if item.filename in seen and item.stored is not None:
+            discard_upload(item.stored.path)
+            items[idx] = BulkItem(item.filename, None, "같은 이름의 파일이 이미 이 요청에 있습니다.")
+        seen.add(item.filename)
+    return items
+
+
+class UploadSizeLimitMiddleware:
+    """
+    /upload 로 시작하는 POST 요청의 본문 크기를 제한하는 ASGI 미들웨어 (/bulk로 끝나는 벌크 업로드는 bulk_max_bytes)
+    - Content-Length가 제한을 넘으면 본문을 읽기 전에 바로 413 응답
+    - Content-Length가 없거나(chunked) 거짓이어도 받은 바이트 수가 제한을 넘는 순간 중단
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_UPLOAD_BYTES + FORM_OVERHEAD_BYTES, path_prefix: str = "/upload",
+                 bulk_max_bytes: int = BULK_UPLOAD_MAX_BYTES + FORM_OVERHEAD_BYTES, bulk_suffix: str = "/bulk"):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_prefix = path_prefix
+        self.bulk_max_bytes = bulk_max_bytes
+        self.bulk_suffix = bulk_suffix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        # 벌크 업로드(/upload/{version}/bulk)는 여러 파일을 한 요청에 담으므로 따로 제한
+        max_bytes = self.bulk_max_bytes if scope["path"].rstrip("/").endswith(self.bulk_suffix) else self.max_bytes
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+            response = HTMLResponse(content="업로드 파일이 너무 큽니다.", status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="업로드 파일이 너무 큽니다.")
+            return message
+
+        await self.app(scope, limited_receive, send)